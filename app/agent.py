@@ -1,9 +1,12 @@
 import json
+from datetime import datetime
 from uuid import uuid4
 from typing import Dict, Optional, List, Set
 from zoneinfo import ZoneInfo
 
+from app.config import settings
 from app.llm_client import _build_groq_client
+from app.shared.pipeline import Pipeline, PipelineContext, Stage, StageCache
 from app.prompt import SYSTEM_PROMPT, build_interpretation_prompt
 from models.a2a import (
     A2AMessage, TaskResult, TaskStatus, Artifact,
@@ -11,11 +14,43 @@ from models.a2a import (
 )
 from models.time_conversion import TimeNLConvertResponse
 
-client = _build_groq_client()
 
 class TimeCoordinationAgent:
     def __init__(self, llm_client=None):
-        self.llm_client = llm_client or client
+        self._llm_client = llm_client
+        self._pipeline = None
+
+    @property
+    def llm_client(self):
+        if self._llm_client is None:
+            self._llm_client = _build_groq_client()
+        return self._llm_client
+
+    @property
+    def pipeline(self) -> Pipeline:
+        if self._pipeline is None:
+            self._pipeline = Pipeline(
+                "time-coordination",
+                [
+                    Stage("text", self._extract_text),
+                    Stage("prompt", self._build_prompt, after=("text",)),
+                    Stage(
+                        "completion",
+                        self._complete,
+                        after=("prompt",),
+                        blocking=True,  # the SDK blocks; keep it off the event loop
+                        cache=StageCache(
+                            "legacy-completion",
+                            # The prompt embeds "now"; share answers within the minute.
+                            key=lambda ctx: f"{datetime.utcnow():%Y-%m-%dT%H:%M}|{ctx['text']}",
+                            ttl=settings.completion_cache_ttl,
+                        ) if settings.completion_cache_ttl > 0 else None,
+                    ),
+                    Stage("response", self._parse_response, after=("completion",)),
+                    Stage("result", self._build_result, after=("response",)),
+                ],
+            )
+        return self._pipeline
 
     async def process_messages(
         self,
@@ -24,40 +59,54 @@ class TimeCoordinationAgent:
         task_id: Optional[str] = None,
         config: Optional[MessageConfiguration] = None
     ) -> TaskResult:
-        
         # Generate IDs if not provided
-        context_id = context_id or str(uuid4())
-        task_id = task_id or str(uuid4())
+        return await self.pipeline.run(
+            messages,
+            context_id=context_id or str(uuid4()),
+            task_id=task_id or str(uuid4()),
+        )
 
+    def _extract_text(self, ctx: PipelineContext) -> str:
         # Extract text from message parts
+        messages = ctx.message
         if isinstance(messages, dict):
             parts = messages.get("parts", [])
+        else:
+            parts = [part.model_dump() for part in messages.parts]
 
         input_texts = [p["text"] for p in parts if p.get("kind") == "text" and p.get("text")]
         if not input_texts:
             raise ValueError("No text parts found in the message.")
 
-        input_text = " ".join(input_texts)
+        return " ".join(input_texts)
 
+    def _build_prompt(self, ctx: PipelineContext):
         # Build prompt for time conversion
-        prompt = build_interpretation_prompt(input_text)[0]
+        return build_interpretation_prompt(ctx["text"])[0]
 
+    def _complete(self, ctx: PipelineContext) -> str:
         # Call LLM to get time conversions
         response = self.llm_client.chat.completions.create(
             model="openai/gpt-oss-20b",
-            messages= prompt,
+            messages=ctx["prompt"],
             response_format={
                 "type": "json_schema",
                 "json_schema": {"name":"time-conversion-response", "schema": TimeNLConvertResponse.model_json_schema()},
             }
         )
-        response = json.loads(response.choices[0].message.content)
+        return response.choices[0].message.content
+
+    def _parse_response(self, ctx: PipelineContext) -> dict:
+        response = json.loads(ctx["completion"])
         try:
             response = TimeNLConvertResponse(**response)
         except Exception as e:
             raise ValueError(f"Failed to parse LLM response: {e}")
 
-        response = response.model_dump()
+        return response.model_dump()
+
+    def _build_result(self, ctx: PipelineContext) -> TaskResult:
+        response = ctx["response"]
 
         # Build response message parts
         artifact_parts = [
@@ -78,8 +127,8 @@ class TimeCoordinationAgent:
 
         # Build task result
         task_result = TaskResult(
-            id=task_id,
-            contextId=context_id,
+            id=ctx.task_id,
+            contextId=ctx.context_id,
             status=TaskStatus(state="completed", 
                               message=A2AMessage(
                                   role="agent",
@@ -90,7 +139,7 @@ class TimeCoordinationAgent:
                     parts=artifact_parts
                 )
             ],
-            history=[messages]
+            history=[ctx.message]
         )
 
         return task_result
\ No newline at end of file
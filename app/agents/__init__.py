@@ -1,5 +1,31 @@
-from app.agents.schedule_time.handler import ScheduleTimeAgent
+from app.agents.registry import AgentRegistry, AgentSpec
+from app.config import settings
+
+agent_registry = AgentRegistry(
+    [
+        AgentSpec(
+            name="schedule-time",
+            factory="app.agents.schedule_time:build_agent",
+            description="Time conversions and Slack ID timezone lookups.",
+        ),
+    ],
+    default_max_concurrency=settings.agent_max_concurrency,
+    default_max_queue=settings.agent_max_queue,
+)
+
+
+def __getattr__(name):
+    # Agent classes are imported on demand so `import app.agents` stays cheap.
+    if name == "ScheduleTimeAgent":
+        from app.agents.schedule_time.handler import ScheduleTimeAgent
+
+        return ScheduleTimeAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
+    "AgentRegistry",
+    "AgentSpec",
     "ScheduleTimeAgent",
+    "agent_registry",
 ]
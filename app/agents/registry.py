@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from app.shared.bulkhead import Bulkhead
+from models.a2a import A2AMessage, TaskResult
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """Declaration of an agent endpoint.
+
+    ``factory`` is a ``"module:callable"`` path returning an object with an async
+    ``handle(message, *, context_id, task_id)`` method. It is only imported and
+    called when the agent receives its first request.
+    """
+
+    name: str
+    factory: str
+    description: str = ""
+    max_concurrency: Optional[int] = None
+    max_queue: Optional[int] = None
+
+
+class AgentRegistry:
+    """Lazily instantiated agents, each isolated behind its own bulkhead."""
+
+    def __init__(
+        self,
+        specs: Iterable[AgentSpec] = (),
+        *,
+        default_max_concurrency: int = 16,
+        default_max_queue: int = 64,
+    ) -> None:
+        self.default_max_concurrency = default_max_concurrency
+        self.default_max_queue = default_max_queue
+        self._specs: Dict[str, AgentSpec] = {}
+        self._bulkheads: Dict[str, Bulkhead] = {}
+        self._agents: Dict[str, Any] = {}
+        self._load_lock = threading.Lock()
+        for spec in specs:
+            self.declare(spec)
+
+    def declare(self, spec: AgentSpec) -> None:
+        if spec.name in self._specs:
+            raise ValueError(f"Agent '{spec.name}' is already declared")
+        self._specs[spec.name] = spec
+        self._bulkheads[spec.name] = Bulkhead(
+            spec.name,
+            max_concurrency=spec.max_concurrency or self.default_max_concurrency,
+            max_queue=spec.max_queue if spec.max_queue is not None else self.default_max_queue,
+        )
+
+    @property
+    def specs(self) -> List[AgentSpec]:
+        return list(self._specs.values())
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def loaded_names(self) -> List[str]:
+        return [name for name in self._specs if name in self._agents]
+
+    def bulkhead(self, name: str) -> Bulkhead:
+        return self._bulkheads[name]
+
+    def load(self, name: str) -> Any:
+        """Import and instantiate an agent on first use."""
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        spec = self._specs[name]
+        with self._load_lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                module_path, _, attr = spec.factory.partition(":")
+                factory = getattr(importlib.import_module(module_path), attr)
+                agent = factory()
+                self._agents[name] = agent
+                logger.info("Agent loaded", agent=name, factory=spec.factory)
+        return agent
+
+    async def dispatch(
+        self,
+        name: str,
+        message: A2AMessage,
+        *,
+        context_id: Optional[str] = None,
+        task_id: Optional[str] = None,
+    ) -> TaskResult:
+        """Run ``message`` through the named agent inside its bulkhead."""
+        async with self._bulkheads[name].slot():
+            agent = self._agents.get(name)
+            if agent is None:
+                agent = await asyncio.to_thread(self.load, name)
+            return await agent.handle(message, context_id=context_id, task_id=task_id)
+
+    async def warm_up(self, name: str, **options: Any) -> Any:
+        """Load the named agent and run its optional ``warm_up(**options)`` hook."""
+        agent = self._agents.get(name)
+        if agent is None:
+            agent = await asyncio.to_thread(self.load, name)
+        hook = getattr(agent, "warm_up", None)
+        return await hook(**options) if hook is not None else None
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "description": spec.description,
+                "loaded": name in self._agents,
+                "bulkhead": self._bulkheads[name].snapshot(),
+            }
+            for name, spec in self._specs.items()
+        }
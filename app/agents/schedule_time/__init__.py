@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from app.agents.schedule_time.handler import ScheduleTimeAgent
+from app.config import settings
+from app.shared.profiles import ProfileDirectory
+from app.shared.store import shared_store
+
+
+def build_agent() -> ScheduleTimeAgent:
+    """Construct the agent from application settings."""
+    profile_directory = ProfileDirectory(
+        Path(settings.profile_csv) if settings.profile_csv else None,
+        store=shared_store,
+    )
+    return ScheduleTimeAgent(
+        default_timezone=settings.default_timezone,
+        profile_directory=profile_directory,
+    )
+
+
+__all__ = [
+    "ScheduleTimeAgent",
+    "build_agent",
+]
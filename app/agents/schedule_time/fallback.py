@@ -0,0 +1,106 @@
+"""Deterministic interpretation used while the LLM circuit is open.
+
+Handles the easy, common shape of request — a clock time, an optional
+today/tomorrow/yesterday or ISO date, and place or zone names — without a
+model. Anything it cannot read unambiguously returns ``None`` so the caller
+can fail fast with a "try later" answer instead.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Sequence
+
+from app.agents.schedule_time.parse_cache import _DAY_OFFSET_RE, classify_expression
+from app.agents.schedule_time.repair import describe_conversion
+from app.shared.conversion import (
+    conversion_engine,
+    format_clock,
+    get_zone,
+    is_valid_zone,
+    localize_wall_time,
+)
+from app.shared.places import place_resolver
+from models.time_conversion import TimeNLConvertResponse, TimeSource
+
+_CLOCK_12_RE = re.compile(r"\b(\d{1,2})(?::([0-5]\d))?\s*([ap])\.?\s*m\b\.?", re.IGNORECASE)
+_CLOCK_24_RE = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
+_ISO_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_DAY_WORDS = {"yesterday": -1, "today": 0, "tonight": 0, "tomorrow": 1}
+
+
+def find_zones(text: str) -> List[str]:
+    """Return zones named in ``text`` (IANA, city, country or alias names), in order of mention."""
+    return place_resolver.find_zones(text)
+
+
+def find_clock(text: str) -> Optional[time]:
+    match = _CLOCK_12_RE.search(text)
+    if match:
+        hour = int(match.group(1))
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if match.group(3).lower() == "p" else 0)
+        return time(hour, int(match.group(2) or 0))
+    match = _CLOCK_24_RE.search(text)
+    if match:
+        return time(int(match.group(1)), int(match.group(2)))
+    lowered = text.lower()
+    if re.search(r"\b(?:noon|midday)\b", lowered):
+        return time(12, 0)
+    if re.search(r"\bmidnight\b", lowered):
+        return time(0, 0)
+    return None
+
+
+def _find_day(text: str, today: date) -> Optional[date]:
+    """The day named in ``text``, or ``None`` when it is not an ISO date or today-relative.
+
+    Month names, weekdays, slash or dotted dates, holidays and offsets such as
+    "in 3 days" are left to the model rather than read as today.
+    """
+    match = _ISO_DATE_RE.search(text)
+    if match:
+        try:
+            return date.fromisoformat(match.group(1))
+        except ValueError:
+            return None
+    lowered = text.lower()
+    if classify_expression(text) != "day" or _DAY_OFFSET_RE.search(lowered):
+        return None
+    for word, offset in _DAY_WORDS.items():
+        if re.search(rf"\b{word}\b", lowered):
+            return today + timedelta(days=offset)
+    return today
+
+
+def interpret_locally(
+    expression: str,
+    *,
+    default_timezone: str,
+    target_timezones: Sequence[str],
+    reference: Optional[datetime] = None,
+) -> Optional[TimeNLConvertResponse]:
+    """Convert simple expressions without the LLM, or return ``None``."""
+    clock = find_clock(expression)
+    if clock is None:
+        return None
+    zones = find_zones(expression)
+    source_zone = zones[0] if zones else default_timezone
+    targets = zones[1:] or [zone for zone in target_timezones if zone != source_zone]
+    if not is_valid_zone(source_zone) or not targets or not all(map(is_valid_zone, targets)):
+        return None
+    reference = reference or datetime.now(get_zone(source_zone))
+    day = _find_day(expression, reference.astimezone(get_zone(source_zone)).date())
+    if day is None:
+        return None
+    instant = localize_wall_time(day, clock, source_zone)
+    source = TimeSource(timezone=source_zone, date=day.isoformat(), time=format_clock(clock))
+    converted = [target.model_dump() for target in conversion_engine.convert(instant, targets)]
+    return TimeNLConvertResponse(
+        input_text=expression,
+        output_text=describe_conversion(source.model_dump(), converted),
+        source=source,
+        targets=converted,
+    )
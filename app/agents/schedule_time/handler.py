@@ -1,18 +1,63 @@
-import json
-from typing import Optional
+import asyncio
+import uuid
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from app.agents.schedule_time.prompt import (
     USER_INTENT_PROMPT,
     build_interpretation_prompt,
+    build_recurrence_prompt,
 )
 from loguru import logger
-from app.agents.schedule_time.tools import get_timezone, tools
-from app.shared.llm import llm_client, json_schema_response
+from pydantic import ValidationError
+from app.agents.schedule_time.fallback import interpret_locally
+from app.agents.schedule_time.meeting_windows import (
+    Participant,
+    find_meeting_windows,
+    window_to_conversion,
+)
+from app.agents.schedule_time.parse_cache import (
+    ParseCache,
+    build_cached_response,
+    parse_cache as default_parse_cache,
+)
+from app.agents.schedule_time.recurrence import (
+    decode_cursor,
+    describe_rule,
+    expand_page,
+    looks_recurring,
+    parse_recurrence,
+)
+from app.agents.schedule_time.repair import RepairReport, repair_time_response
+from app.agents.schedule_time.tools import convert_time, get_timezone, tools
+from app.config import settings
+from app.shared.circuit import CircuitOpen
+from app.shared.conversion import get_zone, is_valid_zone
+from app.shared.deadline import DeadlineExceeded
+from app.shared.json_repair import parse_json_tolerant
+from app.shared.llm import LLMClient, llm_client, json_schema_response
+from app.shared.memory import ConversationMemory, conversation_memory
 from app.shared.message_utils import extract_text_parts
+from app.shared.metrics import metrics
+from app.shared.places import place_resolver
+from app.shared.pipeline import Pipeline, PipelineContext, ShortCircuit, Stage
 from app.shared.profiles import ProfileDirectory
 from app.shared.task_builder import build_error_result, build_task_result
 from models.a2a import A2AMessage
-from models.time_conversion import IntentResponse, TimeNLConvertResponse
+from models.time_conversion import (
+    IntentResponse,
+    RecurrenceInterpretation,
+    RecurrenceRule,
+    TimeNLConvertResponse,
+)
+
+AGENT_NAME = "schedule-time"
+
+MAX_MEETING_DURATION_MINUTES = 24 * 60
+MAX_MEETING_WINDOWS = 50
 
 DEFAULT_TARGETS = [
     "America/New_York",
@@ -20,6 +65,28 @@ DEFAULT_TARGETS = [
     "Asia/Dubai",
 ]
 
+TOOL_REGISTRY = {
+    "get_timezone": get_timezone,
+    "convert_time": convert_time,
+}
+
+
+@dataclass
+class TimeRequest:
+    """Per-request inputs resolved from the message and its metadata."""
+
+    expression: str
+    source_timezone: str
+    target_timezones: List[str]
+    reference: datetime
+    conversation_context: Optional[str]
+    # Place names found in the expression, already mapped to IANA zones.
+    places: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def use_parse_cache(self) -> bool:
+        return self.conversation_context is None
+
 
 class ScheduleTimeAgent:
     """LLM-driven time coordination agent."""
@@ -29,10 +96,16 @@ class ScheduleTimeAgent:
         *,
         default_timezone: str = "UTC",
         profile_directory: Optional[ProfileDirectory] = None,
+        memory: Optional[ConversationMemory] = None,
+        parse_cache: Optional[ParseCache] = None,
+        llm: Optional[LLMClient] = None,
         model: str = "openai/gpt-oss-20b",
     ) -> None:
         self.default_timezone = default_timezone
         self.profiles = profile_directory or ProfileDirectory()
+        self.memory = memory or conversation_memory
+        self.parse_cache = parse_cache or default_parse_cache
+        self.llm = llm or llm_client
         self.model = model
         self._logger = logger
 
@@ -43,96 +116,646 @@ class ScheduleTimeAgent:
         context_id: Optional[str] = None,
         task_id: Optional[str] = None,
     ):
-        expression = " ".join(extract_text_parts(message)).strip()
+        return await self.pipeline.run(message, context_id=context_id, task_id=task_id)
+
+    @cached_property
+    def pipeline(self) -> Pipeline:
+        """extract -> resolve -> recurrence? -> (prompts || parse cache) -> circuit -> llm -> parse -> validate -> build."""
+        return Pipeline(
+            AGENT_NAME,
+            [
+                # Stages that read or write the shared store (profiles, memory,
+                # parse cache) run in a thread to keep SQLite off the loop.
+                Stage("meeting", self._route_meeting, blocking=True),
+                Stage(
+                    "recurrence_page",
+                    self._route_recurrence_cursor,
+                    after=("meeting",),
+                    errors={ValueError: self._invalid_cursor},
+                ),
+                Stage("expression", self._extract_expression, after=("recurrence_page",)),
+                Stage("request", self._resolve_request, after=("expression",), blocking=True),
+                Stage(
+                    "recurrence",
+                    self._expand_recurrence,
+                    after=("request",),
+                    errors={
+                        DeadlineExceeded: self._deadline_result,
+                        CircuitOpen: self._recurrence_unavailable,
+                        ValueError: self._recurrence_failure,
+                    },
+                ),
+                Stage("prompts", self._build_prompts, after=("recurrence",)),
+                Stage(
+                    "parse_cache", self._lookup_parse_cache, after=("recurrence",), blocking=True
+                ),
+                Stage(
+                    "circuit",
+                    self._check_circuit,
+                    after=("parse_cache",),
+                    errors={CircuitOpen: self._degraded_result},
+                ),
+                Stage(
+                    "llm",
+                    self._call_llm,
+                    after=("prompts", "circuit"),
+                    errors={
+                        DeadlineExceeded: self._deadline_result,
+                        CircuitOpen: self._degraded_result,
+                    },
+                ),
+                Stage(
+                    "parse",
+                    self._parse_output,
+                    after=("llm",),
+                    errors={ValueError: self._parse_failure},
+                ),
+                Stage(
+                    "validate",
+                    self._validate_output,
+                    after=("parse",),
+                    errors={ValueError: self._validation_failure},
+                ),
+                Stage("build", self._build_result, after=("validate",), blocking=True),
+            ],
+        )
+
+    # -- stages -------------------------------------------------------------------
+
+    def _route_meeting(self, ctx: PipelineContext) -> None:
+        meeting_request = (ctx.message.metadata or {}).get("meeting")
+        if meeting_request is not None and not isinstance(meeting_request, dict):
+            raise ShortCircuit(
+                self._error(
+                    ctx,
+                    "Invalid meeting window request.",
+                    {"error": "metadata.meeting must be an object"},
+                )
+            )
+        if meeting_request:
+            raise ShortCircuit(
+                self._handle_meeting_request(
+                    ctx.message,
+                    meeting_request,
+                    context_id=ctx.context_id,
+                    task_id=ctx.task_id,
+                )
+            )
+
+    def _route_recurrence_cursor(self, ctx: PipelineContext) -> None:
+        """Serve the next page of a recurring series straight from its cursor."""
+        metadata = ctx.message.metadata or {}
+        cursor = metadata.get("recurrence_cursor")
+        if cursor:
+            rule, target_timezones, index = decode_cursor(str(cursor))
+            raise ShortCircuit(
+                self._recurrence_result(
+                    ctx, rule, target_timezones, start_index=index, source="cursor"
+                )
+            )
+
+    def _extract_expression(self, ctx: PipelineContext) -> str:
+        expression = " ".join(extract_text_parts(ctx.message)).strip()
         if not expression:
             self._logger.warning("No expression content found in message")
-            return build_error_result(
-                message=message,
-                error_message="No text supplied for time interpretation.",
-                context_id=context_id,
-                task_id=task_id,
+            raise ShortCircuit(
+                self._error(ctx, "No text supplied for time interpretation.")
             )
+        return expression
 
-        metadata = message.metadata or {}
-        source_timezone = metadata.get("source_timezone", self.default_timezone)
-        target_timezones = metadata.get("target_timezones") or DEFAULT_TARGETS
+    def _resolve_request(self, ctx: PipelineContext) -> TimeRequest:
+        # Fix the context id up front so the first turn can be remembered and
+        # the client can continue the conversation with the returned contextId.
+        ctx.context_id = ctx.context_id or str(uuid.uuid4())
+        metadata = ctx.message.metadata or {}
+        # Metadata may name places ("Lagos", "PST") rather than IANA zones.
+        source_timezone, *target_timezones = place_resolver.canonicalize(
+            [
+                metadata.get("source_timezone", self.default_timezone),
+                *(metadata.get("target_timezones") or DEFAULT_TARGETS),
+            ]
+        )
+        places = {match.query: match.zone for match in place_resolver.find(ctx["expression"])}
         logger.debug(
             "Resolved metadata defaults",
             source_timezone=source_timezone,
             target_timezones=target_timezones,
+            places=places,
         )
-
-        intent_schema = json_schema_response(
-            "intent-response",
-            IntentResponse.model_json_schema(),
-        )
-        intent_prompt = USER_INTENT_PROMPT.format(expression=expression)
-        interpretation_messages = build_interpretation_prompt(
-            expression,
+        return TimeRequest(
+            expression=ctx["expression"],
             source_timezone=source_timezone,
             target_timezones=target_timezones,
-            tools=tools,
+            reference=datetime.now(
+                get_zone(source_timezone if is_valid_zone(source_timezone) else "UTC")
+            ),
+            conversation_context=self.memory.render(ctx.context_id),
+            places=places,
         )
 
-        response_schema = json_schema_response(
-            "time-conversion-response",
-            TimeNLConvertResponse.model_json_schema(),
+    async def _expand_recurrence(self, ctx: PipelineContext) -> None:
+        """Reduce a recurring request to one rule (locally, else via the LLM) and page it."""
+        request: TimeRequest = ctx["request"]
+        if not looks_recurring(request.expression):
+            return
+        parsed = parse_recurrence(
+            request.expression,
+            default_timezone=request.source_timezone,
+            reference=request.reference,
         )
+        source = "local"
+        if parsed is None:
+            circuit = self.llm.circuit_open(self.model)
+            if circuit is not None:
+                raise circuit
+            content = await self.llm.generate_response(
+                messages=build_recurrence_prompt(
+                    request.expression,
+                    source_timezone=request.source_timezone,
+                    target_timezones=request.target_timezones,
+                    reference_time=request.reference.replace(second=0, microsecond=0),
+                ),
+                model=self.model,
+                temperature=0.0,
+                response_format=_recurrence_schema(),
+            )
+            payload, _ = parse_json_tolerant(content)
+            try:
+                interpretation = RecurrenceInterpretation.model_validate(payload)
+            except ValidationError as exc:
+                raise ValueError(str(exc)) from exc
+            parsed = interpretation.rule, interpretation.target_timezones
+            source = "llm"
+        rule, target_timezones = parsed
+        target_timezones = [
+            zone for zone in (target_timezones or request.target_timezones) if zone != rule.timezone
+        ]
+        if not is_valid_zone(rule.timezone) or not all(map(is_valid_zone, target_timezones)):
+            raise ValueError(f"Unknown timezone in recurrence rule: {rule.timezone}, {target_timezones}")
+        raise ShortCircuit(self._recurrence_result(ctx, rule, target_timezones, source=source))
 
-        tool_registry = {
-            "get_timezone": get_timezone,
+    def _build_prompts(self, ctx: PipelineContext) -> Dict[str, Any]:
+        request: TimeRequest = ctx["request"]
+        return {
+            "intent": [
+                {
+                    "role": "user",
+                    "content": USER_INTENT_PROMPT.format(expression=request.expression),
+                }
+            ],
+            "interpretation": build_interpretation_prompt(
+                request.expression,
+                source_timezone=request.source_timezone,
+                target_timezones=request.target_timezones,
+                # Minute precision keeps identical requests cacheable.
+                reference_time=request.reference.replace(second=0, microsecond=0),
+                tools=tools,
+                conversation_context=request.conversation_context,
+                resolved_places=request.places,
+            ),
         }
 
-        llm_result = await llm_client.generate_routed_response(
-            intent_messages=[{"role": "user", "content": intent_prompt}],
-            intent_response_format=intent_schema,
-            messages=interpretation_messages,
+    def _lookup_parse_cache(self, ctx: PipelineContext) -> None:
+        request: TimeRequest = ctx["request"]
+        # Follow-ups depend on the conversation, so only standalone
+        # expressions are served from (and stored in) the parse cache.
+        if not request.use_parse_cache:
+            return
+        interpretation = self.parse_cache.lookup(
+            request.expression,
+            default_timezone=request.source_timezone,
+            reference=request.reference,
+        )
+        cached = (
+            build_cached_response(
+                request.expression,
+                interpretation,
+                reference=request.reference,
+                target_timezones=request.target_timezones,
+            )
+            if interpretation is not None
+            else None
+        )
+        if cached is None:
+            metrics.inc("parse_cache_misses_total", agent=AGENT_NAME)
+            return
+        metrics.inc("parse_cache_hits_total", agent=AGENT_NAME, kind=interpretation.kind)
+        logger.info("Served from parse cache", kind=interpretation.kind)
+        self.memory.remember(ctx.context_id, request.expression, cached)
+        raise ShortCircuit(self._conversion_result(ctx, cached))
+
+    def _check_circuit(self, ctx: PipelineContext) -> None:
+        circuit = self.llm.circuit_open(self.model)
+        if circuit is not None:
+            raise circuit
+
+    async def _call_llm(self, ctx: PipelineContext) -> str:
+        prompts = ctx["prompts"]
+        llm_result = await self.llm.generate_routed_response(
+            intent_messages=prompts["intent"],
+            intent_response_format=_intent_schema(),
+            messages=prompts["interpretation"],
             model=self.model,
             temperature=0.2,
-            response_format=response_schema,
+            response_format=_response_schema(),
             tools=tools,
-            tool_registry=tool_registry,
+            tool_registry=TOOL_REGISTRY,
         )
         logger.info("LLM routed response completed", intent=llm_result.intent)
-
-        completion = llm_result.completion
-        final_message = completion.choices[0].message
-        final_content = final_message.content or ""
+        final_content = llm_result.completion.choices[0].message.content or ""
         logger.debug("Received final LLM content", preview=final_content[:200])
+        metrics.inc("llm_structured_outputs_total", agent=AGENT_NAME)
+        return final_content
+
+    def _parse_output(self, ctx: PipelineContext) -> Tuple[Any, bool]:
+        return parse_json_tolerant(ctx["llm"])
+
+    def _validate_output(self, ctx: PipelineContext) -> TimeNLConvertResponse:
+        parsed, json_repaired = ctx["parse"]
+        time_response, repair = repair_time_response(
+            parsed, expression=ctx["expression"], json_repaired=json_repaired
+        )
+        self._record_repair(repair)
+        return time_response
+
+    def _build_result(self, ctx: PipelineContext):
+        request: TimeRequest = ctx["request"]
+        time_response: TimeNLConvertResponse = ctx["validate"]
+        self.memory.remember(ctx.context_id, request.expression, time_response)
+        if request.use_parse_cache:
+            self.parse_cache.remember(
+                request.expression,
+                time_response,
+                default_timezone=request.source_timezone,
+                reference=request.reference,
+                requested_targets=request.target_timezones,
+                named_targets=list(request.places.values()),
+            )
+        logger.info(
+            "Successfully built time conversion result",
+            targets=[target.timezone for target in time_response.targets],
+        )
+        return self._conversion_result(ctx, time_response)
+
+    # -- error mapping ------------------------------------------------------------
+
+    def _error(self, ctx: PipelineContext, error_message: str, data: Optional[Dict[str, Any]] = None):
+        return build_error_result(
+            message=ctx.message,
+            error_message=error_message,
+            context_id=ctx.context_id,
+            task_id=ctx.task_id,
+            data=data,
+        )
+
+    def _invalid_cursor(self, ctx: PipelineContext, exc: ValueError):
+        return self._error(ctx, "Invalid recurrence cursor.", {"error": str(exc)})
+
+    def _recurrence_unavailable(self, ctx: PipelineContext, circuit: CircuitOpen):
+        metrics.inc("degraded_responses_total", agent=AGENT_NAME, outcome="rejected")
+        return self._error(
+            ctx,
+            "Recurring schedules are temporarily unavailable; "
+            f"try again in {max(1, round(circuit.retry_after))}s.",
+            {"circuit": circuit.name, "retry_after": round(circuit.retry_after, 1)},
+        )
+
+    def _recurrence_failure(self, ctx: PipelineContext, exc: ValueError):
+        metrics.inc("llm_structured_output_failures_total", agent=AGENT_NAME, reason="recurrence")
+        logger.warning("Could not build a recurrence rule", error=str(exc))
+        return self._error(ctx, "Could not interpret the recurring schedule.", {"error": str(exc)})
+
+    def _deadline_result(self, ctx: PipelineContext, exc: DeadlineExceeded):
+        return self._error(
+            ctx,
+            "Time budget exhausted before the conversion completed.",
+            {"stage": exc.stage, "partial": exc.partial},
+        )
+
+    def _parse_failure(self, ctx: PipelineContext, exc: ValueError):
+        metrics.inc("llm_structured_output_failures_total", agent=AGENT_NAME, reason="json")
+        logger.exception("Failed to decode LLM JSON response", error=str(exc))
+        return self._error(
+            ctx,
+            "Failed to parse time conversion response.",
+            {"error": str(exc), "raw": ctx["llm"]},
+        )
+
+    def _validation_failure(self, ctx: PipelineContext, exc: ValueError):
+        metrics.inc("llm_structured_output_failures_total", agent=AGENT_NAME, reason="validation")
+        parsed = ctx["parse"][0]
+        logger.exception("LLM response failed validation", error=str(exc), payload=parsed)
+        return self._error(
+            ctx,
+            "Invalid time conversion received from model.",
+            {"error": str(exc), "raw": parsed},
+        )
 
+    async def warm_up(self, *, synthetic_requests: int = 0) -> Dict[str, Any]:
+        """Precompute schemas, zone tables and lookups before taking traffic."""
+        from app.agents.schedule_time.warmup import warm_up_agent
+
+        return await warm_up_agent(self, synthetic_requests=synthetic_requests)
+
+    async def _degraded_result(self, ctx: PipelineContext, circuit: CircuitOpen):
+        """Answer without the LLM while its circuit is open, or fail fast."""
+        request: TimeRequest = ctx["request"]
+        time_response = interpret_locally(
+            request.expression,
+            default_timezone=request.source_timezone,
+            target_timezones=request.target_timezones,
+            reference=request.reference,
+        )
+        if time_response is None:
+            metrics.inc("degraded_responses_total", agent=AGENT_NAME, outcome="rejected")
+            return self._error(
+                ctx,
+                "Time interpretation is temporarily unavailable; "
+                f"try again in {max(1, round(circuit.retry_after))}s.",
+                {"circuit": circuit.name, "retry_after": round(circuit.retry_after, 1)},
+            )
+        metrics.inc("degraded_responses_total", agent=AGENT_NAME, outcome="local")
+        logger.info("Served degraded local conversion", circuit=circuit.name)
+        await asyncio.to_thread(
+            self.memory.remember, ctx.context_id, request.expression, time_response
+        )
+        return build_task_result(
+            message=ctx.message,
+            context_id=ctx.context_id,
+            task_id=ctx.task_id,
+            text_parts=[time_response.output_text],
+            data_parts=[{"time_conversion": time_response.model_dump(), "degraded": True}],
+        )
+
+    def _recurrence_result(
+        self,
+        ctx: PipelineContext,
+        rule: RecurrenceRule,
+        target_timezones: List[str],
+        *,
+        start_index: int = 0,
+        source: str,
+    ):
+        metadata = ctx.message.metadata or {}
+        try:
+            page_size = int(metadata.get("page_size") or settings.recurrence_page_size)
+        except (TypeError, ValueError):
+            page_size = settings.recurrence_page_size
+        page_size = max(1, min(page_size, settings.recurrence_max_page_size))
+        occurrences, next_cursor = expand_page(
+            rule, target_timezones, start_index=start_index, page_size=page_size
+        )
+        metrics.inc("recurrence_pages_total", agent=AGENT_NAME, source=source)
+        logger.info(
+            "Expanded recurrence page",
+            source=source,
+            start_index=start_index,
+            occurrences=len(occurrences),
+        )
+        text = describe_rule(rule)
+        if occurrences:
+            first, last = occurrences[0]["index"] + 1, occurrences[-1]["index"] + 1
+            text += f". Occurrences {first}-{last}"
+            text += " (more available)." if next_cursor else "."
+        else:
+            text += ". No further occurrences."
+        return build_task_result(
+            message=ctx.message,
+            context_id=ctx.context_id,
+            task_id=ctx.task_id,
+            text_parts=[text],
+            data_parts=[
+                {
+                    "recurrence": {
+                        "rule": rule.model_dump(exclude_none=True),
+                        "target_timezones": target_timezones,
+                        "occurrences": occurrences,
+                        "next_cursor": next_cursor,
+                    }
+                }
+            ],
+        )
+
+    @staticmethod
+    def _conversion_result(ctx: PipelineContext, time_response: TimeNLConvertResponse):
+        return build_task_result(
+            message=ctx.message,
+            context_id=ctx.context_id,
+            task_id=ctx.task_id,
+            text_parts=[time_response.output_text],
+            data_parts=[{"time_conversion": time_response.model_dump()}],
+        )
+
+    @staticmethod
+    def _record_repair(repair: RepairReport) -> None:
+        if repair.json_repaired:
+            metrics.inc("llm_structured_output_repairs_total", agent=AGENT_NAME, kind="json")
+        if repair.normalized_fields:
+            metrics.inc("llm_structured_output_repairs_total", agent=AGENT_NAME, kind="normalize")
+        if repair.recomputed_targets:
+            metrics.inc("llm_structured_output_repairs_total", agent=AGENT_NAME, kind="recompute")
+            metrics.inc(
+                "llm_recomputed_targets_total",
+                len(repair.recomputed_targets),
+                agent=AGENT_NAME,
+            )
+        if repair.changed:
+            logger.info(
+                "Repaired LLM structured output",
+                json_repaired=repair.json_repaired,
+                normalized=repair.normalized_fields,
+                recomputed=repair.recomputed_targets,
+            )
+
+    def _handle_meeting_request(
+        self,
+        message: A2AMessage,
+        request: Dict[str, Any],
+        *,
+        context_id: Optional[str],
+        task_id: Optional[str],
+    ):
+        """Compute ranked meeting windows locally from ``metadata.meeting``."""
         try:
-            parsed = json.loads(final_content)
-        except json.JSONDecodeError as exc:
-            logger.exception("Failed to decode LLM JSON response", error=str(exc))
+            range_timezone = request.get("timezone") or (message.metadata or {}).get(
+                "source_timezone", self.default_timezone
+            )
+            ZoneInfo(range_timezone)
+            default_start = _parse_clock(request.get("work_start"), time(9, 0))
+            default_end = _parse_clock(request.get("work_end"), time(17, 0))
+            entries = request.get("participants") or []
+            if not isinstance(entries, list):
+                raise TypeError("participants must be a list")
+            participants, unresolved = self._resolve_participants(
+                entries, default_start, default_end
+            )
+            start_date = (
+                date.fromisoformat(request["start_date"])
+                if request.get("start_date")
+                else datetime.now(ZoneInfo(range_timezone)).date()
+            )
+            end_date = (
+                date.fromisoformat(request["end_date"])
+                if request.get("end_date")
+                else start_date + timedelta(days=6)
+            )
+            duration = int(request.get("duration_minutes", 30))
+            limit = int(request.get("limit", 5))
+            min_attendees = request.get("min_attendees")
+            min_attendees = int(min_attendees) if min_attendees is not None else None
+            if not 1 <= duration <= MAX_MEETING_DURATION_MINUTES:
+                raise ValueError(
+                    f"duration_minutes must be between 1 and {MAX_MEETING_DURATION_MINUTES}"
+                )
+            if not 1 <= limit <= MAX_MEETING_WINDOWS:
+                raise ValueError(f"limit must be between 1 and {MAX_MEETING_WINDOWS}")
+            if min_attendees is not None and min_attendees < 1:
+                raise ValueError("min_attendees must be at least 1")
+            weekdays_only = request.get("weekdays_only", True)
+            if not isinstance(weekdays_only, bool):
+                raise ValueError("weekdays_only must be true or false")
+        except (KeyError, TypeError, ValueError, ZoneInfoNotFoundError) as exc:
             return build_error_result(
                 message=message,
-                error_message="Failed to parse time conversion response.",
+                error_message="Invalid meeting window request.",
                 context_id=context_id,
                 task_id=task_id,
-                data={"error": str(exc), "raw": final_content},
+                data={"error": str(exc)},
             )
 
-        try:
-            time_response = TimeNLConvertResponse.model_validate(parsed)
-        except Exception as exc:
-            logger.exception(
-                "LLM response failed validation", error=str(exc), payload=parsed
+        if unresolved or not participants:
+            return build_error_result(
+                message=message,
+                error_message="Could not resolve a timezone for every participant.",
+                context_id=context_id,
+                task_id=task_id,
+                data={"unresolved": unresolved},
             )
+        if end_date < start_date or (end_date - start_date).days > 92:
             return build_error_result(
                 message=message,
-                error_message="Invalid time conversion received from model.",
+                error_message="Meeting window date range must span 0-92 days.",
                 context_id=context_id,
                 task_id=task_id,
-                data={"error": str(exc), "raw": parsed},
             )
+
+        windows = find_meeting_windows(
+            participants,
+            start_date=start_date,
+            end_date=end_date,
+            duration_minutes=duration,
+            range_timezone=range_timezone,
+            min_attendees=min_attendees,
+            weekdays_only=weekdays_only,
+            limit=limit,
+        )
+        zones = list(dict.fromkeys(participant.timezone for participant in participants))
         logger.info(
-            "Successfully built time conversion result",
-            targets=[target.timezone for target in time_response.targets],
+            "Computed meeting windows",
+            participants=len(participants),
+            days=(end_date - start_date).days + 1,
+            windows=len(windows),
         )
+        if not windows:
+            text = "No common availability found in the requested range."
+        else:
+            best = window_to_conversion(
+                windows[0], source_timezone=range_timezone, target_timezones=zones
+            )
+            text = f"Found {len(windows)} meeting window(s). Best: {best.output_text}."
+        data_parts = [
+            {
+                "meeting_window": {
+                    "rank": rank,
+                    "start_utc": window.start.isoformat(),
+                    "end_utc": window.end.isoformat(),
+                    "duration_minutes": window.duration_minutes,
+                    "attendees": window.attendees,
+                    "missing": window.missing,
+                },
+                "time_conversion": window_to_conversion(
+                    window, source_timezone=range_timezone, target_timezones=zones
+                ).model_dump(),
+            }
+            for rank, window in enumerate(windows, start=1)
+        ]
         return build_task_result(
             message=message,
             context_id=context_id,
             task_id=task_id,
-            text_parts=[parsed.get("output_text", "")],
-            data_parts=[{"time_conversion": time_response.model_dump()}],
+            text_parts=[text],
+            data_parts=data_parts,
         )
+
+    def _resolve_participants(
+        self, entries: List[Any], default_start: time, default_end: time
+    ):
+        participants: List[Participant] = []
+        unresolved: List[str] = []
+        seen: Set[str] = set()
+        for position, entry in enumerate(entries, start=1):
+            spec = entry if isinstance(entry, dict) else {"id": str(entry)}
+            identifier = str(spec.get("id") or spec.get("timezone") or "")
+            if identifier in seen:
+                # Two people given only "Europe/London" must stay two attendees.
+                identifier = f"{identifier}#{position}"
+            seen.add(identifier)
+            explicit = spec.get("timezone")
+            if explicit:
+                # An explicit zone must be real; place names are accepted too.
+                explicit = str(explicit)
+                zone = explicit if is_valid_zone(explicit) else place_resolver.zone_for(explicit)
+            else:
+                zone = self._resolve_zone(identifier)
+            if not zone:
+                unresolved.append(identifier)
+                continue
+            participants.append(
+                Participant(
+                    id=identifier,
+                    timezone=zone,
+                    work_start=_parse_clock(spec.get("work_start"), default_start),
+                    work_end=_parse_clock(spec.get("work_end"), default_end),
+                )
+            )
+        return participants, unresolved
+
+    def _resolve_zone(self, identifier: str) -> Optional[str]:
+        """Map a zone name, profile handle, Slack ID or place name to an IANA timezone."""
+        if not identifier:
+            return None
+        try:
+            ZoneInfo(identifier)
+            return identifier
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+        profile = self.profiles.get(identifier)
+        if profile is not None:
+            return profile.timezone
+        zone = get_timezone(identifier)
+        if zone != "Slack ID not found":
+            return zone
+        return place_resolver.zone_for(identifier)
+
+
+@lru_cache(maxsize=None)
+def _intent_schema() -> Dict[str, Any]:
+    return json_schema_response("intent-response", IntentResponse.model_json_schema())
+
+
+@lru_cache(maxsize=None)
+def _response_schema() -> Dict[str, Any]:
+    return json_schema_response(
+        "time-conversion-response", TimeNLConvertResponse.model_json_schema()
+    )
+
+
+@lru_cache(maxsize=None)
+def _recurrence_schema() -> Dict[str, Any]:
+    return json_schema_response(
+        "recurrence-rule", RecurrenceInterpretation.model_json_schema()
+    )
+
+
+def _parse_clock(value: Optional[str], default: time) -> time:
+    return time.fromisoformat(value) if value else default
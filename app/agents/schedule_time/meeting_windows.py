@@ -0,0 +1,163 @@
+"""Deterministic meeting-window search across participants' time zones.
+
+Each participant's working hours are expanded into UTC intervals day by day
+in their own zone (so DST transitions shift the UTC edges on the right
+dates), then a single sweep line over all interval edges finds the spans
+where enough participants overlap. Cost is O(P * D * log(P * D)) for P
+participants over D days, with no LLM involvement.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.shared.conversion import format_clock, get_zone
+from models.time_conversion import TimeNLConvertResponse, TimeSource, TimeTarget
+
+UTC = timezone.utc
+
+
+@dataclass(frozen=True)
+class Participant:
+    id: str
+    timezone: str
+    work_start: time = time(9, 0)
+    work_end: time = time(17, 0)
+
+
+@dataclass
+class MeetingWindow:
+    start: datetime
+    end: datetime
+    attendees: List[str]
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def duration_minutes(self) -> int:
+        return int((self.end - self.start).total_seconds() // 60)
+
+
+def _working_intervals(
+    participant: Participant, first_day: date, last_day: date, weekdays_only: bool
+) -> Iterable[Tuple[datetime, datetime]]:
+    zone = get_zone(participant.timezone)
+    day = first_day
+    while day <= last_day:
+        if not weekdays_only or day.weekday() < 5:
+            start = datetime.combine(day, participant.work_start, tzinfo=zone)
+            end_day = day if participant.work_end > participant.work_start else day + timedelta(days=1)
+            end = datetime.combine(end_day, participant.work_end, tzinfo=zone)
+            yield start.astimezone(UTC), end.astimezone(UTC)
+        day += timedelta(days=1)
+
+
+def find_meeting_windows(
+    participants: Sequence[Participant],
+    *,
+    start_date: date,
+    end_date: date,
+    duration_minutes: int = 30,
+    range_timezone: str = "UTC",
+    min_attendees: Optional[int] = None,
+    weekdays_only: bool = True,
+    limit: int = 10,
+) -> List[MeetingWindow]:
+    """Return common availability windows, best first.
+
+    A window is a maximal span during which the same set of participants is
+    available. Windows are ranked by attendance, then length, then start
+    time. Unless ``min_attendees`` is given, every participant must attend.
+    """
+    if not participants:
+        return []
+    required = len(participants) if min_attendees is None else max(1, min_attendees)
+    range_zone = get_zone(range_timezone)
+    range_start = datetime.combine(start_date, time.min, tzinfo=range_zone).astimezone(UTC)
+    range_end = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=range_zone).astimezone(UTC)
+    min_length = timedelta(minutes=duration_minutes)
+
+    # Local calendars can be up to a day ahead of or behind the range zone.
+    first_day, last_day = start_date - timedelta(days=1), end_date + timedelta(days=1)
+    # Availability is tracked by position, so participants that share an id
+    # (two people given only the same zone) still count separately.
+    events: List[Tuple[datetime, int, int]] = []
+    for position, participant in enumerate(participants):
+        for start, end in _working_intervals(participant, first_day, last_day, weekdays_only):
+            start, end = max(start, range_start), min(end, range_end)
+            if start < end:
+                # Ends sort before starts at the same instant (-1 < +1), so
+                # back-to-back shifts do not create zero-length overlaps.
+                events.append((start, 1, position))
+                events.append((end, -1, position))
+    events.sort()
+
+    available: Dict[int, int] = {}
+    segments: List[MeetingWindow] = []
+    index = 0
+    while index < len(events):
+        instant = events[index][0]
+        while index < len(events) and events[index][0] == instant:
+            _, delta, position = events[index]
+            count = available.get(position, 0) + delta
+            if count:
+                available[position] = count
+            else:
+                available.pop(position, None)
+            index += 1
+        if index == len(events) or len(available) < required:
+            continue
+        next_instant = events[index][0]
+        attendees = [participants[position].id for position in sorted(available)]
+        last = segments[-1] if segments else None
+        if last is not None and last.end == instant and last.attendees == attendees:
+            last.end = next_instant
+            continue
+        segments.append(
+            MeetingWindow(
+                start=instant,
+                end=next_instant,
+                attendees=attendees,
+                missing=[
+                    participant.id
+                    for position, participant in enumerate(participants)
+                    if position not in available
+                ],
+            )
+        )
+
+    windows = [window for window in segments if window.end - window.start >= min_length]
+    windows.sort(key=lambda window: (-len(window.attendees), -(window.end - window.start), window.start))
+    return windows[:limit]
+
+
+def window_to_conversion(
+    window: MeetingWindow,
+    *,
+    source_timezone: str,
+    target_timezones: Sequence[str],
+) -> TimeNLConvertResponse:
+    """Express a window's start as a ``TimeNLConvertResponse`` across zones."""
+    source_start = window.start.astimezone(get_zone(source_timezone))
+    targets = []
+    for zone_name in target_timezones:
+        local = window.start.astimezone(get_zone(zone_name))
+        targets.append(
+            TimeTarget(timezone=zone_name, date=local.date().isoformat(), time=format_clock(local))
+        )
+    source_end = window.end.astimezone(get_zone(source_timezone))
+    return TimeNLConvertResponse(
+        input_text=f"Meeting window {window.start.isoformat()} – {window.end.isoformat()}",
+        output_text=(
+            f"{format_clock(source_start)}–{format_clock(source_end)} {source_timezone} on "
+            f"{source_start.date().isoformat()} ({window.duration_minutes} min, "
+            f"{len(window.attendees)} available)"
+        ),
+        source=TimeSource(
+            timezone=source_timezone,
+            date=source_start.date().isoformat(),
+            time=format_clock(source_start),
+        ),
+        targets=targets,
+    )
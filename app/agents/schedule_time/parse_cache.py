@@ -0,0 +1,245 @@
+"""Cache of the model's interpretation of an expression, independent of targets.
+
+The exact-match completion cache misses whenever the same expression arrives
+with different ``target_timezones`` or at a different time of day. This
+cache stores only what the model contributes — the source zone and the
+resolved instant — keyed on the normalized expression, and target
+conversions are derived locally with the conversion engine. Relative
+expressions are stored in relative form and re-anchored to the current
+reference time on the way out:
+
+- ``absolute``: the expression names a calendar date; the instant is reused.
+- ``offset``: "in 2 hours", "now"; stored as seconds from the reference time.
+- ``day``: "tomorrow", "3pm Lagos" (implicitly today), "3pm in 2 days";
+  stored as a day offset from the reference date plus the wall-clock time.
+
+Expressions relative to the calendar week ("next Monday") are stored in the
+``day`` form but keyed per reference date, since their day offset changes
+from one day to the next. Anything else ("Christmas at 3pm", "end of the
+month") is ``uncacheable``: it is neither looked up nor stored.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Sequence
+
+from app.agents.schedule_time.repair import describe_conversion
+from app.config import settings
+from app.shared.conversion import (
+    conversion_engine,
+    format_clock,
+    get_zone,
+    is_valid_zone,
+    localize_wall_time,
+)
+from app.shared.places import place_resolver
+from app.shared.store import SharedStore, shared_store
+from models.time_conversion import TimeNLConvertResponse, TimeSource
+
+PARSE_NAMESPACE = "parse"
+
+_MONTHS = (
+    "jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec|january|february|march|april"
+    "|june|july|august|september|october|november|december"
+)
+_EXPLICIT_DATE_RE = re.compile(
+    rf"\b(?:{_MONTHS})\b|\b\d{{4}}-\d{{1,2}}-\d{{1,2}}\b|\b\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?\b"
+    r"|\b\d{1,2}(?:st|nd|rd|th)\b"
+)
+_OFFSET_RE = re.compile(
+    r"\b(?:now|ago|from now)\b"
+    r"|\bin\s+(?:\d+|an?|half an|a couple of)\s+(?:sec|second|min|minute|hr|hour|day|week)s?\b"
+)
+# "in 2 days" with a clock time names a wall-clock time on a later day.
+_DAY_OFFSET_RE = re.compile(r"\bin\s+(?:\d+|an?|a couple of)\s+(?:day|week)s?\b")
+_CLOCK_RE = re.compile(r"\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b|\b\d{1,2}:\d{2}\b|\b(?:noon|midnight)\b")
+_WEEK_RELATIVE_RE = re.compile(
+    r"\b(?:mon|tue|tues|wed|thu|thur|thurs|fri|sat|sun)(?:day)?\b"
+    r"|\b(?:next|last|this|coming)\s+(?:week|weekend|month|year)\b"
+)
+_DAY_WORD_RE = re.compile(r"\b(?:yesterday|today|tonight|tomorrow)\b")
+# Words that may surround a plain "3pm Lagos"-style expression without
+# changing which day it names.
+_FILLER_WORDS = frozenset(
+    "a am and as at be convert converted do does for from good hour in is it local me morning"
+    " afternoon evening night meet meeting of on please pm the their there time times to"
+    " what whats when will with".split()
+)
+_WORD_RE = re.compile(r"[^\W_]+")
+# Named days that would otherwise read as places ("Christmas" Island).
+_HOLIDAY_RE = re.compile(
+    r"\b(?:christmas|xmas|easter|thanksgiving|halloween|new year'?s?|valentine'?s?|eid|diwali"
+    r"|hanukkah|ramadan|boxing day|labou?r day|memorial day|independence day|holidays?)\b"
+)
+
+
+def normalize_expression(expression: str) -> str:
+    return " ".join(expression.lower().split()).strip(" ?.!")
+
+
+def _names_only_today_relative_day(expression: str) -> bool:
+    """Whether nothing but places, a clock time, a day word and filler remains."""
+    if _HOLIDAY_RE.search(normalize_expression(expression)):
+        return False
+    text = expression
+    for match in place_resolver.find(expression):
+        text = text.replace(match.query, " ", 1)
+    text = normalize_expression(text)
+    for pattern in (_DAY_OFFSET_RE, _CLOCK_RE, _DAY_WORD_RE):
+        text = pattern.sub(" ", text)
+    return all(word in _FILLER_WORDS for word in _WORD_RE.findall(text))
+
+
+def classify_expression(expression: str) -> str:
+    """Return ``offset``, ``absolute``, ``week``, ``day`` or ``uncacheable``."""
+    text = normalize_expression(expression)
+    if _DAY_OFFSET_RE.search(text) and _CLOCK_RE.search(text):
+        return "day" if _names_only_today_relative_day(expression) else "uncacheable"
+    if _OFFSET_RE.search(text):
+        return "offset"
+    if _EXPLICIT_DATE_RE.search(text):
+        return "absolute"
+    if _WEEK_RELATIVE_RE.search(text):
+        return "week"
+    return "day" if _names_only_today_relative_day(expression) else "uncacheable"
+
+
+@dataclass
+class Interpretation:
+    """The model's reading of an expression, in re-anchorable form."""
+
+    kind: str
+    source_timezone: str
+    date: Optional[str] = None
+    time: Optional[str] = None
+    day_offset: int = 0
+    offset_seconds: int = 0
+    targets: Optional[List[str]] = None
+
+    def resolve(self, reference: datetime) -> datetime:
+        """Return the source instant for this interpretation at ``reference``."""
+        if self.kind == "offset":
+            anchor = reference.replace(second=0, microsecond=0)
+            return (anchor + timedelta(seconds=self.offset_seconds)).astimezone(
+                get_zone(self.source_timezone)
+            )
+        day = date.fromisoformat(self.date)
+        if self.kind != "absolute":
+            local_today = reference.astimezone(get_zone(self.source_timezone)).date()
+            day = local_today + timedelta(days=self.day_offset)
+        return localize_wall_time(day, self.time, self.source_timezone)
+
+
+class ParseCache:
+    """Shared-store cache of interpretations keyed on the normalized expression."""
+
+    def __init__(self, store: SharedStore, *, ttl: Optional[float] = 86400.0) -> None:
+        self.store = store
+        self.ttl = ttl
+
+    def _key(self, expression: str, default_timezone: str, reference: datetime) -> str:
+        bucket = ""
+        if classify_expression(expression) == "week":
+            bucket = reference.astimezone(get_zone(default_timezone)).date().isoformat()
+        return json.dumps([normalize_expression(expression), default_timezone, bucket])
+
+    def lookup(
+        self, expression: str, *, default_timezone: str, reference: datetime
+    ) -> Optional[Interpretation]:
+        if not self.ttl or classify_expression(expression) == "uncacheable":
+            return None
+        payload = self.store.get(
+            PARSE_NAMESPACE, self._key(expression, default_timezone, reference)
+        )
+        return Interpretation(**payload) if payload else None
+
+    def remember(
+        self,
+        expression: str,
+        response: TimeNLConvertResponse,
+        *,
+        default_timezone: str,
+        reference: datetime,
+        requested_targets: Sequence[str],
+        named_targets: Sequence[str] = (),
+    ) -> Optional[Interpretation]:
+        """Store the interpretation behind ``response``; skipped when not reusable.
+
+        ``named_targets`` are the zones of places mentioned in the expression;
+        when any besides the source are named they replace the requested
+        targets. A response whose targets differ from what was asked for is
+        not stored, so a target the model dropped is not dropped for every
+        later request with the same text.
+        """
+        if not self.ttl:
+            return None
+        zones = [target.timezone for target in response.targets]
+        source = response.source
+        if not is_valid_zone(source.timezone) or not all(map(is_valid_zone, zones)):
+            return None
+        named = [zone for zone in named_targets if zone != source.timezone]
+        if set(zones) != set(named or requested_targets):
+            return None
+        try:
+            instant = localize_wall_time(source.date, source.time, source.timezone)
+        except ValueError:
+            return None
+
+        kind = classify_expression(expression)
+        if kind == "uncacheable":
+            return None
+        interpretation = Interpretation(
+            kind="day" if kind == "week" else kind,
+            source_timezone=source.timezone,
+            date=source.date,
+            time=source.time,
+            # Targets named in the expression itself are part of the
+            # interpretation; the request's default targets are not.
+            targets=zones if named else None,
+        )
+        if kind == "offset":
+            anchor = reference.replace(second=0, microsecond=0)
+            interpretation.offset_seconds = int((instant - anchor).total_seconds())
+        elif kind != "absolute":
+            local_today = reference.astimezone(get_zone(source.timezone)).date()
+            interpretation.day_offset = (date.fromisoformat(source.date) - local_today).days
+        self.store.set(
+            PARSE_NAMESPACE,
+            self._key(expression, default_timezone, reference),
+            asdict(interpretation),
+            ttl=self.ttl,
+        )
+        return interpretation
+
+
+def build_cached_response(
+    expression: str,
+    interpretation: Interpretation,
+    *,
+    reference: datetime,
+    target_timezones: Sequence[str],
+) -> Optional[TimeNLConvertResponse]:
+    """Derive a full response locally, or ``None`` if a target zone is unknown."""
+    zones = list(interpretation.targets or target_timezones)
+    if not zones or not all(map(is_valid_zone, zones)):
+        return None
+    instant = interpretation.resolve(reference)
+    source = TimeSource(
+        timezone=interpretation.source_timezone,
+        date=instant.date().isoformat(),
+        time=format_clock(instant),
+    )
+    targets = [target.model_dump() for target in conversion_engine.convert(instant, zones)]
+    return TimeNLConvertResponse(
+        input_text=expression,
+        output_text=describe_conversion(source.model_dump(), targets),
+        source=source,
+        targets=targets,
+    )
+
+
+parse_cache = ParseCache(shared_store, ttl=settings.parse_cache_ttl)
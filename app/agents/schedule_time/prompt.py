@@ -1,6 +1,6 @@
 import json
 from datetime import datetime
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 # SYSTEM_PROMPT = """
 # You are a time conversion agent. Extract the date and time from natural language text.
@@ -72,7 +72,7 @@ INPUT:
 
 Instructions:
 1. Identify exactly which time zones the user wants. If a Slack ID is mentioned, resolve it with get_timezone and treat that resolved zone as a requested target. Do not add extra target zones the user did not ask for. If the user never specifies any target zone, then fall back to the provided default target_timezones list.
-2. Use the resolved source and requested target time zones to perform the conversion.
+2. Use the resolved source and requested target time zones to perform the conversion. When a convert_time result is available, copy its targets verbatim instead of computing them yourself.
 3. Produce a JSON object that matches the provided schema exactly. Populate:
    - input_text with the original request,
    - source and targets with only the time data the user asked for,
@@ -90,6 +90,9 @@ INPUT:
 
 1. **Tool Call**: This should be used if the user asks for a time zone lookup for a **specific Slack ID**.
    Example input: "What is the timezone for Slack ID U12345678?"
+   It should also be used when a time must be converted into many target time zones (more than three),
+   so the convert_time tool can compute them in a single batched call.
+   Example input: "Show 3pm Lagos in every US, EU and APAC office time zone."
 2. **Normal Request**: This is used for regular time conversion queries, where the user asks to convert a specific time from one time zone to another.
    Example input: "What is 3pm in London in New York and Dubai?"
 
@@ -105,6 +108,41 @@ or
 
 
 
+RECURRENCE_PROMPT = """
+Reduce this recurring schedule request to a single recurrence rule. Do not list occurrences.
+
+INPUT:
+{expression} - The user's natural-language request.
+{source_timezone} - Default time zone of the schedule when the user names none.
+{target_timezones} - Time zones to convert into when the user names none.
+{reference_time} - ISO 8601 timestamp; "next year", "from tomorrow" etc. are relative to it.
+
+Instructions:
+1. frequency is daily, weekly or monthly; interval is 2 for "every other", 3 for "every third", and so on.
+   Weekly rules list weekdays as numbers, 0 = Monday ... 6 = Sunday; "every weekday" is weekly on 0-4.
+2. time is the wall-clock time in h:mm AM/PM and timezone the IANA zone it is in.
+3. start_date is the first date the series may occur (YYYY-MM-DD). Express "for the next year" or
+   "until June" as until, and "10 sessions" as count; leave both empty for open-ended series.
+4. target_timezones lists the IANA zones the user asked to see each occurrence in.
+5. Respond with JSON matching the schema only.
+"""
+
+
+CONVERSATION_CONTEXT_PROMPT = """
+This request continues an earlier conversation. Previously resolved times are listed below.
+If the request is a follow-up (e.g. "and what about Tokyo?"), reuse the most recent source time
+and apply the user's change instead of asking for the time again.
+
+{conversation}
+"""
+
+
+RESOLVED_PLACES_PROMPT = """
+Place names in the request have already been resolved to IANA time zones. Use these zones as-is:
+{places}
+"""
+
+
 def build_interpretation_prompt(
     expression: str,
     *,
@@ -112,8 +150,10 @@ def build_interpretation_prompt(
     target_timezones: Iterable[str],
     reference_time: Optional[datetime] = None,
     tools: Optional[List[dict]] = None,
+    conversation_context: Optional[str] = None,
+    resolved_places: Optional[Dict[str, str]] = None,
 ) -> List[dict]:
-    
+
     user_prompt = USER_PROMPT.format(
         expression=expression,
         source_timezone=source_timezone,
@@ -122,7 +162,44 @@ def build_interpretation_prompt(
         tools=json.dumps(tools) if tools else None,
     )
 
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if conversation_context:
+        messages.append(
+            {
+                "role": "system",
+                "content": CONVERSATION_CONTEXT_PROMPT.format(
+                    conversation=conversation_context
+                ),
+            }
+        )
+    if resolved_places:
+        messages.append(
+            {
+                "role": "system",
+                "content": RESOLVED_PLACES_PROMPT.format(
+                    places="\n".join(f"{place}: {zone}" for place, zone in resolved_places.items())
+                ),
+            }
+        )
+    messages.append({"role": "user", "content": user_prompt})
+    return messages
+
+
+def build_recurrence_prompt(
+    expression: str,
+    *,
+    source_timezone: str,
+    target_timezones: Iterable[str],
+    reference_time: datetime,
+) -> List[dict]:
     return [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": user_prompt},
+        {
+            "role": "user",
+            "content": RECURRENCE_PROMPT.format(
+                expression=expression,
+                source_timezone=source_timezone,
+                target_timezones=", ".join(target_timezones),
+                reference_time=reference_time.isoformat(),
+            ),
+        }
     ]
@@ -0,0 +1,302 @@
+"""Recurring schedules: one compact rule, occurrences expanded lazily in pages.
+
+A request such as "every other Tuesday at 3pm Lagos for the next year" is
+reduced once to a ``RecurrenceRule`` (by ``parse_recurrence`` or, failing
+that, the LLM). Occurrences are never materialized as a whole series: the
+n-th occurrence date is computed directly from the rule, so a page costs
+the same whether it is the first or the five-hundredth, and
+``iter_occurrences`` generates only as many as the caller consumes.
+
+Each occurrence keeps the rule's wall-clock time in its own zone, so UTC
+offsets follow DST. A time that does not exist on a given day (inside a
+spring-forward gap) moves forward by the gap and is flagged ``nonexistent``;
+a repeated time (fall-back) uses its first instance and is flagged
+``ambiguous``.
+
+Cursors are self-contained (rule, targets and next index, base64-encoded),
+so any worker can serve the next page without shared state.
+"""
+
+from __future__ import annotations
+
+import base64
+import calendar
+import json
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+
+from app.agents.schedule_time.fallback import find_clock, find_zones
+from app.shared.conversion import (
+    conversion_engine,
+    format_clock,
+    get_zone,
+    is_valid_zone,
+    parse_clock,
+)
+from models.time_conversion import RecurrenceRule
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_WEEKDAY_NAMES = (
+    "monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    "|mon|tues|tue|wed|thurs|thur|thu|fri|sat|sun"
+)
+_WEEKDAY_RE = re.compile(rf"\b({_WEEKDAY_NAMES})s?\b", re.IGNORECASE)
+_INTERVAL_RE = re.compile(
+    r"\bevery\s+(?:(other)|(\d+)(?:st|nd|rd|th)?|(second|third|fourth))?\s*"
+    rf"(weekday|day|week|month|morning|evening|{_WEEKDAY_NAMES})s?\b",
+    re.IGNORECASE,
+)
+_RECURRING_RE = re.compile(
+    r"\b(?:daily|weekly|monthly|fortnightly)\b|\b(?:every|each)\s+(?:other\s+|\d+\s*(?:st|nd|rd|th)?\s+|"
+    rf"second\s+|third\s+|fourth\s+)?(?:weekday|day|week|month|morning|evening|{_WEEKDAY_NAMES})s?\b",
+    re.IGNORECASE,
+)
+# "the first Monday of each month" has no equivalent in ``RecurrenceRule``'s fields.
+_NTH_WEEKDAY_RE = re.compile(
+    rf"\bthe\s+(?:first|second|third|fourth|last)\s+(?:weekday|{_WEEKDAY_NAMES})\b", re.IGNORECASE
+)
+_PERIODIC = {"daily": "day", "weekly": "week", "monthly": "month", "fortnightly": "week"}
+_FOR_NEXT_RE = re.compile(
+    r"\bfor\s+(?:the\s+)?(?:next\s+)?(a|an|one|\d+)?\s*(day|week|month|year)s?\b", re.IGNORECASE
+)
+_UNTIL_RE = re.compile(r"\b(?:until|till|through)\s+(\d{4}-\d{2}-\d{2})\b", re.IGNORECASE)
+_START_RE = re.compile(r"\b(?:starting|from|beginning)\s+(?:on\s+)?(\d{4}-\d{2}-\d{2})\b", re.IGNORECASE)
+_COUNT_RE = re.compile(r"\b(\d+)\s+(?:times|occurrences|sessions|meetings)\b", re.IGNORECASE)
+_MONTH_DAY_RE = re.compile(r"\bon\s+the\s+(\d{1,2})(?:st|nd|rd|th)\b", re.IGNORECASE)
+_ORDINALS = {"other": 2, "second": 2, "third": 3, "fourth": 4}
+
+
+def looks_recurring(expression: str) -> bool:
+    return bool(_RECURRING_RE.search(expression))
+
+
+def _weekday_number(name: str) -> int:
+    return [day[:3] for day in _WEEKDAYS].index(name[:3].lower())
+
+
+def _add_months(day: date, months: int, month_day: Optional[int] = None) -> date:
+    """``day`` moved by ``months``, clamped to the end of shorter months."""
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    last = calendar.monthrange(year, month + 1)[1]
+    return date(year, month + 1, min(month_day or day.day, last))
+
+
+def parse_recurrence(
+    expression: str,
+    *,
+    default_timezone: str,
+    reference: datetime,
+) -> Optional[Tuple[RecurrenceRule, List[str]]]:
+    """Read a rule and target zones from common phrasings, or return ``None``."""
+    interval_match = _INTERVAL_RE.search(expression)
+    lowered = expression.lower()
+    clock = find_clock(expression)
+    if clock is None or _NTH_WEEKDAY_RE.search(expression):
+        return None
+    if interval_match:
+        other, number, ordinal = interval_match.group(1, 2, 3)
+        interval = int(number) if number else _ORDINALS.get((other or ordinal or "").lower(), 1)
+        unit = interval_match.group(4).lower()
+        if unit in ("morning", "evening"):
+            unit = "day"
+    else:
+        periodic = next((word for word in _PERIODIC if re.search(rf"\b{word}\b", lowered)), None)
+        if periodic is None:
+            return None
+        interval, unit = (2 if periodic == "fortnightly" else 1), _PERIODIC[periodic]
+    if interval < 1:
+        return None
+
+    weekdays = sorted(
+        {_weekday_number(match.group(1)) for match in _WEEKDAY_RE.finditer(expression)}
+    )
+    zones = find_zones(expression)
+    source_zone = zones[0] if zones else default_timezone
+    today = reference.astimezone(get_zone(source_zone)).date()
+    start_match = _START_RE.search(expression)
+    start = date.fromisoformat(start_match.group(1)) if start_match else today
+
+    if unit == "weekday":
+        frequency, weekdays = "weekly", [0, 1, 2, 3, 4]
+    elif unit == "day" and not weekdays:
+        frequency = "daily"
+    elif unit != "month":
+        frequency = "weekly"
+        weekdays = weekdays or [start.weekday()]
+    else:
+        frequency = "monthly"
+    month_day = None
+    if frequency == "monthly":
+        day_match = _MONTH_DAY_RE.search(expression)
+        month_day = int(day_match.group(1)) if day_match else start.day
+        if not 1 <= month_day <= 31:
+            return None
+
+    until = None
+    count = None
+    until_match = _UNTIL_RE.search(expression)
+    for_match = _FOR_NEXT_RE.search(expression)
+    count_match = _COUNT_RE.search(expression)
+    if until_match:
+        until = date.fromisoformat(until_match.group(1))
+    elif for_match:
+        amount = for_match.group(1)
+        amount = 1 if amount is None or not amount.isdigit() else int(amount)
+        span = for_match.group(2).lower()
+        if span == "day":
+            until = start + timedelta(days=amount)
+        elif span == "week":
+            until = start + timedelta(weeks=amount)
+        else:
+            until = _add_months(start, amount * (12 if span == "year" else 1))
+    if count_match:
+        count = int(count_match.group(1))
+
+    rule = RecurrenceRule(
+        frequency=frequency,
+        interval=interval,
+        weekdays=weekdays if frequency == "weekly" else [],
+        month_day=month_day,
+        time=format_clock(clock),
+        timezone=source_zone,
+        start_date=start.isoformat(),
+        until=until.isoformat() if until else None,
+        count=count,
+    )
+    return rule, zones[1:]
+
+
+def nth_date(rule: RecurrenceRule, index: int) -> date:
+    """Date of occurrence ``index`` (0-based), in constant time."""
+    start = date.fromisoformat(rule.start_date)
+    if rule.frequency == "daily":
+        return start + timedelta(days=index * rule.interval)
+    if rule.frequency == "weekly":
+        weekdays = sorted(set(rule.weekdays)) or [start.weekday()]
+        # Days of the first week that fall before the start date are skipped.
+        position = index + sum(1 for day in weekdays if day < start.weekday())
+        block, slot = divmod(position, len(weekdays))
+        week_start = start - timedelta(days=start.weekday())
+        return week_start + timedelta(weeks=block * rule.interval, days=weekdays[slot])
+    month_day = rule.month_day or start.day
+    skip = 1 if _add_months(start, 0, month_day) < start else 0
+    return _add_months(start, (index + skip) * rule.interval, month_day)
+
+
+def occurrence_dates(rule: RecurrenceRule, start_index: int = 0) -> Iterator[Tuple[int, date]]:
+    """Yield ``(index, date)`` from ``start_index`` until the rule ends."""
+    until = date.fromisoformat(rule.until) if rule.until else None
+    index = start_index
+    while rule.count is None or index < rule.count:
+        try:
+            day = nth_date(rule, index)
+        except (OverflowError, ValueError):
+            return
+        if until is not None and day > until:
+            return
+        yield index, day
+        index += 1
+
+
+def _localize(day: date, clock: time, zone_name: str) -> Tuple[datetime, Optional[str]]:
+    zone = get_zone(zone_name)
+    wall = datetime.combine(day, clock)
+    instant = wall.replace(tzinfo=zone)
+    normalized = instant.astimezone(timezone.utc).astimezone(zone)
+    if normalized.replace(tzinfo=None) != wall:
+        # Inside a spring-forward gap: the clock jumps past this time.
+        return normalized, "nonexistent"
+    if instant.replace(fold=1).utcoffset() != instant.utcoffset():
+        return instant, "ambiguous"
+    return instant, None
+
+
+def iter_occurrences(
+    rule: RecurrenceRule,
+    target_timezones: Sequence[str],
+    *,
+    start_index: int = 0,
+) -> Iterator[Dict[str, Any]]:
+    """Lazily yield each occurrence with its conversions into ``target_timezones``."""
+    clock = parse_clock(rule.time)
+    for index, day in occurrence_dates(rule, start_index):
+        instant, dst = _localize(day, clock, rule.timezone)
+        occurrence: Dict[str, Any] = {
+            "index": index,
+            "source": {
+                "timezone": rule.timezone,
+                "date": instant.date().isoformat(),
+                "time": format_clock(instant),
+            },
+            "targets": [
+                target.model_dump() for target in conversion_engine.convert(instant, target_timezones)
+            ],
+        }
+        if dst:
+            occurrence["dst"] = dst
+        yield occurrence
+
+
+def expand_page(
+    rule: RecurrenceRule,
+    target_timezones: Sequence[str],
+    *,
+    start_index: int = 0,
+    page_size: int = 10,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of occurrences and the cursor for the next page (``None`` at the end)."""
+    page = list(islice(iter_occurrences(rule, target_timezones, start_index=start_index), page_size))
+    next_index = start_index + len(page)
+    if not page or next(occurrence_dates(rule, next_index), None) is None:
+        return page, None
+    return page, encode_cursor(rule, target_timezones, next_index)
+
+
+def encode_cursor(rule: RecurrenceRule, target_timezones: Sequence[str], index: int) -> str:
+    payload = {"r": rule.model_dump(exclude_none=True), "t": list(target_timezones), "i": index}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[RecurrenceRule, List[str], int]:
+    """Inverse of ``encode_cursor``; raises ``ValueError`` for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        rule = RecurrenceRule.model_validate(payload["r"])
+        targets = [str(zone) for zone in payload["t"]]
+        index = int(payload["i"])
+    except (ValueError, KeyError, TypeError, ValidationError) as exc:
+        raise ValueError(f"Invalid recurrence cursor: {exc}") from exc
+    if index < 0:
+        raise ValueError("Invalid recurrence cursor: negative index")
+    # Cursors come back from clients, so their zones are untrusted input.
+    unknown = [zone for zone in (rule.timezone, *targets) if not is_valid_zone(zone)]
+    if unknown:
+        raise ValueError(f"Invalid recurrence cursor: unknown timezone {', '.join(unknown)}")
+    return rule, targets, index
+
+
+def describe_rule(rule: RecurrenceRule) -> str:
+    unit = {"daily": "day", "weekly": "week", "monthly": "month"}[rule.frequency]
+    if rule.interval == 1:
+        text = f"Every {unit}"
+    elif rule.interval == 2:
+        text = f"Every other {unit}"
+    else:
+        text = f"Every {rule.interval} {unit}s"
+    if rule.frequency == "weekly":
+        text += " on " + ", ".join(_WEEKDAYS[day].capitalize() for day in sorted(set(rule.weekdays)))
+    elif rule.frequency == "monthly":
+        text += f" on day {rule.month_day}"
+    text += f" at {rule.time} {rule.timezone}, from {rule.start_date}"
+    if rule.until:
+        text += f" until {rule.until}"
+    if rule.count:
+        text += f", {rule.count} times"
+    return text
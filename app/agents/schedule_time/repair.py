@@ -0,0 +1,171 @@
+"""Local repair of the model's time-conversion output.
+
+The model is only trusted for interpretation (which instant, in which
+zone). Date/time strings are normalized to the schema conventions and the
+``targets`` are recomputed with the conversion engine, so arithmetic
+mistakes are fixed without another LLM round trip.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from app.shared.conversion import (
+    conversion_engine,
+    format_clock,
+    is_valid_zone,
+    localize_wall_time,
+    parse_clock,
+)
+from models.time_conversion import TimeNLConvertResponse, TimeTarget
+
+_DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%A, %B %d, %Y",
+)
+
+# "03/04/2026" is March 4th in the US and 3 April elsewhere; only accept
+# slash dates where one side cannot be a month.
+_SLASH_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+@dataclass
+class RepairReport:
+    """What had to be fixed to turn model output into a valid response."""
+
+    json_repaired: bool = False
+    normalized_fields: List[str] = field(default_factory=list)
+    recomputed_targets: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.json_repaired or self.normalized_fields or self.recomputed_targets)
+
+
+def normalize_date(value: Any) -> str:
+    """Return ``value`` as ``YYYY-MM-DD``; accepts ISO datetimes and common spellings."""
+    text = str(value or "").strip()
+    if not text:
+        raise ValueError("Missing date")
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).date().isoformat()
+    except ValueError:
+        pass
+    match = _SLASH_DATE_RE.fullmatch(text)
+    if match:
+        first, second, year = (int(part) for part in match.groups())
+        if first > 12 >= second:
+            return date(year, second, first).isoformat()
+        if second > 12 >= first or first == second:
+            return date(year, first, second).isoformat()
+        raise ValueError(f"Ambiguous date: {text!r}")
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {text!r}")
+
+
+def normalize_time(value: Any) -> str:
+    """Return ``value`` as ``h:mm AM/PM``; accepts 24-hour clocks and ISO datetimes."""
+    text = str(value or "").strip()
+    if "T" in text:
+        try:
+            return format_clock(datetime.fromisoformat(text.replace("Z", "+00:00")))
+        except ValueError:
+            pass
+    return format_clock(parse_clock(text))
+
+
+def _normalize_point(
+    point: Dict[str, Any], prefix: str, report: RepairReport
+) -> Dict[str, Any]:
+    point = dict(point)
+    for key, normalizer in (("date", normalize_date), ("time", normalize_time)):
+        original = point.get(key)
+        try:
+            normalized = normalizer(original)
+        except ValueError:
+            continue
+        if normalized != original:
+            point[key] = normalized
+            report.normalized_fields.append(f"{prefix}.{key}")
+    return point
+
+
+def repair_time_response(
+    payload: Dict[str, Any],
+    *,
+    expression: str,
+    json_repaired: bool = False,
+) -> tuple[TimeNLConvertResponse, RepairReport]:
+    """Normalize a parsed model payload and recompute its targets locally.
+
+    Raises ``ValueError`` (including pydantic ``ValidationError``) when the
+    payload cannot be turned into a valid ``TimeNLConvertResponse``.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Model output is not a JSON object")
+    report = RepairReport(json_repaired=json_repaired)
+    payload = dict(payload)
+
+    if not payload.get("input_text"):
+        payload["input_text"] = expression
+        report.normalized_fields.append("input_text")
+    source = _normalize_point(payload.get("source") or {}, "source", report)
+    raw_targets = [target for target in payload.get("targets") or [] if isinstance(target, dict)]
+    targets = [
+        _normalize_point(target, f"targets[{index}]", report)
+        for index, target in enumerate(raw_targets)
+    ]
+    payload["source"] = source
+    payload["targets"] = targets
+
+    recomputed = _recompute_targets(source, targets)
+    if recomputed is not None:
+        for before, after in zip(targets, recomputed):
+            if (before.get("date"), before.get("time")) != (after.date, after.time):
+                report.recomputed_targets.append(after.timezone)
+        payload["targets"] = [target.model_dump() for target in recomputed]
+
+    if report.recomputed_targets or not payload.get("output_text"):
+        payload["output_text"] = describe_conversion(source, payload["targets"])
+        report.normalized_fields.append("output_text")
+
+    return TimeNLConvertResponse.model_validate(payload), report
+
+
+def _recompute_targets(
+    source: Dict[str, Any], targets: List[Dict[str, Any]]
+) -> Optional[List[TimeTarget]]:
+    zone = source.get("timezone")
+    if not zone or not is_valid_zone(zone):
+        return None
+    try:
+        instant = localize_wall_time(
+            date.fromisoformat(source["date"]), parse_clock(source["time"]), zone
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+    zones = [target.get("timezone") for target in targets]
+    if not zones or any(not name or not is_valid_zone(name) for name in zones):
+        # Unknown zones (e.g. "Slack ID not found") are left as the model wrote them.
+        return None
+    return conversion_engine.convert(instant, zones)
+
+
+def describe_conversion(source: Dict[str, Any], targets: List[Dict[str, Any]]) -> str:
+    converted = "; ".join(
+        f"{target['time']} on {target['date']} in {target['timezone']}" for target in targets
+    )
+    head = f"{source.get('time')} on {source.get('date')} in {source.get('timezone')}"
+    return f"{head} is {converted}." if converted else f"{head}."
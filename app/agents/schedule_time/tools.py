@@ -1,3 +1,7 @@
+from app.config import settings
+from app.shared.conversion import convert_time
+from app.shared.store import shared_cache
+
 tools = [
     {
       "type": "function",
@@ -15,6 +19,36 @@ tools = [
           "required": ["slack_id"]
         }
       }
+    },
+    {
+      "type": "function",
+      "function": {
+        "name": "convert_time",
+        "description": "Convert one wall-clock time in a source time zone into any number of target time zones in a single call",
+        "parameters": {
+          "type": "object",
+          "properties": {
+            "source_timezone": {
+              "type": "string",
+              "description": "IANA time zone (or place name) of the given time, e.g. 'Africa/Lagos'"
+            },
+            "date": {
+              "type": "string",
+              "description": "Date in YYYY-MM-DD format"
+            },
+            "time": {
+              "type": "string",
+              "description": "Time such as '3:00 PM' or '15:00'"
+            },
+            "target_timezones": {
+              "type": "array",
+              "items": {"type": "string"},
+              "description": "IANA time zones (or place names) to convert into"
+            }
+          },
+          "required": ["source_timezone", "date", "time", "target_timezones"]
+        }
+      }
     }
   ]
 
@@ -26,6 +60,7 @@ slack_table = [
     {"slack_id": "U11223344", "timezone": "Asia/Dubai"}
 ]
 
+@shared_cache("tool:get_timezone", ttl=settings.tool_cache_ttl)
 def get_timezone(slack_id: str) -> str:
     """
     Retrieves the time zone associated with a given Slack ID.
@@ -0,0 +1,102 @@
+"""Warm-up for the schedule agent: everything a first request would pay for."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Mapping
+
+from app.agents.schedule_time.parse_cache import ParseCache
+from app.shared.conversion import conversion_engine
+from app.shared.llm import LLMClient
+from app.shared.memory import ConversationMemory
+from app.shared.places import place_resolver
+from app.shared.store import SharedStore
+from models.a2a import A2AMessage, MessagePart
+
+if TYPE_CHECKING:
+    from app.agents.schedule_time.handler import ScheduleTimeAgent
+
+_SYNTHETIC_EXPRESSIONS = (
+    "3pm Lagos tomorrow",
+    "What is 9:30 AM in New York in London and Tokyo?",
+    "Schedule a call at 17:00 Berlin time",
+)
+
+
+class _StandInCassette:
+    """Answers LLM calls with fixed, schema-valid payloads; never hits the network."""
+
+    def lookup(self, kind: str, request: Mapping[str, Any]) -> Dict[str, Any]:
+        schema_name = (request.get("response_format") or {}).get("json_schema", {}).get("name")
+        if schema_name == "intent-response":
+            content = {"intent": "normal_request"}
+        else:
+            today = datetime.now(timezone.utc).date().isoformat()
+            content = {
+                "input_text": "warm-up",
+                "output_text": "warm-up",
+                "source": {"timezone": "UTC", "date": today, "time": "12:00 PM"},
+                "targets": [{"timezone": "UTC", "date": today, "time": "12:00 PM"}],
+            }
+        return {
+            "id": "warmup",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stand-in"),
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": json.dumps(content)},
+                }
+            ],
+        }
+
+
+async def warm_up_agent(agent: "ScheduleTimeAgent", *, synthetic_requests: int = 0) -> Dict[str, Any]:
+    """Run each warm-up step, returning per-step timings in milliseconds."""
+    from app.agents.schedule_time.handler import (
+        DEFAULT_TARGETS,
+        ScheduleTimeAgent,
+        _intent_schema,
+        _recurrence_schema,
+        _response_schema,
+    )
+
+    timings: Dict[str, Any] = {}
+
+    def timed(name: str, fn) -> None:
+        started = time.perf_counter()
+        fn()
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def prepare() -> None:
+        timed("schemas", lambda: (_intent_schema(), _response_schema(), _recurrence_schema()))
+        timed("timezones", lambda: conversion_engine.preload([agent.default_timezone, *DEFAULT_TARGETS]))
+        timed("place_index", place_resolver.preload)
+
+    await asyncio.to_thread(prepare)
+
+    if synthetic_requests > 0:
+        # A throwaway agent: stand-in LLM, in-memory state, no shared caches.
+        scratch = SharedStore(Path(":memory:"))
+        stand_in = ScheduleTimeAgent(
+            default_timezone=agent.default_timezone,
+            profile_directory=agent.profiles,
+            memory=ConversationMemory(scratch, ttl=None),
+            parse_cache=ParseCache(scratch, ttl=0),
+            llm=LLMClient(cassette=_StandInCassette(), cache_completions=False),
+            model=agent.model,
+        )
+        started = time.perf_counter()
+        for index in range(synthetic_requests):
+            expression = _SYNTHETIC_EXPRESSIONS[index % len(_SYNTHETIC_EXPRESSIONS)]
+            message = A2AMessage(role="user", parts=[MessagePart(kind="text", text=expression)])
+            result = await stand_in.handle(message)
+            result.model_dump_json()
+        timings["synthetic_requests"] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
@@ -7,10 +7,94 @@ class Settings(BaseSettings):
     app_name: str = "Global Time Coordination Agent"
     app_description: str = "An agent that coordinates time-related tasks across multiple agents."
     default_timezone: str = "UTC"
+    port: int = 5001
     llm_provider: str = "local"
     openai_api_key: str | None = None
     groq_api_key: str | None = None
+    groq_api_keys: list[str] = []
+    llm_key_throttle_cooldown: float = 10.0
+    llm_key_failure_threshold: int = 3
+    llm_key_failure_cooldown: float = 30.0
+    llm_key_auth_cooldown: float = 300.0
     groq_model: str = "mixtral-8x7b-32768"
+    capture_enabled: bool = False
+    capture_path: str = "data/capture/traffic.jsonl"
+    capture_max_bytes: int = 50 * 1024 * 1024
+    capture_backup_count: int = 5
+    llm_cassette_path: str | None = None
+    host: str = "0.0.0.0"
+    workers: int = 0
+    graceful_timeout: float = 30.0
+    shared_store_path: str = "data/cache/shared.sqlite3"
+    shared_store_max_entries: int = 100_000
+    completion_cache_ttl: float = 300.0
+    tool_cache_ttl: float = 3600.0
+    profile_csv: str | None = None
+    agent_max_concurrency: int = 16
+    agent_max_queue: int = 64
+    priority_interactive_weight: int = 8
+    priority_background_weight: int = 1
+    priority_background_share: float = 0.75
+    priority_defer_depth: int = 2
+    llm_max_concurrency: int = 32
+    llm_max_queue: int = 256
+    admission_enabled: bool = True
+    admission_initial_limit: int = 32
+    admission_min_limit: int = 4
+    admission_max_limit: int = 256
+    admission_latency_target: float = 8.0
+    admission_retry_after: int = 2
+    disconnect_poll_interval: float = 0.5
+    request_timeout: float = 30.0
+    request_timeout_max: float = 120.0
+    deadline_min_stage_budget: float = 0.05
+    deadline_grace: float = 0.5
+    memory_max_turns: int = 6
+    memory_token_budget: int = 400
+    memory_ttl: float = 86400.0
+    parse_cache_ttl: float = 86400.0
+    recurrence_page_size: int = 10
+    recurrence_max_page_size: int = 100
+    places_path: str | None = None
+    place_fuzzy_cutoff: float = 0.85
+    idempotency_ttl: float = 600.0
+    idempotency_poll_interval: float = 0.1
+    ws_max_inflight: int = 32
+    ws_outbox_size: int = 64
+    ws_max_message_bytes: int = 1_048_576
+    circuit_enabled: bool = True
+    circuit_window: int = 20
+    circuit_min_calls: int = 5
+    circuit_failure_ratio: float = 0.5
+    circuit_slow_call_seconds: float = 10.0
+    circuit_open_seconds: float = 30.0
+    circuit_half_open_probes: int = 1
+    jobs_path: str = "data/jobs"
+    bulk_job_concurrency: int = 4
+    bulk_job_rate_limit: float = 0.0
+    bulk_job_checkpoint_interval: int = 50
+    bulk_job_max_attempts: int = 5
+    bulk_job_stream_stall_timeout: float = 300.0
+    warmup_enabled: bool = True
+    warmup_timezones: list[str] = []
+    warmup_synthetic_requests: int = 3
+    warmup_step_timeout: float = 30.0
+    provider_warmup_timeout: float = 5.0
+    provider_keepalive_interval: float = 0.0
+    log_level: str = "DEBUG"
+    log_enqueue: bool = True
+    loop_lag_monitor_enabled: bool = True
+    loop_lag_threshold: float = 0.1
+    loop_lag_interval: float = 0.05
+    profile_dir: str = "data/profiles"
+    profile_sample_rate: float = 0.0
+    profile_header_enabled: bool = False
+    profile_max_files: int = 20
+    admin_token: str | None = None
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
 
     model_config = SettingsConfigDict(
         env_file=".env",
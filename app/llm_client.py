@@ -1,14 +1,24 @@
-import instructor
-from groq import Groq
-from dotenv import load_dotenv
-from pydantic import BaseModel, Field
-load_dotenv()
+from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any
 
-def _build_groq_client() -> Groq:   
-    client = Groq()
-    return client
+from app.config import settings
 
-def _build_instructor_client():
-    client = instructor.from_groq(Groq(), mode=instructor.Mode.JSON)
-    return client
+if TYPE_CHECKING:
+    from groq import Groq
+
+
+def _build_groq_client(api_key: str | None = None, *, max_retries: int | None = None) -> Groq:
+    """Build a Groq client for ``api_key`` (default: the first configured key)."""
+    from groq import Groq
+
+    api_key = api_key or settings.groq_api_key or next(iter(settings.groq_api_keys), None)
+    if max_retries is None:
+        return Groq(api_key=api_key)
+    return Groq(api_key=api_key, max_retries=max_retries)
+
+
+def _build_instructor_client(groq_client: Groq | None = None) -> Any:
+    import instructor
+
+    return instructor.from_groq(groq_client or _build_groq_client(), mode=instructor.Mode.JSON)
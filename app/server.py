@@ -0,0 +1,231 @@
+"""Pre-fork multi-worker server.
+
+The parent process imports the application once, binds the listening socket
+and forks ``workers`` children that each run uvicorn on the inherited socket.
+Code and read-only data are shared copy-on-write; mutable caches that should
+be shared across workers live in ``app.shared.store.shared_store``.
+
+Signals handled by the parent:
+
+- ``SIGTERM`` / ``SIGINT``: drain every worker gracefully, then exit.
+- ``SIGHUP``: rolling restart, replacing workers one at a time so capacity
+  never drops to zero while in-flight requests drain.
+
+Run with ``python -m app.server``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Any, Dict, Set
+
+import uvicorn
+from loguru import logger
+from uvicorn.importer import import_from_string
+
+from app.config import settings
+from app.shared.store import shared_store
+
+
+class PreforkServer:
+    """Supervise a fixed pool of forked uvicorn workers sharing one socket."""
+
+    def __init__(
+        self,
+        app_path: str = "main:app",
+        *,
+        host: str = "0.0.0.0",
+        port: int = 5001,
+        workers: int = 0,
+        graceful_timeout: float = 30.0,
+    ) -> None:
+        self.app_path = app_path
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.graceful_timeout = graceful_timeout
+        self._app: Any = None
+        self._socket: socket.socket | None = None
+        self._children: Dict[int, float] = {}
+        self._retiring: Set[int] = set()
+        self._stopping = False
+        self._reload_requested = False
+
+    def run(self) -> None:
+        self._app = import_from_string(self.app_path)
+        self._socket = self._bind()
+        # Keep preloaded objects out of the collector so forked workers do not
+        # touch (and therefore copy) the shared pages during GC passes. They
+        # stay frozen in the workers; only objects created there are collected.
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        logger.info(
+            "Starting pre-fork server",
+            app=self.app_path,
+            host=self.host,
+            port=self.port,
+            workers=self.workers,
+        )
+        for _ in range(self.workers):
+            self._spawn()
+
+        while not self._stopping:
+            if self._reload_requested:
+                self._reload_requested = False
+                self._rolling_restart()
+            self._reap()
+            time.sleep(0.2)
+
+        self._shutdown()
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self) -> int:
+        # Import-time warm-up may have opened the store; never fork with it open.
+        shared_store.close()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child process
+            self._run_worker()
+        self._children[pid] = time.monotonic()
+        logger.info("Worker started", pid=pid)
+        return pid
+
+    def _run_worker(self) -> None:
+        # Own process group: terminal Ctrl-C reaches only the parent, which
+        # then drains workers with a single SIGTERM each.
+        os.setpgid(0, 0)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        config = uvicorn.Config(
+            self._app,
+            timeout_graceful_shutdown=self.graceful_timeout,
+            lifespan="on",
+        )
+        exit_code = 0
+        try:
+            uvicorn.Server(config).run(sockets=[self._socket])
+        except BaseException:
+            logger.exception("Worker crashed", pid=os.getpid())
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+                logger.info("Worker drained", pid=pid)
+                continue
+            started = self._children.pop(pid, None)
+            if started is None:
+                continue
+            logger.warning(
+                "Worker exited unexpectedly",
+                pid=pid,
+                status=status,
+                uptime=round(time.monotonic() - started, 1),
+            )
+            if not self._stopping:
+                if time.monotonic() - started < 1.0:
+                    # Crash-looping workers should not spin the supervisor.
+                    time.sleep(1.0)
+                self._spawn()
+
+    def _rolling_restart(self) -> None:
+        logger.info("Rolling restart requested", workers=len(self._children))
+        for old_pid in list(self._children):
+            if self._stopping:
+                return
+            self._spawn()
+            self._retire(old_pid)
+            deadline = time.monotonic() + self.graceful_timeout + 5
+            while old_pid in self._retiring and time.monotonic() < deadline:
+                self._reap()
+                time.sleep(0.1)
+            if old_pid in self._retiring:
+                logger.warning("Worker did not drain in time; killing", pid=old_pid)
+                self._kill(old_pid, signal.SIGKILL)
+
+    def _retire(self, pid: int) -> None:
+        self._children.pop(pid, None)
+        self._retiring.add(pid)
+        self._kill(pid, signal.SIGTERM)
+
+    def _shutdown(self) -> None:
+        logger.info("Draining workers", workers=len(self._children))
+        for pid in list(self._children):
+            self._retire(pid)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self._retiring and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._retiring):
+            logger.warning("Worker did not drain in time; killing", pid=pid)
+            self._kill(pid, signal.SIGKILL)
+        if self._socket is not None:
+            self._socket.close()
+        logger.info("Pre-fork server stopped")
+
+    @staticmethod
+    def _kill(pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame) -> None:
+        self._reload_requested = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the A2A service with pre-forked workers.")
+    parser.add_argument("--app", default="main:app", help="ASGI application import path")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.workers,
+        help="Number of worker processes (0 = CPU count)",
+    )
+    parser.add_argument("--graceful-timeout", type=float, default=settings.graceful_timeout)
+    args = parser.parse_args()
+
+    PreforkServer(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        graceful_timeout=args.graceful_timeout,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
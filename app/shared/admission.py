@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+
+from app.config import settings
+from app.shared.metrics import metrics
+from app.shared.priority import BACKGROUND, INTERACTIVE
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by observed LLM latency.
+
+    Requests are admitted while fewer than ``limit`` are in flight; anything
+    beyond that is rejected immediately instead of queueing. Every provider
+    call reports its latency: calls within ``latency_target`` grow the limit
+    additively (about +1 per ``limit`` samples), while slow or failed calls
+    shrink it multiplicatively, at most once per ``cooldown`` seconds. Only
+    provider-side failures count (429, 5xx, no response); client errors and
+    a client's own short deadline do not.
+
+    Background requests (see ``app.shared.priority``) are only admitted
+    while in-flight work is below ``background_share`` of the limit, so the
+    rest stays free for interactive traffic.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: float = 32,
+        min_limit: float = 4,
+        max_limit: float = 256,
+        latency_target: float = 8.0,
+        backoff: float = 0.9,
+        cooldown: float = 1.0,
+        background_share: float = 1.0,
+        enabled: bool = True,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.background_share = background_share
+        self.enabled = enabled
+        self._limit = float(initial_limit)
+        self._inflight = 0
+        self._rejected = 0
+        self._ewma_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self, lane: str = INTERACTIVE) -> bool:
+        """Claim an in-flight slot without waiting; ``False`` means shed the request."""
+        limit = int(self._limit)
+        if lane == BACKGROUND:
+            limit = max(1, int(self._limit * self.background_share))
+        with self._lock:
+            if self.enabled and self._inflight >= limit:
+                self._rejected += 1
+                metrics.inc("admission_rejected_total", lane=lane)
+                return False
+            self._inflight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._inflight = max(0, self._inflight - 1)
+
+    def observe(self, latency: Optional[float], *, failed: bool = False) -> None:
+        """Feed one provider call outcome into the limit."""
+        now = time.monotonic()
+        with self._lock:
+            if latency is not None:
+                self._ewma_latency = (
+                    latency
+                    if self._ewma_latency is None
+                    else 0.8 * self._ewma_latency + 0.2 * latency
+                )
+            overloaded = failed or latency is None or latency > self.latency_target
+            if not overloaded:
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+                return
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            previous = self._limit
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+        logger.info(
+            "Admission limit decreased",
+            previous=round(previous, 1),
+            limit=round(self._limit, 1),
+            latency=latency,
+            failed=failed,
+        )
+
+    def snapshot(self) -> Dict[str, float | int | bool | None]:
+        return {
+            "enabled": self.enabled,
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "rejected": self._rejected,
+            "ewma_latency": round(self._ewma_latency, 3) if self._ewma_latency is not None else None,
+            "latency_target": self.latency_target,
+        }
+
+
+admission_controller = AdaptiveLimiter(
+    initial_limit=settings.admission_initial_limit,
+    min_limit=settings.admission_min_limit,
+    max_limit=settings.admission_max_limit,
+    latency_target=settings.admission_latency_target,
+    background_share=settings.priority_background_share,
+    enabled=settings.admission_enabled,
+)
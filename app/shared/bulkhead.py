@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from app.shared.metrics import metrics
+from app.shared.priority import BACKGROUND, INTERACTIVE, LANES, LanePolicy, current_lane, lane_policy
+
+
+class BulkheadFull(Exception):
+    """Raised when a bulkhead's concurrency slots and wait queue are exhausted."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Bulkhead '{name}' is full")
+        self.name = name
+
+
+@dataclass
+class _Lane:
+    weight: int
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+    active: int = 0
+    rejected: int = 0
+    # Stride-scheduling pass: advanced by 1/weight each time the lane is served.
+    pass_: float = 0.0
+
+
+class Bulkhead:
+    """Bound the concurrent work, and the queue in front of it, for one component.
+
+    Waiters queue per priority lane (see ``app.shared.priority``), each lane
+    up to ``max_queue``. Freed slots go to the waiting lane that has been
+    served least relative to its weight, so with weights 8:1 interactive
+    requests get eight slots for every background one while both wait. The
+    policy also caps background work and defers it behind a deep interactive
+    queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_concurrency: int,
+        max_queue: int,
+        policy: Optional[LanePolicy] = None,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.policy = policy or lane_policy
+        self._lanes = {lane: _Lane(self.policy.weights.get(lane, 1)) for lane in LANES}
+        self._active = 0
+        self._rejected = 0
+        self._vtime = 0.0
+
+    @asynccontextmanager
+    async def slot(self, lane: Optional[str] = None, *, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one concurrency slot, waiting in the lane's bounded queue if needed.
+
+        ``lane`` defaults to the current request's lane. Waiting longer than
+        ``timeout`` raises ``asyncio.TimeoutError``.
+        """
+        lane = lane or current_lane()
+        await self._acquire(lane, timeout)
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def _eligible(self, lane: str) -> bool:
+        if self._active >= self.max_concurrency:
+            return False
+        if lane != BACKGROUND:
+            return True
+        background = self._lanes[BACKGROUND]
+        if background.active >= self.policy.background_limit(self.max_concurrency):
+            return False
+        depth = self.policy.defer_depth
+        return not (depth and len(self._lanes[INTERACTIVE].waiters) >= depth)
+
+    async def _acquire(self, lane: str, timeout: Optional[float]) -> None:
+        state = self._lanes[lane]
+        if not state.waiters and self._eligible(lane):
+            self._start(lane)
+            metrics.observe("bulkhead_wait_seconds", 0.0, bulkhead=self.name, lane=lane)
+            return
+        if len(state.waiters) >= self.max_queue:
+            state.rejected += 1
+            self._rejected += 1
+            metrics.inc("bulkhead_rejected_total", bulkhead=self.name, lane=lane)
+            raise BulkheadFull(self.name)
+        if not state.waiters:
+            # A lane that was idle must not bank credit for the time it was away.
+            state.pass_ = max(state.pass_, self._vtime)
+        future = asyncio.get_running_loop().create_future()
+        state.waiters.append(future)
+        self._publish(lane)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # Granted just as the wait was abandoned: hand the slot on.
+                self._release(lane)
+            else:
+                try:
+                    state.waiters.remove(future)
+                except ValueError:
+                    pass
+                self._publish(lane)
+                # A shorter interactive queue may end a background deferral.
+                self._dispatch()
+            raise
+        metrics.observe("bulkhead_wait_seconds", time.perf_counter() - started, bulkhead=self.name, lane=lane)
+
+    def _start(self, lane: str) -> None:
+        self._active += 1
+        self._lanes[lane].active += 1
+        self._publish(lane)
+
+    def _release(self, lane: str) -> None:
+        self._active = max(0, self._active - 1)
+        state = self._lanes[lane]
+        state.active = max(0, state.active - 1)
+        self._publish(lane)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand freed slots to waiters, lowest pass first among eligible lanes."""
+        while True:
+            waiting = [lane for lane in LANES if self._lanes[lane].waiters]
+            eligible = [lane for lane in waiting if self._eligible(lane)]
+            if not eligible:
+                if BACKGROUND in waiting and self._active < self.max_concurrency:
+                    metrics.inc("bulkhead_deferred_total", bulkhead=self.name)
+                return
+            lane = min(eligible, key=lambda name: self._lanes[name].pass_)
+            state = self._lanes[lane]
+            future = state.waiters.popleft()
+            if future.done():
+                continue
+            self._vtime = state.pass_
+            state.pass_ += 1.0 / state.weight
+            self._start(lane)
+            future.set_result(None)
+
+    def _publish(self, lane: str) -> None:
+        state = self._lanes[lane]
+        metrics.set_gauge("bulkhead_queue_depth", len(state.waiters), bulkhead=self.name, lane=lane)
+        metrics.set_gauge("bulkhead_active", state.active, bulkhead=self.name, lane=lane)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "waiting": sum(len(state.waiters) for state in self._lanes.values()),
+            "rejected": self._rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "lanes": {
+                lane: {
+                    "active": state.active,
+                    "waiting": len(state.waiters),
+                    "rejected": state.rejected,
+                    "weight": state.weight,
+                }
+                for lane, state in self._lanes.items()
+            },
+        }
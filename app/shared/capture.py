@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, Mapping, Optional
+
+from loguru import logger
+
+from app.config import settings
+
+REDACTED = "[REDACTED]"
+# Keys containing any of these (case-insensitively) are redacted, so
+# "X-Api-Key", "groq_api_key" and "access_token" are caught as well as
+# "token". "tokens" is left alone: it names usage counts, not credentials.
+_SENSITIVE_KEY_RE = re.compile(
+    r"api[_-]?key|authentication|authorization|cookie|credential|password|secret|token(?!s)",
+    re.IGNORECASE,
+)
+# Prompts embed the request's reference time; cassette keys must not, or a
+# capture could only be replayed within the minute it was recorded.
+_ISO_DATETIME_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"
+)
+_TIME_PLACEHOLDER = "<datetime>"
+
+_capture_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "capture_id", default=None
+)
+
+
+class CassetteMiss(LookupError):
+    """Raised when a cassette has no recorded response for an LLM request."""
+
+
+def is_sensitive_key(key: str) -> bool:
+    return _SENSITIVE_KEY_RE.search(key) is not None
+
+
+def sanitize(value: Any) -> Any:
+    """Return a JSON-safe copy of ``value`` with credential-like fields redacted."""
+    if isinstance(value, Mapping):
+        return {
+            str(key): REDACTED if is_sensitive_key(str(key)) else sanitize(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [sanitize(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, "model_dump"):
+        return sanitize(value.model_dump(mode="json", exclude_none=True))
+    if isinstance(value, type):
+        return value.__name__
+    return str(value)
+
+
+def _strip_call_ids(value: Any) -> Any:
+    # Tool call ids are random per run, so they must not influence cassette keys.
+    if isinstance(value, Mapping):
+        return {
+            key: _strip_call_ids(item)
+            for key, item in value.items()
+            if key not in ("id", "tool_call_id")
+        }
+    if isinstance(value, list):
+        return [_strip_call_ids(item) for item in value]
+    return value
+
+
+def _strip_times(value: Any) -> Any:
+    if isinstance(value, str):
+        return _ISO_DATETIME_RE.sub(_TIME_PLACEHOLDER, value)
+    if isinstance(value, Mapping):
+        return {key: _strip_times(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_strip_times(item) for item in value]
+    return value
+
+
+def request_key(kind: str, request: Mapping[str, Any], *, ignore_times: bool = False) -> str:
+    """Stable hash identifying an LLM request independent of volatile ids.
+
+    Cassettes pass ``ignore_times`` so timestamps in the prompt do not take
+    part; the completion cache keeps them, as answers depend on them.
+    """
+    messages = _strip_call_ids(sanitize(request.get("messages") or []))
+    material = {
+        "kind": kind,
+        "model": request.get("model"),
+        "messages": _strip_times(messages) if ignore_times else messages,
+        "response_format": sanitize(request.get("response_format")),
+        "response_model": sanitize(request.get("response_model")),
+        "tools": sanitize(request.get("tools")),
+        "tool_choice": request.get("tool_choice"),
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class TrafficRecorder:
+    """Append sanitized inbound requests and LLM exchanges to a rotating JSONL file."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        enabled: bool = False,
+        max_bytes: int = 50 * 1024 * 1024,
+        backup_count: int = 5,
+        max_pending: int = 10_000,
+    ) -> None:
+        self.path = path
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        # Lines are appended by a writer thread so file I/O stays off the
+        # event loop; it is started lazily, once per process.
+        self._pending: queue.Queue[str] = queue.Queue(maxsize=max_pending)
+        self._writer_pid: Optional[int] = None
+
+    def record_request(self, *, path: str, body: Mapping[str, Any]) -> Optional[str]:
+        """Record an inbound JSON-RPC body and bind a capture id to the current task."""
+        if not self.enabled:
+            return None
+        capture_id = str(uuid.uuid4())
+        _capture_id.set(capture_id)
+        self._write(
+            {
+                "type": "request",
+                "capture_id": capture_id,
+                "path": path,
+                "body": sanitize(body),
+            }
+        )
+        return capture_id
+
+    def record_llm(
+        self, kind: str, request: Mapping[str, Any], response: Any
+    ) -> None:
+        """Record one provider exchange linked to the current inbound request."""
+        if not self.enabled:
+            return
+        self._write(
+            {
+                "type": "llm",
+                "capture_id": _capture_id.get(),
+                "kind": kind,
+                "key": request_key(kind, request, ignore_times=True),
+                "request": sanitize(request),
+                "response": sanitize(response),
+            }
+        )
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        record["ts"] = time.time()
+        record["offset"] = round(time.monotonic() - self._started, 6)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._ensure_writer()
+        try:
+            self._pending.put_nowait(line)
+        except queue.Full:
+            logger.warning("Traffic capture backlog full; dropping record", type=record["type"])
+
+    def flush(self) -> None:
+        """Block until every record queued by this process is on disk."""
+        if self._writer_pid == os.getpid():
+            self._pending.join()
+
+    def _ensure_writer(self) -> None:
+        if self._writer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            # A forked worker inherits the queue but not the thread draining it.
+            self._pending = queue.Queue(maxsize=self.max_pending)
+            threading.Thread(
+                target=self._drain, args=(self._pending,), name="traffic-capture", daemon=True
+            ).start()
+            self._writer_pid = os.getpid()
+
+    def _drain(self, pending: queue.Queue[str]) -> None:
+        while True:
+            lines = [pending.get()]
+            while len(lines) < 256:
+                try:
+                    lines.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._append("".join(lines))
+            finally:
+                for _ in lines:
+                    pending.task_done()
+
+    def _append(self, text: str) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._rotate_if_needed(len(text.encode("utf-8")))
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(text)
+        except OSError as exc:
+            logger.warning("Traffic capture write failed", error=str(exc))
+
+    def _rotate_if_needed(self, incoming: int) -> None:
+        if not self.path.exists() or self.path.stat().st_size + incoming <= self.max_bytes:
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backup_count > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+
+def iter_capture(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield records from a capture file, skipping malformed lines."""
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping malformed capture line", path=str(path))
+
+
+class LLMCassette:
+    """Serve recorded LLM responses keyed by the request that produced them."""
+
+    def __init__(self, paths: list[Path]) -> None:
+        self._responses: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        for path in paths:
+            for record in iter_capture(path):
+                if record.get("type") == "llm" and record.get("response") is not None:
+                    # Re-key from the recorded request so captures made before
+                    # a key change still replay.
+                    key = (
+                        request_key(record["kind"], record["request"], ignore_times=True)
+                        if record.get("request") is not None
+                        else record["key"]
+                    )
+                    self._responses[key].append(record["response"])
+        logger.info(
+            "Loaded LLM cassette",
+            paths=[str(path) for path in paths],
+            keys=len(self._responses),
+        )
+
+    def lookup(self, kind: str, request: Mapping[str, Any]) -> Dict[str, Any]:
+        """Return the next recorded response for ``request``, cycling on repeats."""
+        key = request_key(kind, request, ignore_times=True)
+        with self._lock:
+            responses = self._responses.get(key)
+            if not responses:
+                raise CassetteMiss(f"No recorded {kind} response for key {key[:12]}")
+            response = responses[0]
+            responses.rotate(-1)
+        return response
+
+
+def load_cassette(spec: Optional[str]) -> Optional[LLMCassette]:
+    """Build a cassette from a comma-separated list of capture files."""
+    if not spec:
+        return None
+    paths = [Path(item.strip()) for item in spec.split(",") if item.strip()]
+    return LLMCassette(paths)
+
+
+traffic_recorder = TrafficRecorder(
+    Path(settings.capture_path),
+    enabled=settings.capture_enabled,
+    max_bytes=settings.capture_max_bytes,
+    backup_count=settings.capture_backup_count,
+)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from loguru import logger
+
+from app.config import settings
+from app.shared.metrics import metrics
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker for one provider/model pair.
+
+    The last ``window`` calls are tracked; a call counts as bad when it
+    raised or took longer than ``slow_call_seconds``. Once at least
+    ``min_calls`` are recorded and the bad ratio reaches ``failure_ratio``
+    the circuit opens and calls fail fast for ``open_seconds``. It then goes
+    half-open and lets ``half_open_probes`` calls through: if they all
+    succeed it closes, if any fails it opens again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_ratio: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        enabled: bool = True,
+    ) -> None:
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.enabled = enabled
+        self._state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+        metrics.set_gauge("llm_circuit_state", 0, circuit=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def before_call(self) -> None:
+        """Admit a call or raise ``CircuitOpen``; pair with ``record`` or ``release``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return
+            self._rejected += 1
+        metrics.inc("llm_circuit_rejections_total", circuit=self.name)
+        raise CircuitOpen(self.name, self.retry_after())
+
+    def record(self, latency: float, *, failed: bool = False) -> None:
+        """Report the outcome of an admitted call."""
+        if not self.enabled:
+            return
+        bad = failed or latency > self.slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if bad:
+                    self._transition(OPEN)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CLOSED)
+                return
+            if self._state == OPEN:
+                return
+            self._outcomes.append(bad)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio
+            ):
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """Give back an admitted call that ended without a verdict on the provider."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _maybe_half_open(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        previous, self._state = self._state, state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state == CLOSED:
+            self._outcomes.clear()
+        metrics.set_gauge("llm_circuit_state", _STATE_VALUES[state], circuit=self.name)
+        metrics.inc("llm_circuit_transitions_total", circuit=self.name, to=state)
+        logger.warning("Circuit state changed", circuit=self.name, previous=previous, state=state)
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            outcomes = list(self._outcomes)
+        return {
+            "state": state,
+            "calls": len(outcomes),
+            "failure_ratio": round(sum(outcomes) / len(outcomes), 3) if outcomes else 0.0,
+            "rejected": self._rejected,
+            "retry_after": round(self.retry_after(), 1) if state == OPEN else 0.0,
+        }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per ``provider:model``, created on first use."""
+
+    def __init__(self, **options: Any) -> None:
+        self.options = options
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, model: str) -> CircuitBreaker:
+        name = f"{provider}:{model}"
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(name, CircuitBreaker(name, **self.options))
+        return breaker
+
+    def open_circuits(self) -> List[Tuple[str, float]]:
+        return [
+            (name, breaker.retry_after())
+            for name, breaker in list(self._breakers.items())
+            if breaker.state == OPEN
+        ]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.snapshot() for name, breaker in list(self._breakers.items())}
+
+
+circuit_breakers = CircuitBreakerRegistry(
+    window=settings.circuit_window,
+    min_calls=settings.circuit_min_calls,
+    failure_ratio=settings.circuit_failure_ratio,
+    slow_call_seconds=settings.circuit_slow_call_seconds,
+    open_seconds=settings.circuit_open_seconds,
+    half_open_probes=settings.circuit_half_open_probes,
+    enabled=settings.circuit_enabled,
+)
@@ -0,0 +1,222 @@
+"""Batch time-zone conversion engine.
+
+``ZoneInfo`` objects are cached by name, and each zone gets a table of UTC
+offset transitions precomputed over a rolling horizon (one year back, two
+years ahead by default). Converting an instant is then a ``bisect`` into
+that table rather than a ``tzinfo`` walk, so converting into hundreds of
+zones costs roughly the same per zone as converting into one.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+import time as _time
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.shared.places import place_resolver
+from models.time_conversion import TimeTarget
+
+UTC = timezone.utc
+_DAY = 86400
+_CLOCK_RE = re.compile(
+    r"^\s*(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?(?::(?P<second>\d{2}))?\s*(?P<meridiem>[AaPp]\.?\s*[Mm]\.?)?\s*$"
+)
+
+
+class UnknownTimezone(ValueError):
+    """Raised when one or more requested zones are not valid IANA names."""
+
+    def __init__(self, zones: Sequence[str]) -> None:
+        super().__init__(f"Unknown timezone(s): {', '.join(zones)}")
+        self.zones = list(zones)
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> ZoneInfo:
+    """Return a cached ``ZoneInfo`` for ``name``."""
+    return ZoneInfo(name)
+
+
+def is_valid_zone(name: str) -> bool:
+    try:
+        get_zone(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def _offset_at(zone: ZoneInfo, epoch: int) -> int:
+    return int(datetime.fromtimestamp(epoch, zone).utcoffset().total_seconds())
+
+
+@dataclass(frozen=True)
+class TransitionTable:
+    """UTC instants at which a zone's offset changes, with the offset after each."""
+
+    zone: str
+    start: int
+    end: int
+    instants: List[int]
+    offsets: List[int]
+
+    @classmethod
+    def build(cls, zone_name: str, start: int, end: int) -> "TransitionTable":
+        zone = get_zone(zone_name)
+        instants = [start]
+        offsets = [_offset_at(zone, start)]
+        cursor = start
+        while cursor < end:
+            step = min(_DAY, end - cursor)
+            following = _offset_at(zone, cursor + step)
+            if following != offsets[-1]:
+                # Narrow the change down to the second it happens.
+                low, high = cursor, cursor + step
+                while high - low > 1:
+                    mid = (low + high) // 2
+                    if _offset_at(zone, mid) == offsets[-1]:
+                        low = mid
+                    else:
+                        high = mid
+                instants.append(high)
+                offsets.append(following)
+            cursor += step
+        return cls(zone=zone_name, start=start, end=end, instants=instants, offsets=offsets)
+
+    def covers(self, epoch: float) -> bool:
+        return self.start <= epoch < self.end
+
+    def offset(self, epoch: float) -> int:
+        return self.offsets[bisect.bisect_right(self.instants, epoch) - 1]
+
+
+class ConversionEngine:
+    """Convert instants into many zones using cached transition tables."""
+
+    def __init__(self, *, back_days: int = 366, ahead_days: int = 731) -> None:
+        self.back_days = back_days
+        self.ahead_days = ahead_days
+        self._tables: Dict[str, TransitionTable] = {}
+        self._lock = threading.Lock()
+
+    def table(self, zone_name: str) -> TransitionTable:
+        """Return (building or rolling forward if needed) the table for ``zone_name``."""
+        now = int(_time.time())
+        table = self._tables.get(zone_name)
+        # Rebuild once less than a quarter of the forward horizon remains.
+        if table is None or table.end - now < self.ahead_days * _DAY // 4:
+            with self._lock:
+                table = self._tables.get(zone_name)
+                if table is None or table.end - now < self.ahead_days * _DAY // 4:
+                    table = TransitionTable.build(
+                        zone_name,
+                        now - self.back_days * _DAY,
+                        now + self.ahead_days * _DAY,
+                    )
+                    self._tables[zone_name] = table
+        return table
+
+    def preload(self, zones: Iterable[str]) -> None:
+        for zone_name in zones:
+            self.table(zone_name)
+
+    def utc_offset(self, zone_name: str, instant: datetime) -> timedelta:
+        epoch = instant.timestamp()
+        table = self.table(zone_name)
+        if table.covers(epoch):
+            return timedelta(seconds=table.offset(epoch))
+        return instant.astimezone(get_zone(zone_name)).utcoffset()
+
+    def localize(self, instant: datetime, zone_name: str) -> datetime:
+        """Return ``instant`` as naive wall-clock time in ``zone_name``."""
+        utc = instant.astimezone(UTC).replace(tzinfo=None)
+        return utc + self.utc_offset(zone_name, instant)
+
+    def convert(self, instant: datetime, zones: Sequence[str]) -> List[TimeTarget]:
+        """Convert one aware instant into every zone in ``zones``."""
+        return self.convert_many([instant], zones)[0]
+
+    def convert_many(
+        self, instants: Sequence[datetime], zones: Sequence[str]
+    ) -> List[List[TimeTarget]]:
+        """Convert each aware instant into every zone; one list of targets per instant."""
+        invalid = [zone_name for zone_name in zones if not is_valid_zone(zone_name)]
+        if invalid:
+            raise UnknownTimezone(invalid)
+        results: List[List[TimeTarget]] = []
+        for instant in instants:
+            if instant.tzinfo is None:
+                raise ValueError("Instants must be timezone-aware")
+            targets = []
+            for zone_name in zones:
+                local = self.localize(instant, zone_name)
+                targets.append(
+                    TimeTarget(
+                        timezone=zone_name,
+                        date=local.date().isoformat(),
+                        time=format_clock(local),
+                    )
+                )
+            results.append(targets)
+        return results
+
+
+def format_clock(value: datetime | time) -> str:
+    """Format as ``h:mm AM/PM``, the convention used by ``TimeTarget``."""
+    return value.strftime("%I:%M %p").lstrip("0")
+
+
+def parse_clock(value: str) -> time:
+    """Parse ``3pm``, ``3:05 PM``, ``15:05`` or ``15:05:30`` into a ``time``."""
+    match = _CLOCK_RE.match(value or "")
+    if not match:
+        raise ValueError(f"Unrecognized time: {value!r}")
+    hour = int(match["hour"])
+    minute = int(match["minute"] or 0)
+    second = int(match["second"] or 0)
+    meridiem = (match["meridiem"] or "").replace(".", "").replace(" ", "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Hour out of range for 12-hour time: {value!r}")
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    return time(hour, minute, second)
+
+
+def localize_wall_time(
+    day: date | str, clock: time | str, zone_name: str
+) -> datetime:
+    """Build an aware datetime for a wall-clock time in ``zone_name``."""
+    if isinstance(day, str):
+        day = date.fromisoformat(day.strip())
+    if isinstance(clock, str):
+        clock = parse_clock(clock)
+    return datetime.combine(day, clock, tzinfo=get_zone(zone_name))
+
+
+conversion_engine = ConversionEngine()
+
+
+def convert_time(
+    source_timezone: str,
+    date: str,
+    time: str,
+    target_timezones: List[str],
+) -> List[dict] | str:
+    """Tool entry point: convert one wall-clock time into many target zones.
+
+    Zones may also be given as place names or abbreviations ("Lagos", "PST").
+    """
+    source_timezone, *target_timezones = place_resolver.canonicalize(
+        [source_timezone, *target_timezones]
+    )
+    try:
+        instant = localize_wall_time(date, time, source_timezone)
+        targets = conversion_engine.convert(instant, target_timezones)
+    except (UnknownTimezone, ZoneInfoNotFoundError, ValueError) as exc:
+        return f"Conversion failed: {exc}"
+    return [target.model_dump() for target in targets]
@@ -0,0 +1,326 @@
+"""A pool of provider API keys, each with its own rate-limit bucket.
+
+Every call borrows one key. The key with the most quota left wins, as read
+from the provider's ``x-ratelimit-*`` response headers and counted down
+locally between responses. Ties go to the key with fewer calls in flight,
+then the one idle longest. Keys with no quota reading yet count as full.
+
+Per-key health:
+
+- a 429 evicts the key until its ``retry-after`` (or rate-limit reset)
+  passes, falling back to ``throttle_cooldown`` when neither is given;
+- a 401/403 evicts it for ``auth_cooldown``;
+- ``failure_threshold`` consecutive 5xx or connection failures evict it for
+  ``failure_cooldown``.
+
+A call that failed on one key because of the key (429, 401/403, 5xx) is
+retried on another. When every key is cooling down, ``acquire`` raises
+``CredentialsExhausted``. That is a ``CircuitOpen``, so agents degrade the
+same way as when the provider's circuit is open.
+
+Key values never leave this module. Logs, metrics and ``/health`` name keys
+``key0``, ``key1`` and so on, in configuration order.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, Iterator, Mapping, Optional, Sequence
+
+from loguru import logger
+
+from app.config import settings
+from app.shared.circuit import CircuitOpen
+from app.shared.metrics import metrics
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+class CredentialsExhausted(CircuitOpen):
+    """Raised instead of calling the provider while every pooled key is cooling down."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("groq:keys", retry_after)
+        self.args = (f"All API keys are cooling down; retry in {retry_after:.0f}s",)
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse ``retry-after`` seconds or reset durations such as ``"2m59.56s"``."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status of a provider error, looking through wrapping exceptions."""
+    current: Optional[BaseException] = exc
+    for _ in range(5):
+        if current is None:
+            break
+        status = getattr(current, "status_code", None)
+        if isinstance(status, int):
+            return status
+        current = current.__cause__ or current.__context__
+    return None
+
+
+def _is_connection_error(exc: BaseException) -> bool:
+    """Whether the provider could not be reached; a timeout is the budget's doing, not the key's."""
+    from groq import APIConnectionError, APITimeoutError
+
+    current: Optional[BaseException] = exc
+    for _ in range(5):
+        if current is None:
+            return False
+        if isinstance(current, APIConnectionError):
+            return not isinstance(current, APITimeoutError)
+        current = current.__cause__ or current.__context__
+    return False
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """Whether a failed call says the provider is struggling: 429, 5xx, or no response.
+
+    Client errors (other 4xx) and invalid model output are the request's
+    fault and say nothing about provider capacity.
+    """
+    status = _status_code(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    from groq import APIConnectionError
+
+    current: Optional[BaseException] = exc
+    for _ in range(5):
+        if current is None:
+            return False
+        if isinstance(current, APIConnectionError):
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+def _headers_of(exc: BaseException) -> Mapping[str, str]:
+    response = getattr(exc, "response", None)
+    return getattr(response, "headers", None) or {}
+
+
+@dataclass
+class _Bucket:
+    """One rate limit (requests or tokens) as last reported by the provider."""
+
+    limit: Optional[float] = None
+    remaining: Optional[float] = None
+    resets_at: float = 0.0
+
+    def headroom(self, now: float) -> float:
+        if self.remaining is None or not self.limit or now >= self.resets_at:
+            return 1.0
+        return max(0.0, self.remaining) / self.limit
+
+    def update(self, limit: Optional[float], remaining: Optional[float], reset: Optional[float], now: float) -> None:
+        if remaining is None:
+            return
+        self.limit = limit if limit is not None else self.limit
+        self.remaining = remaining
+        self.resets_at = now + (reset if reset is not None else 60.0)
+
+
+@dataclass
+class Credential:
+    name: str
+    api_key: Optional[str] = field(repr=False)
+    requests: _Bucket = field(default_factory=_Bucket)
+    tokens: _Bucket = field(default_factory=_Bucket)
+    in_flight: int = 0
+    failures: int = 0
+    evicted_until: float = 0.0
+    last_used: float = 0.0
+
+    def headroom(self, now: float) -> float:
+        return min(self.requests.headroom(now), self.tokens.headroom(now))
+
+
+class CredentialPool:
+    def __init__(
+        self,
+        api_keys: Sequence[Optional[str]],
+        *,
+        throttle_cooldown: float = 10.0,
+        failure_threshold: int = 3,
+        failure_cooldown: float = 30.0,
+        auth_cooldown: float = 300.0,
+    ) -> None:
+        keys = list(dict.fromkeys(key for key in api_keys if key)) or [None]
+        self.credentials = [Credential(f"key{index}", key) for index, key in enumerate(keys)]
+        self.throttle_cooldown = throttle_cooldown
+        self.failure_threshold = failure_threshold
+        self.failure_cooldown = failure_cooldown
+        self.auth_cooldown = auth_cooldown
+        self._lock = threading.Lock()
+        for credential in self.credentials:
+            metrics.set_gauge("llm_key_available", 1, key=credential.name)
+
+    def __len__(self) -> int:
+        return len(self.credentials)
+
+    def __iter__(self) -> Iterator[Credential]:
+        return iter(self.credentials)
+
+    @property
+    def configured(self) -> bool:
+        """Whether any key is set; without one the SDK falls back to its environment variable."""
+        return any(credential.api_key for credential in self.credentials)
+
+    def exhausted(self) -> Optional[CredentialsExhausted]:
+        """The error ``acquire`` would raise right now, if every key is cooling down."""
+        now = time.monotonic()
+        with self._lock:
+            soonest = min(c.evicted_until for c in self.credentials)
+        if soonest <= now:
+            return None
+        return CredentialsExhausted(soonest - now)
+
+    def acquire(self, exclude: Collection[str] = ()) -> Optional[Credential]:
+        """Borrow the best available key, or ``None`` once every key has been tried.
+
+        Raises ``CredentialsExhausted`` when untried keys remain but all of
+        them are cooling down.
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [c for c in self.credentials if c.name not in exclude]
+            if not candidates:
+                return None
+            available = [c for c in candidates if c.evicted_until <= now]
+            if not available:
+                retry_after = min(c.evicted_until for c in candidates) - now
+                metrics.inc("llm_key_exhausted_total")
+                raise CredentialsExhausted(retry_after)
+            best = max(
+                available,
+                key=lambda c: (c.headroom(now), -c.in_flight, -c.last_used),
+            )
+            if best.evicted_until:
+                best.evicted_until = 0.0
+                metrics.set_gauge("llm_key_available", 1, key=best.name)
+                logger.info("API key back in rotation", key=best.name)
+            best.in_flight += 1
+            best.last_used = now
+            # Count the call against the last reading until the next one arrives.
+            if best.requests.remaining is not None:
+                best.requests.remaining -= 1
+        return best
+
+    def succeeded(self, credential: Credential, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Return a key after a successful call, recording the quota it reported."""
+        now = time.monotonic()
+        with self._lock:
+            credential.in_flight = max(0, credential.in_flight - 1)
+            credential.failures = 0
+            if headers:
+                self._read_quota(credential, headers, now)
+        metrics.inc("llm_key_requests_total", key=credential.name, outcome="ok")
+        if credential.requests.remaining is not None:
+            metrics.set_gauge("llm_key_remaining_requests", credential.requests.remaining, key=credential.name)
+        if credential.tokens.remaining is not None:
+            metrics.set_gauge("llm_key_remaining_tokens", credential.tokens.remaining, key=credential.name)
+
+    def failed(self, credential: Credential, exc: BaseException) -> bool:
+        """Return a key after a failed call; ``True`` when another key may succeed."""
+        status = _status_code(exc)
+        headers = _headers_of(exc)
+        now = time.monotonic()
+        with self._lock:
+            credential.in_flight = max(0, credential.in_flight - 1)
+            if status == 429:
+                self._read_quota(credential, headers, now)
+                cooldown = (
+                    _parse_duration(headers.get("retry-after"))
+                    or _parse_duration(headers.get("x-ratelimit-reset-requests"))
+                    or self.throttle_cooldown
+                )
+                self._evict(credential, cooldown, "throttled", now)
+                outcome, retry = "throttled", True
+            elif status in (401, 403):
+                self._evict(credential, self.auth_cooldown, "rejected", now)
+                outcome, retry = "rejected", True
+            elif (status is not None and status >= 500) or (status is None and _is_connection_error(exc)):
+                credential.failures += 1
+                if credential.failures >= self.failure_threshold:
+                    self._evict(credential, self.failure_cooldown, "unhealthy", now)
+                outcome, retry = "error", True
+            else:
+                # Bad requests and invalid model output say nothing about the key.
+                outcome, retry = "error", False
+        metrics.inc("llm_key_requests_total", key=credential.name, outcome=outcome)
+        return retry
+
+    def abandoned(self, credential: Credential) -> None:
+        """Return a key whose call was cancelled before an outcome was known."""
+        with self._lock:
+            credential.in_flight = max(0, credential.in_flight - 1)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                c.name: {
+                    "available": c.evicted_until <= now,
+                    "retry_after": round(max(0.0, c.evicted_until - now), 1),
+                    "headroom": round(c.headroom(now), 3),
+                    "remaining_requests": c.requests.remaining,
+                    "remaining_tokens": c.tokens.remaining,
+                    "in_flight": c.in_flight,
+                    "failures": c.failures,
+                }
+                for c in self.credentials
+            }
+
+    def _evict(self, credential: Credential, cooldown: float, reason: str, now: float) -> None:
+        credential.evicted_until = max(credential.evicted_until, now + cooldown)
+        credential.failures = 0
+        metrics.inc("llm_key_evictions_total", key=credential.name, reason=reason)
+        metrics.set_gauge("llm_key_available", 0, key=credential.name)
+        logger.warning("API key evicted", key=credential.name, reason=reason, cooldown=round(cooldown, 1))
+
+    @staticmethod
+    def _read_quota(credential: Credential, headers: Mapping[str, str], now: float) -> None:
+        credential.requests.update(
+            _parse_number(headers.get("x-ratelimit-limit-requests")),
+            _parse_number(headers.get("x-ratelimit-remaining-requests")),
+            _parse_duration(headers.get("x-ratelimit-reset-requests")),
+            now,
+        )
+        credential.tokens.update(
+            _parse_number(headers.get("x-ratelimit-limit-tokens")),
+            _parse_number(headers.get("x-ratelimit-remaining-tokens")),
+            _parse_duration(headers.get("x-ratelimit-reset-tokens")),
+            now,
+        )
+
+
+credential_pool = CredentialPool(
+    [settings.groq_api_key, *settings.groq_api_keys],
+    throttle_cooldown=settings.llm_key_throttle_cooldown,
+    failure_threshold=settings.llm_key_failure_threshold,
+    failure_cooldown=settings.llm_key_failure_cooldown,
+    auth_cooldown=settings.llm_key_auth_cooldown,
+)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from app.config import settings
+
+DEADLINE_HEADER = "x-request-timeout"
+DEADLINE_METADATA_KEY = "timeout_seconds"
+
+_current: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request's time budget runs out before a stage completes."""
+
+    def __init__(self, stage: str, partial: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(f"Deadline exceeded during {stage}")
+        self.stage = stage
+        self.partial: Dict[str, Any] = dict(partial or {})
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """Absolute point in (monotonic) time by which a request must finish."""
+
+    expires_at: float
+    budget: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(expires_at=time.monotonic() + seconds, budget=seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def check(self, stage: str) -> float:
+        """Return the remaining budget, raising if nothing is left for ``stage``."""
+        remaining = self.remaining()
+        if remaining <= settings.deadline_min_stage_budget:
+            raise DeadlineExceeded(stage)
+        return remaining
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Make ``deadline`` visible to every stage awaited within the block."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def resolve_budget(
+    header_value: Optional[str], metadata: Optional[Mapping[str, Any]]
+) -> float:
+    """Pick the request budget from the header, then metadata, then settings."""
+    candidates = [header_value, (metadata or {}).get(DEADLINE_METADATA_KEY)]
+    for candidate in candidates:
+        if candidate is None:
+            continue
+        try:
+            budget = float(candidate)
+        except (TypeError, ValueError):
+            continue
+        if budget > 0:
+            return min(budget, settings.request_timeout_max)
+    return settings.request_timeout
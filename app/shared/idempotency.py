@@ -0,0 +1,196 @@
+"""Idempotent replay of agent requests.
+
+A request carrying an ``Idempotency-Key`` header, or a client-supplied
+``messageId``, is keyed per agent. Its result is stored in the shared store
+for ``ttl`` seconds, and a retry with the same key gets that ``TaskResult``
+back without running the agent again. A retry that arrives while the
+original is still running waits for it: in the same worker it awaits the
+running work directly; in another worker it polls the claim the original
+placed in the shared store. If the original fails or is cancelled, the
+first waiter to notice runs the request itself.
+
+Keys are scoped to the caller (a hash of its ``Authorization`` header, or
+else its address), so one client cannot read another's results by reusing
+a ``messageId``. Each entry also records a fingerprint of the request
+parameters; reusing a key for a different request raises
+``IdempotencyConflict`` rather than returning the old answer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+
+from loguru import logger
+
+from app.config import settings
+from app.shared.metrics import metrics
+from app.shared.store import SharedStore, shared_store
+from models.a2a import A2AMessage, TaskResult
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAY_HEADER = "Idempotent-Replay"
+
+_NAMESPACE = "idempotency"
+_RUNNING = "running"
+_DONE = "done"
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an idempotency key is reused for a different request."""
+
+    def __init__(self, key: str) -> None:
+        super().__init__("Idempotency key was already used for a different request")
+        self.key = key
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+def caller_scope(headers: Mapping[str, str], host: Optional[str]) -> str:
+    """Identify the caller for key scoping: its credentials if any, else its address."""
+    authorization = headers.get("authorization")
+    if authorization:
+        return "auth:" + _digest(authorization)
+    return f"host:{host or ''}"
+
+
+def request_fingerprint(params: Any) -> str:
+    """A stable hash of the JSON-RPC ``params``; the envelope ``id`` may change between retries."""
+    return _digest(json.dumps(params, sort_keys=True, separators=(",", ":"), default=str))
+
+
+class IdempotencyCache:
+    def __init__(
+        self,
+        store: SharedStore,
+        *,
+        ttl: float = 600.0,
+        poll_interval: float = 0.1,
+    ) -> None:
+        self.store = store
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        # Work running in this worker, resolved with its result or ``None`` on failure.
+        self._running: Dict[str, asyncio.Future] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def key_for(
+        self,
+        agent: str,
+        message: A2AMessage,
+        header: Optional[str] = None,
+        *,
+        caller: str = "",
+    ) -> Optional[str]:
+        """The request's idempotency key, or ``None`` when it has none.
+
+        Only a ``messageId`` sent by the client counts; the model fills in a
+        random one otherwise, which would never match a retry.
+        """
+        if not self.enabled:
+            return None
+        if header:
+            return f"{agent}:{caller}:key:{header}"
+        if "messageId" in message.model_fields_set:
+            return f"{agent}:{caller}:message:{message.messageId}"
+        return None
+
+    async def replay(self, key: str, fingerprint: Optional[str] = None) -> Optional[TaskResult]:
+        """Return the stored result for ``key`` if the original has completed."""
+        entry = await self.store.aget(_NAMESPACE, key)
+        if not entry:
+            return None
+        self._check(key, entry, fingerprint)
+        if entry.get("state") != _DONE:
+            return None
+        metrics.inc("idempotent_requests_total", outcome="replayed")
+        return TaskResult.model_validate(entry["result"])
+
+    @staticmethod
+    def _check(key: str, entry: Mapping[str, Any], fingerprint: Optional[str]) -> None:
+        stored = entry.get("fingerprint")
+        if fingerprint is not None and stored is not None and stored != fingerprint:
+            metrics.inc("idempotent_requests_total", outcome="conflict")
+            raise IdempotencyConflict(key)
+
+    async def run(
+        self,
+        key: str,
+        work: Callable[[], Awaitable[TaskResult]],
+        *,
+        lease: float,
+        fingerprint: Optional[str] = None,
+    ) -> Tuple[TaskResult, bool]:
+        """Run ``work`` once per key; returns the result and whether it was reused.
+
+        ``lease`` bounds how long other workers wait on this claim, and should
+        cover the request's deadline. Raises ``IdempotencyConflict`` when the
+        key belongs to a request with another ``fingerprint``.
+        """
+        while True:
+            replayed = await self.replay(key, fingerprint)
+            if replayed is not None:
+                return replayed, True
+            running = self._running.get(key)
+            if running is not None:
+                result = await asyncio.shield(running)
+                if result is not None:
+                    metrics.inc("idempotent_requests_total", outcome="attached")
+                    return result, True
+                continue
+            claim = {"state": _RUNNING, "fingerprint": fingerprint}
+            if not await self.store.aadd(_NAMESPACE, key, claim, ttl=lease):
+                # Another worker is running it; its claim expires with its lease.
+                await asyncio.sleep(self.poll_interval)
+                continue
+            return await self._execute(key, work, fingerprint), False
+
+    async def _execute(
+        self,
+        key: str,
+        work: Callable[[], Awaitable[TaskResult]],
+        fingerprint: Optional[str],
+    ) -> TaskResult:
+        future = asyncio.get_running_loop().create_future()
+        self._running[key] = future
+        result: Optional[TaskResult] = None
+        try:
+            result = await work()
+            return result
+        finally:
+            self._running.pop(key, None)
+            succeeded = result is not None and result.status.state != "failed"
+            # Local waiters retry a failure themselves, like waiters in other
+            # workers do once the claim is released below.
+            future.set_result(result if succeeded else None)
+            if succeeded:
+                await self.store.aset(
+                    _NAMESPACE,
+                    key,
+                    {
+                        "state": _DONE,
+                        "fingerprint": fingerprint,
+                        "result": result.model_dump(mode="json"),
+                    },
+                    ttl=self.ttl,
+                )
+                metrics.inc("idempotent_requests_total", outcome="executed")
+            else:
+                # Failures (e.g. an exhausted deadline) are not replayed; a
+                # retry should get a fresh attempt.
+                await self.store.adelete(_NAMESPACE, key)
+                logger.debug("Released idempotency claim", key=key)
+
+
+idempotency_cache = IdempotencyCache(
+    shared_store,
+    ttl=settings.idempotency_ttl,
+    poll_interval=settings.idempotency_poll_interval,
+)
@@ -0,0 +1,469 @@
+"""Offline bulk jobs: NDJSON in, NDJSON out, resumable after a crash.
+
+Each job lives in its own directory::
+
+    <jobs_path>/<job_id>/input.ndjson    # uploaded messages, one per line
+    <jobs_path>/<job_id>/results.ndjson  # one result per processed line, in completion order
+    <jobs_path>/<job_id>/state.json      # checkpointed progress, replaced atomically
+    <jobs_path>/<job_id>/lock            # flock held by the process running the job
+
+``results.ndjson`` is the source of truth for what is done: on resume the
+line indexes already present there are skipped, and a torn trailing line
+from a crash is discarded. ``state.json`` is rewritten every
+``checkpoint_interval`` items so any worker can report progress. Items
+that could not get capacity are not written at all: they stay pending and
+are retried in a later pass, or after a restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from pydantic import ValidationError
+
+from app.config import settings
+from app.shared.admission import admission_controller
+from app.shared.bulkhead import BulkheadFull
+from app.shared.deadline import Deadline, DeadlineExceeded, deadline_scope
+from app.shared.priority import BACKGROUND, lane_scope, resolve_lane
+from models.a2a import A2AMessage, TaskResult
+
+Dispatch = Callable[..., Awaitable[TaskResult]]
+
+TERMINAL_STATES = ("completed", "failed", "cancelled")
+
+_STREAM_CHUNK = 64 * 1024
+
+
+@dataclass
+class JobState:
+    id: str
+    agent: str
+    state: str = "queued"
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    deferred: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    updated_at: float = field(default_factory=time.time)
+    items_per_second: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def processed(self) -> int:
+        return self.completed + self.failed
+
+    def progress(self) -> Dict[str, Any]:
+        remaining = max(0, self.total - self.processed)
+        eta = remaining / self.items_per_second if self.items_per_second else None
+        return {
+            **asdict(self),
+            "processed": self.processed,
+            "remaining": remaining,
+            "percent": round(100.0 * self.processed / self.total, 1) if self.total else 100.0,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+
+
+class _RateLimiter:
+    """Token bucket spacing item starts to ``rate`` per second (0 = unlimited)."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._next = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + 1.0 / self.rate
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class JobManager:
+    """Accepts bulk jobs and runs them through an agent with bounded concurrency.
+
+    Items share the interactive admission limit and the agent's bulkhead;
+    when either is saturated the item backs off and retries instead of
+    failing, so bulk work yields to live traffic and to LLM quota pressure.
+    An item still refused after ``max_attempts`` stays pending for the next
+    pass rather than being marked failed.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        concurrency: int = 4,
+        rate_limit: float = 0.0,
+        checkpoint_interval: int = 50,
+        max_attempts: int = 5,
+        item_timeout: float = 30.0,
+        stream_stall_timeout: float = 300.0,
+    ) -> None:
+        self.root = root
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.checkpoint_interval = checkpoint_interval
+        self.max_attempts = max_attempts
+        self.item_timeout = item_timeout
+        self.stream_stall_timeout = stream_stall_timeout
+        self._dispatchers: Dict[str, Dispatch] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def register(self, agent: str, dispatch: Dispatch) -> None:
+        """Allow jobs for ``agent``; ``dispatch(message, *, context_id, task_id)`` runs one item."""
+        self._dispatchers[agent] = dispatch
+
+    def _job_dir(self, job_id: str) -> Path:
+        if not job_id or "/" in job_id or job_id.startswith("."):
+            raise KeyError(job_id)
+        return self.root / job_id
+
+    # -- submission and inspection -------------------------------------------------
+
+    async def submit(self, agent: str, chunks: AsyncIterator[bytes]) -> JobState:
+        """Persist an NDJSON upload and start processing it in the background."""
+        if agent not in self._dispatchers:
+            raise KeyError(agent)
+        job = JobState(id=uuid.uuid4().hex, agent=agent)
+        job_dir = self._job_dir(job.id)
+        await asyncio.to_thread(job_dir.mkdir, parents=True, exist_ok=True)
+        pending = b""
+        # File I/O runs off the loop: uploads can be large and disks slow.
+        handle = await asyncio.to_thread(open, job_dir / "input.ndjson", "wb")
+        try:
+            async for chunk in chunks:
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                if lines:
+                    job.total += await asyncio.to_thread(self._write_lines, handle, lines)
+            job.total += await asyncio.to_thread(self._write_lines, handle, [pending])
+        finally:
+            await asyncio.to_thread(handle.close)
+        await asyncio.to_thread(self._save, job)
+        logger.info("Bulk job accepted", job_id=job.id, agent=agent, total=job.total)
+        self._start(job.id)
+        return job
+
+    @staticmethod
+    def _write_lines(handle, lines: List[bytes]) -> int:
+        written = 0
+        for line in lines:
+            line = line.strip()
+            if line:
+                handle.write(line + b"\n")
+                written += 1
+        return written
+
+    def status(self, job_id: str) -> Optional[JobState]:
+        try:
+            payload = json.loads((self._job_dir(job_id) / "state.json").read_text())
+        except (KeyError, OSError, ValueError):
+            return None
+        return JobState(**payload)
+
+    def list(self) -> List[JobState]:
+        if not self.root.exists():
+            return []
+        jobs = [self.status(path.name) for path in self.root.iterdir() if path.is_dir()]
+        return sorted((job for job in jobs if job), key=lambda job: job.created_at)
+
+    def cancel(self, job_id: str) -> Optional[JobState]:
+        """Ask the job to stop; the running process notices between items."""
+        job = self.status(job_id)
+        if job is None:
+            return None
+        if job.state not in TERMINAL_STATES:
+            (self._job_dir(job_id) / "cancel").touch()
+            task = self._tasks.get(job_id)
+            if task is None or task.done():
+                # Not running anywhere we know of: mark it directly.
+                job.state = "cancelled"
+                job.finished_at = time.time()
+                self._save(job)
+        return job
+
+    async def stream_results(self, job_id: str, *, follow: bool = False) -> AsyncIterator[bytes]:
+        """Yield result lines; with ``follow`` keep tailing until the job finishes.
+
+        Reads happen off the loop in chunks. A followed job that makes no
+        progress for ``stream_stall_timeout`` seconds (e.g. one that is still
+        queued) ends the stream; the client can reconnect later.
+        """
+        path = self._job_dir(job_id) / "results.ndjson"
+        offset = 0
+        pending = b""
+        last_update: Optional[float] = None
+        last_progress = time.monotonic()
+        while True:
+            job = await asyncio.to_thread(self.status, job_id)
+            finished = job is None or job.state in TERMINAL_STATES
+            if job is not None and job.updated_at != last_update:
+                last_update = job.updated_at
+                last_progress = time.monotonic()
+            while True:
+                chunk = await asyncio.to_thread(self._read_chunk, path, offset)
+                offset += len(chunk)
+                pending += chunk
+                cut = pending.rfind(b"\n") + 1
+                if cut:
+                    yield pending[:cut]
+                    pending = pending[cut:]
+                    last_progress = time.monotonic()
+                if len(chunk) < _STREAM_CHUNK:
+                    break
+            if not follow or finished:
+                return
+            if time.monotonic() - last_progress >= self.stream_stall_timeout:
+                logger.info("Stopped following a stalled bulk job", job_id=job_id)
+                return
+            await asyncio.sleep(0.5)
+
+    @staticmethod
+    def _read_chunk(path: Path, offset: int) -> bytes:
+        try:
+            with open(path, "rb") as handle:
+                handle.seek(offset)
+                return handle.read(_STREAM_CHUNK)
+        except FileNotFoundError:
+            return b""
+
+    # -- execution ------------------------------------------------------------------
+
+    def resume_pending(self) -> List[str]:
+        """Restart every unfinished job; run once per process at startup."""
+        resumed = []
+        for job in self.list():
+            if job.state not in TERMINAL_STATES and job.agent in self._dispatchers:
+                self._start(job.id)
+                resumed.append(job.id)
+        return resumed
+
+    def _start(self, job_id: str) -> None:
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            self._tasks[job_id] = asyncio.get_running_loop().create_task(self._run(job_id))
+
+    async def shutdown(self) -> None:
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job_id: str) -> None:
+        job_dir = self._job_dir(job_id)
+        lock = open(job_dir / "lock", "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another worker process already owns this job.
+            lock.close()
+            return
+        try:
+            await self._run_locked(job_id, job_dir)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+            lock.close()
+
+    async def _run_locked(self, job_id: str, job_dir: Path) -> None:
+        job = self.status(job_id)
+        if job is None or job.state in TERMINAL_STATES:
+            return
+        done, job.completed, job.failed = self._recover_results(job_dir / "results.ndjson")
+        job.state = "running"
+        job.started_at = job.started_at or time.time()
+        self._save(job)
+        if done:
+            logger.info("Resuming bulk job", job_id=job_id, already_done=len(done))
+
+        dispatch = self._dispatchers[job.agent]
+        queue: asyncio.Queue[Optional[Tuple[int, bytes]]] = asyncio.Queue(self.concurrency * 2)
+        limiter = _RateLimiter(self.rate_limit)
+        run_started = time.monotonic()
+        run_processed = 0
+        since_checkpoint = 0
+        deferred = 0
+        results = open(job_dir / "results.ndjson", "ab")
+        cancel_marker = job_dir / "cancel"
+
+        async def produce() -> None:
+            with open(job_dir / "input.ndjson", "rb") as handle:
+                for index, line in enumerate(handle):
+                    if cancel_marker.exists():
+                        break
+                    if index not in done:
+                        await queue.put((index, line))
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        async def consume() -> None:
+            nonlocal run_processed, since_checkpoint, deferred
+            while (item := await queue.get()) is not None:
+                if cancel_marker.exists():
+                    continue
+                index, line = item
+                await limiter.wait()
+                outcome = await self._process(dispatch, index, line)
+                if outcome is None:
+                    # Still no capacity: leave the item pending for the next pass.
+                    deferred += 1
+                    continue
+                record, ok = outcome
+                done.add(index)
+                results.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+                if ok:
+                    job.completed += 1
+                else:
+                    job.failed += 1
+                run_processed += 1
+                since_checkpoint += 1
+                if since_checkpoint >= self.checkpoint_interval:
+                    since_checkpoint = 0
+                    elapsed = time.monotonic() - run_started
+                    job.items_per_second = round(run_processed / elapsed, 3) if elapsed else 0.0
+                    await asyncio.to_thread(self._checkpoint, job, results)
+
+        try:
+            while True:
+                deferred = 0
+                await asyncio.gather(produce(), *(consume() for _ in range(self.concurrency)))
+                job.deferred = deferred
+                if not deferred or cancel_marker.exists():
+                    break
+                # Busy server: checkpoint, wait for live traffic to ease, and
+                # run another pass over the items still pending.
+                logger.info("Retrying deferred bulk items", job_id=job_id, deferred=deferred)
+                await asyncio.to_thread(self._checkpoint, job, results)
+                await asyncio.sleep(settings.admission_retry_after * self.max_attempts)
+            job.state = "cancelled" if cancel_marker.exists() else "completed"
+        except asyncio.CancelledError:
+            # Shutdown: keep the job resumable and checkpoint what finished.
+            job.state = "queued"
+            raise
+        except Exception as exc:  # pragma: no cover - defensive
+            logger.exception("Bulk job crashed", job_id=job_id)
+            job.state = "failed"
+            job.error = str(exc)
+        finally:
+            elapsed = time.monotonic() - run_started
+            job.items_per_second = round(run_processed / elapsed, 3) if elapsed else 0.0
+            if job.state in TERMINAL_STATES:
+                job.finished_at = time.time()
+            self._checkpoint(job, results)
+            results.close()
+            logger.info(
+                "Bulk job stopped",
+                job_id=job_id,
+                state=job.state,
+                completed=job.completed,
+                failed=job.failed,
+                items_per_second=job.items_per_second,
+            )
+
+    async def _process(
+        self, dispatch: Dispatch, index: int, line: bytes
+    ) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """Run one input line; returns the result record and whether it succeeded.
+
+        Returns ``None`` when the server stayed busy for every attempt.
+        """
+        try:
+            payload = json.loads(line)
+            inner = payload.get("message", payload) if isinstance(payload, dict) else payload
+            message = A2AMessage.model_validate(inner)
+        except (ValueError, ValidationError) as exc:
+            return {"index": index, "error": f"Invalid message: {exc}"}, False
+        context_id = payload.get("contextId")
+        task_id = payload.get("taskId")
+        record: Dict[str, Any] = {"index": index, "messageId": message.messageId}
+
+        # Bulk items are background work unless the message says otherwise.
+        lane = resolve_lane(None, message.metadata, default=BACKGROUND)
+        for attempt in range(1, self.max_attempts + 1):
+            if not admission_controller.try_acquire(lane):
+                await asyncio.sleep(settings.admission_retry_after * attempt)
+                continue
+            try:
+                with deadline_scope(Deadline.after(self.item_timeout)), lane_scope(lane):
+                    result = await dispatch(message, context_id=context_id, task_id=task_id)
+            except BulkheadFull:
+                await asyncio.sleep(settings.admission_retry_after * attempt)
+                continue
+            except DeadlineExceeded as exc:
+                record["error"] = f"Deadline exceeded at stage '{exc.stage}'"
+                return record, False
+            except Exception as exc:
+                logger.exception("Bulk job item failed", index=index)
+                record["error"] = str(exc)
+                return record, False
+            finally:
+                admission_controller.release()
+            record["result"] = result.model_dump(mode="json", exclude={"history"}, exclude_none=True)
+            return record, result.status.state == "completed"
+
+        return None
+
+    @staticmethod
+    def _recover_results(path: Path) -> Tuple[Set[int], int, int]:
+        """Return (done indexes, completed, failed), dropping a torn trailing line."""
+        done: Set[int] = set()
+        completed = failed = 0
+        if not path.exists():
+            return done, completed, failed
+        valid_bytes = 0
+        with open(path, "rb") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                valid_bytes += len(line)
+                done.add(record["index"])
+                ok = "error" not in record and record.get("result", {}).get("status", {}).get("state") == "completed"
+                completed += ok
+                failed += not ok
+        if valid_bytes != path.stat().st_size:
+            with open(path, "r+b") as handle:
+                handle.truncate(valid_bytes)
+        return done, completed, failed
+
+    def _checkpoint(self, job: JobState, results) -> None:
+        results.flush()
+        os.fsync(results.fileno())
+        self._save(job)
+
+    def _save(self, job: JobState) -> None:
+        job.updated_at = time.time()
+        path = self._job_dir(job.id) / "state.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(asdict(job)))
+        os.replace(tmp, path)
+
+
+job_manager = JobManager(
+    Path(settings.jobs_path),
+    concurrency=settings.bulk_job_concurrency,
+    rate_limit=settings.bulk_job_rate_limit,
+    checkpoint_interval=settings.bulk_job_checkpoint_interval,
+    max_attempts=settings.bulk_job_max_attempts,
+    item_timeout=settings.request_timeout,
+    stream_stall_timeout=settings.bulk_job_stream_stall_timeout,
+)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Tuple
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z0-9_-]*\s*|\s*```\s*$")
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+
+
+def parse_json_tolerant(text: str) -> Tuple[Any, bool]:
+    """Parse JSON emitted by an LLM, repairing common defects.
+
+    Handles Markdown code fences, prose before or after the object, trailing
+    commas and objects truncated mid-stream (unterminated strings and
+    unclosed brackets). Returns ``(value, repaired)``; raises ``ValueError``
+    when nothing usable can be recovered.
+    """
+    try:
+        return json.loads(text), False
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    candidate = _FENCE_RE.sub("", (text or "").strip())
+    start = _first_container(candidate)
+    if start < 0:
+        raise ValueError("No JSON object found in model output")
+    candidate = _balance(candidate[start:])
+    candidate = _TRAILING_COMMA_RE.sub(r"\1", candidate)
+    try:
+        return json.loads(candidate), True
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Unrepairable JSON: {exc}") from exc
+
+
+def _first_container(text: str) -> int:
+    positions = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    return min(positions) if positions else -1
+
+
+def _balance(text: str) -> str:
+    """Cut at the end of the first complete value, or close a truncated one."""
+    closers = []
+    in_string = False
+    escaped = False
+    string_start = -1
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+            string_start = index
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if closers:
+                closers.pop()
+            if not closers:
+                return text[: index + 1]
+
+    # Truncated: finish the open string, drop a dangling separator, then close.
+    repaired = text
+    if in_string:
+        if escaped:
+            repaired = repaired[:-1]
+        repaired += '"'
+    repaired = repaired.rstrip()
+    if repaired.endswith(","):
+        repaired = repaired[:-1]
+    elif repaired.endswith(":"):
+        repaired += " null"
+    elif repaired.endswith('"') and closers and closers[-1] == "}":
+        # A bare string directly after "{" or "," is a key with no value yet.
+        preceding = text[:string_start].rstrip()[-1:]
+        if preceding in ("{", ","):
+            repaired += ": null"
+    return repaired + "".join(reversed(closers))
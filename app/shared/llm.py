@@ -3,16 +3,43 @@ from __future__ import annotations
 import asyncio
 import inspect
 import json
+import time
 import uuid
 from loguru import logger
 from collections.abc import Callable, Mapping
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Any, Literal
 
+from app.config import settings
+from app.shared.admission import admission_controller
+from app.shared.bulkhead import Bulkhead
 from app.llm_client import _build_groq_client, _build_instructor_client
+from app.shared.circuit import CircuitOpen, circuit_breakers
+from app.shared.capture import LLMCassette, load_cassette, request_key, traffic_recorder
+from app.shared.credentials import (
+    Credential,
+    CredentialPool,
+    CredentialsExhausted,
+    credential_pool,
+    is_provider_failure,
+)
+from app.shared.deadline import DeadlineExceeded, current_deadline
+from app.shared.store import shared_store
 from models.tool_call import ResponseModel
 
 
+PROVIDER = "groq"
+
+# Every provider call takes a slot here, so queued interactive calls go ahead
+# of background ones at each LLM-call boundary (see app.shared.priority).
+provider_bulkhead = Bulkhead(
+    "llm",
+    max_concurrency=settings.llm_max_concurrency,
+    max_queue=settings.llm_max_queue,
+)
+
+
 @dataclass
 class ConversationResult:
     """Container that exposes the detected intent and final completion."""
@@ -24,10 +51,98 @@ class ConversationResult:
 class LLMClient:
     """Async wrapper capable of routing between normal chat and tool flows."""
 
-    def __init__(self) -> None:
-        self._block_client = _build_groq_client()
-        self._instructor_client = _build_instructor_client()
+    def __init__(
+        self,
+        *,
+        cassette: LLMCassette | None = None,
+        cache_completions: bool = True,
+        credentials: CredentialPool | None = None,
+        bulkhead: Bulkhead | None = None,
+    ) -> None:
         self._logger = logger
+        self.cache_completions = cache_completions
+        self.credentials = credentials or credential_pool
+        self.bulkhead = bulkhead or provider_bulkhead
+        # Provider clients, built on first use per pooled key.
+        self._block_clients: dict[str, Any] = {}
+        self._instructor_clients: dict[str, Any] = {}
+        if cassette is not None:
+            # Overrides the settings-driven cassette (used by warm-up stand-ins).
+            self.__dict__["_cassette"] = cassette
+
+    @cached_property
+    def _cassette(self) -> LLMCassette | None:
+        return load_cassette(settings.llm_cassette_path)
+
+    def _block_client(self, credential: Credential):
+        client = self._block_clients.get(credential.name)
+        if client is None:
+            logger.debug("Building Groq chat client", key=credential.name)
+            # With several keys a failed call moves on to the next key instead
+            # of the SDK retrying the same one.
+            client = _build_groq_client(
+                credential.api_key,
+                max_retries=0 if len(self.credentials) > 1 else None,
+            )
+            self._block_clients[credential.name] = client
+        return client
+
+    def _instructor_client(self, credential: Credential):
+        client = self._instructor_clients.get(credential.name)
+        if client is None:
+            logger.debug("Building instructor client", key=credential.name)
+            client = _build_instructor_client(self._block_client(credential))
+            self._instructor_clients[credential.name] = client
+        return client
+
+    def warm_up(self, *, timeout: float = 5.0) -> str:
+        """Build provider clients and open a pooled connection per API key.
+
+        Returns a short description of what was done, for the warm-up report.
+        Keys the provider rejects are evicted from the pool.
+        """
+        if self._cassette is not None:
+            return "cassette"
+        if not self.credentials.configured:
+            return "skipped: no API key"
+        connected = 0
+        error: Exception | None = None
+        for credential in self.credentials:
+            try:
+                # A cheap authenticated request leaves a TLS connection in the pool.
+                self._block_client(credential).with_options(
+                    timeout=timeout, max_retries=0
+                ).models.list()
+            except Exception as exc:
+                self.credentials.failed(credential, exc)
+                logger.warning("API key warm-up failed", key=credential.name, error=str(exc))
+                error = exc
+                continue
+            self._instructor_client(credential)
+            connected += 1
+        if connected == 0 and error is not None:
+            raise error
+        if len(self.credentials) == 1:
+            return "connected"
+        return f"connected {connected}/{len(self.credentials)} keys"
+
+    def circuit_open(self, model: str) -> CircuitOpen | None:
+        """Return the open-circuit (or exhausted key pool) error ``model`` would hit right now, if any."""
+        breaker = circuit_breakers.get(PROVIDER, model)
+        if breaker.enabled and breaker.state == "open":
+            return CircuitOpen(breaker.name, breaker.retry_after())
+        if self._cassette is None:
+            return self.credentials.exhausted()
+        return None
+
+    def close(self) -> None:
+        """Release provider connections opened by lazily built clients."""
+        block_clients, self._block_clients = self._block_clients, {}
+        self._instructor_clients = {}
+        # Instructor clients wrap these, so closing them releases every connection.
+        for block_client in block_clients.values():
+            block_client.close()
+
     async def generate_response(
         self,
         *,
@@ -65,46 +180,57 @@ class LLMClient:
         max_output_tokens: int | None = None,
         log_context: Mapping[str, Any] | None = None,
     ) -> ConversationResult:
-        """Determine the flow to use and return the final completion."""
+        """Determine the flow to use and return the final completion.
+
+        Every stage runs within the remaining budget of the current request
+        deadline (see ``app.shared.deadline``). Once it is spent, the remaining
+        stages are skipped and ``DeadlineExceeded`` is raised carrying the
+        intent and tool results gathered so far in ``partial``.
+        """
         logger.info(
             "Starting routed conversation",
             message_count=len(messages),
             has_tools=bool(tools),
         )
 
-        intent = await self._determine_intent(
-            intent_messages=intent_messages,
-            intent_response_format=intent_response_format,
-            model=model,
-            temperature=temperature,
-            max_output_tokens=max_output_tokens,
-
-        )
-
-        logger.info("Intent classified", intent=intent)
-
-        needs_tools = intent == "tool_call" and tools and tool_registry
-
-        if needs_tools:
-            completion = await self._run_tool_flow(
-                messages=messages,
-                model=model,
-                temperature=temperature,
-                response_format=response_format,
-                tools=tools,
-                tool_registry=tool_registry,
-                max_output_tokens=max_output_tokens,
-            )
-        else:
-            completion = await self._run_chat_flow(
-                messages=messages,
+        intent: str | None = None
+        try:
+            intent = await self._determine_intent(
+                intent_messages=intent_messages,
+                intent_response_format=intent_response_format,
                 model=model,
                 temperature=temperature,
-                response_format=response_format,
                 max_output_tokens=max_output_tokens,
-                tools=tools if needs_tools else None,
             )
 
+            logger.info("Intent classified", intent=intent)
+
+            needs_tools = intent == "tool_call" and tools and tool_registry
+
+            if needs_tools:
+                completion = await self._run_tool_flow(
+                    messages=messages,
+                    model=model,
+                    temperature=temperature,
+                    response_format=response_format,
+                    tools=tools,
+                    tool_registry=tool_registry,
+                    max_output_tokens=max_output_tokens,
+                )
+            else:
+                completion = await self._run_chat_flow(
+                    messages=messages,
+                    model=model,
+                    temperature=temperature,
+                    response_format=response_format,
+                    max_output_tokens=max_output_tokens,
+                    tools=tools if needs_tools else None,
+                )
+        except DeadlineExceeded as exc:
+            exc.partial.setdefault("intent", intent)
+            logger.warning("Routed conversation ran out of time", stage=exc.stage, intent=intent)
+            raise
+
         content_preview = self._preview_text(
             completion.choices[0].message.content or ""
         )
@@ -127,6 +253,7 @@ class LLMClient:
             temperature=temperature,
             response_format=intent_response_format,
             max_output_tokens=max_output_tokens,
+            stage="intent",
         )
         content = completion.choices[0].message.content or "{}"
         try:
@@ -203,6 +330,7 @@ class LLMClient:
         planned_tools = [call.tool_name for call in plan.tool_calls]
         logger.info("Tool calls planned", planned_tools=planned_tools)
 
+        tool_results: list[dict[str, Any]] = []
         for call in plan.tool_calls:
             tool_name = call.tool_name
             tool_fn = tool_registry.get(tool_name)
@@ -212,7 +340,14 @@ class LLMClient:
 
             arguments = self._parse_tool_arguments(call.tool_parameters)
             logger.info("Executing tool", tool_name=tool_name, arguments=arguments)
-            result = await self._execute_tool(tool_fn, arguments)
+            try:
+                result = await self._execute_tool(
+                    tool_fn, arguments, stage=f"tool:{tool_name}"
+                )
+            except DeadlineExceeded as exc:
+                exc.partial["tool_results"] = tool_results
+                raise
+            tool_results.append({"tool": tool_name, "arguments": arguments, "result": result})
             tool_output = self._stringify_tool_output(result)
             logger.info(
                 "Tool completed",
@@ -249,13 +384,17 @@ class LLMClient:
         )
         augmented_messages.extend(tool_messages)
 
-        return await self._run_chat_flow(
-            messages=augmented_messages,
-            model=model,
-            temperature=temperature,
-            response_format=response_format,
-            max_output_tokens=max_output_tokens,
-        )
+        try:
+            return await self._run_chat_flow(
+                messages=augmented_messages,
+                model=model,
+                temperature=temperature,
+                response_format=response_format,
+                max_output_tokens=max_output_tokens,
+            )
+        except DeadlineExceeded as exc:
+            exc.partial["tool_results"] = tool_results
+            raise
 
     async def _block_completion(
         self,
@@ -267,6 +406,7 @@ class LLMClient:
         max_output_tokens: int | None,
         tools: list[dict[str, Any]] | None = None,
         tool_choice: Literal["auto"] | str | None = None,
+        stage: str = "completion",
     ):
         kwargs: dict[str, Any] = {
             "model": model,
@@ -281,10 +421,30 @@ class LLMClient:
             kwargs["tools"] = tools
         if tool_choice is not None:
             kwargs["tool_choice"] = tool_choice
-        completion = await asyncio.to_thread(
-            self._block_client.chat.completions.create,
-            **kwargs,
+        cache_key = (
+            request_key("completion", kwargs)
+            if self.cache_completions and settings.completion_cache_ttl > 0
+            else None
         )
+        cached = await shared_store.aget("completions", cache_key) if cache_key else None
+        if cached is not None:
+            logger.debug("Completion served from shared cache")
+            return _completion_from_payload(cached)
+
+        if self._cassette is not None:
+            completion = _completion_from_payload(
+                self._cassette.lookup("completion", kwargs)
+            )
+        else:
+            completion = await self._timed_provider_call("completion", kwargs, stage=stage)
+        if cache_key and completion.choices[0].finish_reason == "stop":
+            await shared_store.aset(
+                "completions",
+                cache_key,
+                completion.model_dump(mode="json", exclude_none=True),
+                ttl=settings.completion_cache_ttl,
+            )
+        traffic_recorder.record_llm("completion", kwargs, completion)
         content = completion.choices[0].message.content or ""
         logger.debug(
             "Chat completion received",
@@ -305,10 +465,13 @@ class LLMClient:
             "temperature": temperature,
             "response_model": ResponseModel,
         }
-        plan = await asyncio.to_thread(
-            self._instructor_client.chat.completions.create,
-            **kwargs,
-        )
+        if self._cassette is not None:
+            plan = ResponseModel.model_validate(
+                self._cassette.lookup("tool_plan", kwargs)
+            )
+        else:
+            plan = await self._timed_provider_call("tool_plan", kwargs, stage="tool_plan")
+        traffic_recorder.record_llm("tool_plan", kwargs, plan)
         logger.debug(
             "Tool plan received",
             call_count=len(plan.tool_calls),
@@ -316,14 +479,126 @@ class LLMClient:
         )
         return plan
 
+    async def _timed_provider_call(
+        self, kind: Literal["completion", "tool_plan"], kwargs: dict[str, Any], *, stage: str
+    ) -> Any:
+        """Run a blocking provider call off-loop within the remaining request budget.
+
+        The call first waits for a slot in the provider bulkhead in the
+        request's priority lane; running out of budget while queued raises
+        ``DeadlineExceeded``.
+        """
+        deadline = current_deadline()
+        timeout = deadline.check(stage) if deadline is not None else None
+        admitted = False
+        try:
+            async with self.bulkhead.slot(timeout=timeout):
+                admitted = True
+                return await self._breaker_call(kind, kwargs, stage=stage)
+        except asyncio.TimeoutError as exc:
+            if admitted:
+                raise
+            raise DeadlineExceeded(stage) from exc
+
+    async def _breaker_call(
+        self, kind: Literal["completion", "tool_plan"], kwargs: dict[str, Any], *, stage: str
+    ) -> Any:
+        """Make one provider call behind the model's circuit breaker.
+
+        The SDK receives the remaining budget as its HTTP timeout so the worker
+        thread and its connection are released when the deadline passes, and
+        the latency is reported to admission control and to the circuit
+        breaker for the model, which raises ``CircuitOpen`` without calling
+        the provider while the circuit is open. The call is made with a key
+        borrowed from the credential pool (see ``_pooled_call``).
+        """
+        deadline = current_deadline()
+        remaining = None
+        if deadline is not None:
+            remaining = deadline.check(stage)
+            kwargs = {**kwargs, "timeout": remaining}
+        breaker = circuit_breakers.get(PROVIDER, kwargs["model"])
+        breaker.before_call()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._pooled_call(kind, kwargs), remaining)
+        except (asyncio.CancelledError, CredentialsExhausted):
+            breaker.release()
+            raise
+        except Exception as exc:
+            latency = time.perf_counter() - started
+            if deadline is not None and (isinstance(exc, TimeoutError) or deadline.expired):
+                # A short client budget says little about the provider; only
+                # count it once the call was slow by the breaker's standard.
+                if latency >= breaker.slow_call_seconds:
+                    admission_controller.observe(latency, failed=True)
+                    breaker.record(latency, failed=True)
+                else:
+                    breaker.release()
+                raise DeadlineExceeded(stage) from exc
+            # Client errors (e.g. a 400) mean the provider answered promptly.
+            failed = is_provider_failure(exc)
+            admission_controller.observe(latency, failed=failed)
+            breaker.record(latency, failed=failed)
+            raise
+        latency = time.perf_counter() - started
+        admission_controller.observe(latency)
+        breaker.record(latency)
+        return result
+
+    async def _pooled_call(self, kind: str, kwargs: dict[str, Any]) -> Any:
+        """Call the provider with the best pooled key, moving on to the next key
+        when one is throttled, rejected or failing."""
+        tried: set[str] = set()
+        error: Exception | None = None
+        while True:
+            credential = self.credentials.acquire(exclude=tried)
+            if credential is None:
+                raise error
+            try:
+                result, headers = await asyncio.to_thread(
+                    self._provider_request, kind, credential, kwargs
+                )
+            except asyncio.CancelledError:
+                self.credentials.abandoned(credential)
+                raise
+            except Exception as exc:
+                if not self.credentials.failed(credential, exc):
+                    raise
+                logger.warning("Provider call failed; trying another key", key=credential.name, error=str(exc))
+                tried.add(credential.name)
+                error = exc
+                continue
+            self.credentials.succeeded(credential, headers)
+            return result
+
+    def _provider_request(
+        self, kind: str, credential: Credential, kwargs: dict[str, Any]
+    ) -> tuple[Any, Mapping[str, str] | None]:
+        if kind == "tool_plan":
+            return self._instructor_client(credential).chat.completions.create(**kwargs), None
+        # The raw response carries the key's x-ratelimit-* headers.
+        response = self._block_client(credential).chat.completions.with_raw_response.create(**kwargs)
+        return response.parse(), response.headers
+
     async def _execute_tool(
-        self, tool_fn: Callable[..., Any], arguments: dict[str, Any]
+        self, tool_fn: Callable[..., Any], arguments: dict[str, Any], *, stage: str
     ) -> Any:
+        deadline = current_deadline()
+        remaining = deadline.check(stage) if deadline is not None else None
         if inspect.iscoroutinefunction(tool_fn):
-            return await tool_fn(**arguments)
-        result = tool_fn(**arguments)
-        if inspect.isawaitable(result):
-            return await result
+            call = tool_fn(**arguments)
+        else:
+            # Synchronous tools may block; keep them off the event loop.
+            call = asyncio.to_thread(tool_fn, **arguments)
+        try:
+            result = await asyncio.wait_for(call, remaining)
+            if inspect.isawaitable(result):
+                result = await asyncio.wait_for(
+                    result, deadline.check(stage) if deadline is not None else None
+                )
+        except TimeoutError as exc:
+            raise DeadlineExceeded(stage) from exc
         return result
 
     @staticmethod
@@ -356,6 +631,12 @@ class LLMClient:
         return f"{text[:limit]}…"
 
 
+def _completion_from_payload(payload: dict[str, Any]):
+    from groq.types.chat import ChatCompletion
+
+    return ChatCompletion.model_validate(payload)
+
+
 llm_client = LLMClient()
 
 
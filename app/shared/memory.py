@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.shared.store import SharedStore, shared_store
+from models.time_conversion import TimeNLConvertResponse
+
+MEMORY_NAMESPACE = "memory"
+_EXPRESSION_LIMIT = 120
+_SUMMARY_ZONE_LIMIT = 12
+
+
+@dataclass
+class ConversationTurn:
+    """One resolved request, kept as structured data rather than a transcript."""
+
+    expression: str
+    source: Dict[str, str]
+    targets: List[str]
+
+    def render(self) -> str:
+        source = self.source
+        return (
+            f'- "{self.expression}" -> {source.get("time")} {source.get("date")} '
+            f'{source.get("timezone")}; targets: {", ".join(self.targets) or "none"}'
+        )
+
+
+@dataclass
+class ConversationState:
+    turns: List[ConversationTurn] = field(default_factory=list)
+    folded_turns: int = 0
+    folded_zones: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_payload(cls, payload: Optional[Dict[str, Any]]) -> "ConversationState":
+        if not payload:
+            return cls()
+        return cls(
+            turns=[ConversationTurn(**turn) for turn in payload.get("turns", [])],
+            folded_turns=payload.get("folded_turns", 0),
+            folded_zones=list(payload.get("folded_zones", [])),
+        )
+
+    def render(self) -> str:
+        lines = ["Conversation so far (oldest first):"]
+        if self.folded_turns:
+            lines.append(
+                f"- {self.folded_turns} earlier turn(s) summarized; zones discussed: "
+                f"{', '.join(self.folded_zones) or 'none'}"
+            )
+        lines.extend(turn.render() for turn in self.turns)
+        return "\n".join(lines)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budget checks."""
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """Per-context history of resolved times used to answer follow-up questions.
+
+    Only the resolved source instant and target zones of each turn are kept.
+    When the history exceeds ``max_turns`` or its rendered form exceeds
+    ``token_budget``, the oldest turns are folded into a one-line summary, so
+    the prompt addition stays bounded however long the conversation runs.
+    """
+
+    def __init__(
+        self,
+        store: SharedStore,
+        *,
+        max_turns: int = 6,
+        token_budget: int = 400,
+        ttl: Optional[float] = 86400.0,
+    ) -> None:
+        self.store = store
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.ttl = ttl
+
+    def load(self, context_id: str) -> ConversationState:
+        return ConversationState.from_payload(self.store.get(MEMORY_NAMESPACE, context_id))
+
+    def render(self, context_id: Optional[str]) -> Optional[str]:
+        """Return the compact prompt block for ``context_id``, if it has history."""
+        if not context_id:
+            return None
+        state = self.load(context_id)
+        if not state.turns and not state.folded_turns:
+            return None
+        return state.render()
+
+    def remember(
+        self, context_id: str, expression: str, response: TimeNLConvertResponse
+    ) -> None:
+        state = self.load(context_id)
+        state.turns.append(
+            ConversationTurn(
+                expression=" ".join(expression.split())[:_EXPRESSION_LIMIT],
+                source=response.source.model_dump(),
+                targets=[target.timezone for target in response.targets],
+            )
+        )
+        self._compact(state)
+        self.store.set(
+            MEMORY_NAMESPACE,
+            context_id,
+            {
+                "turns": [asdict(turn) for turn in state.turns],
+                "folded_turns": state.folded_turns,
+                "folded_zones": state.folded_zones,
+            },
+            ttl=self.ttl,
+        )
+
+    def _compact(self, state: ConversationState) -> None:
+        while len(state.turns) > 1 and (
+            len(state.turns) > self.max_turns
+            or estimate_tokens(state.render()) > self.token_budget
+        ):
+            oldest = state.turns.pop(0)
+            state.folded_turns += 1
+            for zone in [oldest.source.get("timezone"), *oldest.targets]:
+                if zone and zone not in state.folded_zones:
+                    state.folded_zones.append(zone)
+            del state.folded_zones[:-_SUMMARY_ZONE_LIMIT]
+
+
+conversation_memory = ConversationMemory(
+    shared_store,
+    max_turns=settings.memory_max_turns,
+    token_budget=settings.memory_token_budget,
+    ttl=settings.memory_ttl,
+)
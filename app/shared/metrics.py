@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class MetricsRegistry:
+    """Minimal in-process counters and summaries, rendered for Prometheus.
+
+    Values are per process; with the pre-fork server each worker reports its
+    own series, which the scraper aggregates.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(dict)
+        self._summaries: Dict[str, Dict[LabelKey, list]] = defaultdict(dict)
+        self._gauges: Dict[str, Dict[LabelKey, float]] = defaultdict(dict)
+
+    def inc(self, name: str, value: float = 1.0, **labels: object) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        """Record one sample into a count/sum/max summary."""
+        key = _label_key(labels)
+        with self._lock:
+            summary = self._summaries[name].setdefault(key, [0, 0.0, 0.0])
+            summary[0] += 1
+            summary[1] += value
+            summary[2] = max(summary[2], value)
+
+    def set_gauge(self, name: str, value: float, **labels: object) -> None:
+        with self._lock:
+            self._gauges[name][_label_key(labels)] = value
+
+    def counter_value(self, name: str, **labels: object) -> float:
+        return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {
+                "counters": {
+                    name: {_render_labels(key): value for key, value in series.items()}
+                    for name, series in self._counters.items()
+                },
+                "summaries": {
+                    name: {
+                        _render_labels(key): {"count": count, "sum": total, "max": peak}
+                        for key, (count, total, peak) in series.items()
+                    }
+                    for name, series in self._summaries.items()
+                },
+                "gauges": {
+                    name: {_render_labels(key): value for key, value in series.items()}
+                    for name, series in self._gauges.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_render_labels(key)} {value}")
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in series.items():
+                    lines.append(f"{name}{_render_labels(key)} {value}")
+            for name, series in sorted(self._summaries.items()):
+                lines.append(f"# TYPE {name} summary")
+                for key, (count, total, _) in series.items():
+                    labels = _render_labels(key)
+                    lines.append(f"{name}_count{labels} {count}")
+                    lines.append(f"{name}_sum{labels} {total}")
+                # A summary may only carry _count, _sum and quantiles, so
+                # the peak is exported as its own gauge family.
+                lines.append(f"# TYPE {name}_max gauge")
+                for key, (_, _, peak) in series.items():
+                    lines.append(f"{name}_max{_render_labels(key)} {peak}")
+        return "\n".join(lines) + "\n"
+
+
+def _render_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in key)
+    return "{" + rendered + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,234 @@
+"""Composable agent pipelines.
+
+An agent declares its request handling as named ``Stage`` objects; the
+``Pipeline`` runs them and provides, uniformly for every agent:
+
+- timing: each stage is observed as ``pipeline_stage_seconds`` and counted
+  in ``pipeline_stage_total{outcome}`` (ok, cached, short_circuit, mapped,
+  error);
+- caching: a stage with a ``StageCache`` is skipped when the shared store
+  already holds its output for the computed key;
+- short-circuit: a stage raises ``ShortCircuit(result)`` to return early;
+- error mapping: exceptions are turned into results by the stage's own
+  ``errors`` table, then the pipeline's, before propagating (handlers may
+  be coroutines);
+- concurrency: stages run in dependency waves (``after``), and the stages of
+  one wave run concurrently. Sync stages marked ``blocking`` run in a thread.
+
+The output of the last declared stage is the pipeline's result. Callers
+that want progress (e.g. streaming transports) wrap the run in
+``stage_listener(callback)``; it is called with the pipeline and stage name
+whenever a stage produces its output.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Type
+
+from app.shared.metrics import metrics
+from app.shared.store import SharedStore, shared_store
+
+_MISSING = object()
+
+ErrorHandler = Callable[["PipelineContext", BaseException], Any]
+StageListener = Callable[[str, str], None]
+
+_listener: contextvars.ContextVar[Optional[StageListener]] = contextvars.ContextVar(
+    "pipeline_stage_listener", default=None
+)
+
+
+@contextmanager
+def stage_listener(callback: Optional[StageListener]) -> Iterator[None]:
+    """Report ``(pipeline, stage)`` to ``callback`` for stages completed within the block."""
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+class ShortCircuit(Exception):
+    """End the pipeline early with ``result``."""
+
+    def __init__(self, result: Any) -> None:
+        super().__init__("pipeline short-circuited")
+        self.result = result
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+@dataclass(frozen=True)
+class StageCache:
+    """Cache a stage's output in the shared store under ``key(ctx)``.
+
+    ``key`` returning ``None`` skips the cache for that request. ``encode``
+    and ``decode`` convert the output to and from JSON-serializable data.
+    """
+
+    namespace: str
+    key: Callable[["PipelineContext"], Optional[str]]
+    ttl: Optional[float] = None
+    encode: Callable[[Any], Any] = _identity
+    decode: Callable[[Any], Any] = _identity
+    store: Optional[SharedStore] = None
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[["PipelineContext"], Any]
+    after: Tuple[str, ...] = ()
+    cache: Optional[StageCache] = None
+    errors: Mapping[Type[BaseException], ErrorHandler] = field(default_factory=dict)
+    blocking: bool = False
+
+
+@dataclass
+class PipelineContext:
+    """Per-request state: the inbound message, stage outputs and scratch values."""
+
+    message: Any
+    context_id: Optional[str] = None
+    task_id: Optional[str] = None
+    state: Dict[str, Any] = field(default_factory=dict)
+    values: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def __getitem__(self, stage: str) -> Any:
+        return self.values[stage]
+
+
+def _match(errors: Mapping[Type[BaseException], ErrorHandler], exc: BaseException):
+    for exc_type, handler in errors.items():
+        if isinstance(exc, exc_type):
+            return handler
+    return None
+
+
+async def _resolve(value: Any) -> Any:
+    return await value if inspect.isawaitable(value) else value
+
+
+class Pipeline:
+    def __init__(
+        self,
+        name: str,
+        stages: Sequence[Stage],
+        *,
+        errors: Optional[Mapping[Type[BaseException], ErrorHandler]] = None,
+    ) -> None:
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.name = name
+        self.stages = list(stages)
+        self.errors = dict(errors or {})
+        self.waves = self._plan(self.stages)
+
+    @staticmethod
+    def _plan(stages: Sequence[Stage]) -> List[List[Stage]]:
+        """Group stages into waves; each stage lands one wave after its latest dependency."""
+        level: Dict[str, int] = {}
+        for stage in stages:
+            if stage.name in level:
+                raise ValueError(f"Duplicate stage '{stage.name}'")
+            unknown = [dep for dep in stage.after if dep not in level]
+            if unknown:
+                raise ValueError(
+                    f"Stage '{stage.name}' depends on undeclared or later stages: {unknown}"
+                )
+            level[stage.name] = 1 + max((level[dep] for dep in stage.after), default=-1)
+        waves: List[List[Stage]] = [[] for _ in range(max(level.values()) + 1)]
+        for stage in stages:
+            waves[level[stage.name]].append(stage)
+        return waves
+
+    async def run(
+        self,
+        message: Any,
+        *,
+        context_id: Optional[str] = None,
+        task_id: Optional[str] = None,
+        **state: Any,
+    ) -> Any:
+        ctx = PipelineContext(message=message, context_id=context_id, task_id=task_id, state=state)
+        try:
+            for wave in self.waves:
+                if len(wave) == 1:
+                    await self._run_stage(wave[0], ctx)
+                else:
+                    await self._run_wave(wave, ctx)
+        except ShortCircuit as exc:
+            return exc.result
+        except Exception as exc:
+            handler = _match(self.errors, exc)
+            if handler is None:
+                raise
+            return await _resolve(handler(ctx, exc))
+        return ctx.values[self.stages[-1].name]
+
+    async def _run_wave(self, wave: List[Stage], ctx: PipelineContext) -> None:
+        tasks = [asyncio.ensure_future(self._run_stage(stage, ctx)) for stage in wave]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        # Surface the first failure in declaration order, so results are deterministic.
+        for task in tasks:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+    async def _run_stage(self, stage: Stage, ctx: PipelineContext) -> None:
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            key = stage.cache.key(ctx) if stage.cache is not None else None
+            store = (stage.cache.store or shared_store) if key else None
+            cached = await store.aget(stage.cache.namespace, key, _MISSING) if store else _MISSING
+            if cached is not _MISSING:
+                outcome = "cached"
+                ctx.values[stage.name] = stage.cache.decode(cached)
+                return
+            value = await self._invoke(stage, ctx)
+            if store is not None:
+                await store.aset(
+                    stage.cache.namespace, key, stage.cache.encode(value), ttl=stage.cache.ttl
+                )
+            ctx.values[stage.name] = value
+        except ShortCircuit:
+            outcome = "short_circuit"
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception as exc:
+            handler = _match(stage.errors, exc)
+            if handler is None:
+                outcome = "error"
+                raise
+            outcome = "mapped"
+            raise ShortCircuit(await _resolve(handler(ctx, exc))) from exc
+        finally:
+            elapsed = time.perf_counter() - started
+            ctx.timings[stage.name] = elapsed
+            metrics.observe("pipeline_stage_seconds", elapsed, pipeline=self.name, stage=stage.name)
+            metrics.inc("pipeline_stage_total", pipeline=self.name, stage=stage.name, outcome=outcome)
+            listener = _listener.get()
+            if listener is not None and outcome in ("ok", "cached"):
+                listener(self.name, stage.name)
+
+    @staticmethod
+    async def _invoke(stage: Stage, ctx: PipelineContext) -> Any:
+        if stage.blocking:
+            return await asyncio.to_thread(stage.run, ctx)
+        return await _resolve(stage.run(ctx))
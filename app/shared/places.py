@@ -0,0 +1,259 @@
+"""Resolve place names, abbreviations and aliases to IANA time zones locally.
+
+The index is built once per process from the bundled ``data/places.json``
+(abbreviations, aliases and countries; see ``scripts/build_places.py``) plus
+every IANA zone name and its city component. Names are normalized (accents,
+case, punctuation and a trailing "time"/"timezone" are dropped) and looked up
+in a hash index; misspellings of names of four or more letters fall back to a
+fuzzy match. ``find`` scans free text with a token trie for the longest
+mention at each position.
+
+Exact and fuzzy lookups are explicit, so they ignore case. In free text
+short names ("LA", "UK") and abbreviations ("PST", "AEST") only match when
+written in capitals, and common English words that happen to be zone cities
+only when capitalized, so "let us meet at the center" names no place.
+"""
+
+from __future__ import annotations
+
+import difflib
+import json
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import available_timezones
+
+from loguru import logger
+
+from app.config import settings
+from app.shared.metrics import metrics
+
+DATASET_PATH = Path(__file__).resolve().parent / "data" / "places.json"
+
+# Index precedence: a name keeps the first kind that claims it.
+_KINDS = ("alias", "abbreviation", "country", "zone", "city")
+# Link-only IANA areas; their city components ("Eastern", "Pacific") are not places.
+_LEGACY_AREAS = {"Brazil", "Canada", "Chile", "Etc", "Mexico", "SystemV", "US"}
+# Link names that are compass directions, not places ("the north office").
+_LEGACY_ZONES = {"Australia/North", "Australia/South", "Australia/West"}
+_SUFFIXES = ("local time", "time zone", "timezone", "time", "tz")
+_COMMON_WORDS = frozenset(
+    {
+        "casey", "center", "davis", "east", "easter", "midway", "north", "oral", "palmer",
+        "reunion", "south", "troll", "universal", "virgin", "wake", "west",
+    }
+)
+_TOKEN_RE = re.compile(r"[^\W_]+(?:[+-]\d+)?", re.UNICODE)
+_TERMINAL = ""
+_FUZZY_CACHE_SIZE = 4096
+
+
+def normalize(name: str) -> str:
+    """Lower-case, accent-free, single-spaced form used as an index key."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    plain = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_TOKEN_RE.findall(plain.lower()))
+
+
+def _strip_suffix(key: str) -> str:
+    for suffix in _SUFFIXES:
+        if key.endswith(" " + suffix):
+            return key[: -len(suffix) - 1]
+    return key
+
+
+@dataclass(frozen=True)
+class PlaceMatch:
+    """A resolved name: the IANA ``zone`` plus how it was found."""
+
+    query: str
+    zone: str
+    kind: str
+    matched: str
+    score: float = 1.0
+    alternatives: Tuple[str, ...] = ()
+
+    @property
+    def fuzzy(self) -> bool:
+        return self.score < 1.0
+
+
+@dataclass(frozen=True)
+class _Entry:
+    zone: str
+    kind: str
+    alternatives: Tuple[str, ...] = ()
+
+
+class PlaceResolver:
+    def __init__(self, dataset_path: Path = DATASET_PATH, *, fuzzy_cutoff: float = 0.85) -> None:
+        self.dataset_path = dataset_path
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, _Entry]] = None
+        self._trie: Dict[str, dict] = {}
+        self._buckets: Dict[str, List[str]] = {}
+        self._fuzzy: Dict[str, Optional[str]] = {}
+
+    def preload(self) -> int:
+        """Build the index now rather than on first use; returns its size."""
+        return len(self._entries())
+
+    def resolve(self, name: str) -> Optional[PlaceMatch]:
+        """Resolve one name ("Lagos", "PST", "Dubai time", "Europe/Paris")."""
+        index = self._entries()
+        key = normalize(name)
+        for candidate in dict.fromkeys((key, _strip_suffix(key))):
+            entry = index.get(candidate)
+            if entry is not None:
+                return self._match(name, candidate, entry)
+        key = _strip_suffix(key)
+        close = self._closest(key)
+        if close is None:
+            metrics.inc("place_resolutions_total", kind="miss")
+            return None
+        score = difflib.SequenceMatcher(None, key, close).ratio()
+        return self._match(name, close, index[close], score=score)
+
+    def resolve_many(self, names: Iterable[str]) -> Dict[str, Optional[PlaceMatch]]:
+        """Resolve a batch of names; each distinct name is looked up once."""
+        return {name: self.resolve(name) for name in dict.fromkeys(names)}
+
+    def zone_for(self, name: str) -> Optional[str]:
+        match = self.resolve(name)
+        return match.zone if match else None
+
+    def canonicalize(self, names: Iterable[str]) -> List[str]:
+        """Map each name to its zone, keeping names that do not resolve unchanged."""
+        names = list(names)
+        resolved = self.resolve_many(names)
+        return [resolved[name].zone if resolved[name] else name for name in names]
+
+    def find(self, text: str) -> List[PlaceMatch]:
+        """Return the places mentioned in ``text``, longest match first at each position."""
+        self._entries()
+        tokens = [
+            (match.group(), normalize(match.group()), match.start(), match.end())
+            for match in _TOKEN_RE.finditer(text)
+        ]
+        found: List[PlaceMatch] = []
+        position = 0
+        while position < len(tokens):
+            node = self._trie
+            best: Optional[Tuple[int, _Entry]] = None
+            for offset in range(position, len(tokens)):
+                node = node.get(tokens[offset][1])
+                if node is None:
+                    break
+                entry = node.get(_TERMINAL)
+                if entry is not None and self._mentioned(tokens[position : offset + 1], entry):
+                    best = offset, entry
+            if best is None:
+                position += 1
+                continue
+            end, entry = best
+            mention = text[tokens[position][2] : tokens[end][3]]
+            found.append(self._match(mention, normalize(mention), entry))
+            position = end + 1
+        return found
+
+    def find_zones(self, text: str) -> List[str]:
+        """Zones named in ``text``, in order of first mention."""
+        return list(dict.fromkeys(match.zone for match in self.find(text)))
+
+    @staticmethod
+    def _mentioned(tokens: List[Tuple[str, str, int, int]], entry: _Entry) -> bool:
+        if len(tokens) > 1:
+            return True
+        raw, key = tokens[0][0], tokens[0][1]
+        if entry.kind == "abbreviation" or len(key) <= 3:
+            return raw.isupper()
+        if key in _COMMON_WORDS:
+            return raw[:1].isupper()
+        return True
+
+    def _match(self, query: str, key: str, entry: _Entry, *, score: float = 1.0) -> PlaceMatch:
+        metrics.inc("place_resolutions_total", kind=entry.kind if score == 1.0 else "fuzzy")
+        return PlaceMatch(
+            query=query,
+            zone=entry.zone,
+            kind=entry.kind,
+            matched=key,
+            score=round(score, 3),
+            alternatives=entry.alternatives,
+        )
+
+    def _closest(self, key: str) -> Optional[str]:
+        if len(key) < 4:
+            return None
+        if key in self._fuzzy:
+            return self._fuzzy[key]
+        # Candidates share the first letter: typos rarely touch it, and it
+        # keeps each lookup to a few hundred comparisons.
+        matches = difflib.get_close_matches(
+            key, self._buckets.get(key[0], ()), n=1, cutoff=self.fuzzy_cutoff
+        )
+        close = matches[0] if matches else None
+        if len(self._fuzzy) >= _FUZZY_CACHE_SIZE:
+            self._fuzzy.clear()
+        self._fuzzy[key] = close
+        return close
+
+    def _entries(self) -> Dict[str, _Entry]:
+        index = self._index
+        if index is not None:
+            return index
+        with self._lock:
+            if self._index is None:
+                self._build()
+            return self._index
+
+    def _build(self) -> None:
+        dataset = json.loads(self.dataset_path.read_text(encoding="utf-8"))
+        zones = available_timezones()
+        ambiguous = {normalize(name): tuple(options) for name, options in dataset.get("ambiguous", {}).items()}
+        sources: Dict[str, List[Tuple[str, str, Tuple[str, ...]]]] = {kind: [] for kind in _KINDS}
+        for name, zone in dataset.get("aliases", {}).items():
+            sources["alias"].append((name, zone, ()))
+        for name, zone in dataset.get("abbreviations", {}).items():
+            options = ambiguous.get(normalize(name), ())
+            sources["abbreviation"].append((name, zone, tuple(z for z in options if z != zone)))
+        for name, country_zones in dataset.get("countries", {}).items():
+            sources["country"].append((name, country_zones[0], tuple(country_zones[1:])))
+        for zone in sorted(zones):
+            sources["zone"].append((zone, zone, ()))
+            area, _, city = zone.rpartition("/")
+            if area and area.split("/")[0] not in _LEGACY_AREAS and zone not in _LEGACY_ZONES:
+                sources["city"].append((city, zone, ()))
+
+        index: Dict[str, _Entry] = {}
+        for kind in _KINDS:
+            for name, zone, alternatives in sources[kind]:
+                if zone not in zones:
+                    logger.warning("Skipping place with unknown zone", place=name, zone=zone)
+                    continue
+                key = normalize(name)
+                if key:
+                    index.setdefault(key, _Entry(zone, kind, alternatives))
+
+        trie: Dict[str, dict] = {}
+        buckets: Dict[str, List[str]] = {}
+        for key, entry in index.items():
+            node = trie
+            for token in key.split(" "):
+                node = node.setdefault(token, {})
+            node[_TERMINAL] = entry
+            if len(key) >= 4 and entry.kind != "abbreviation":
+                buckets.setdefault(key[0], []).append(key)
+        self._trie, self._buckets = trie, buckets
+        self._index = index
+        logger.debug("Built place index", names=len(index))
+
+
+place_resolver = PlaceResolver(
+    Path(settings.places_path) if settings.places_path else DATASET_PATH,
+    fuzzy_cutoff=settings.place_fuzzy_cutoff,
+)
@@ -0,0 +1,101 @@
+"""Request priority lanes: interactive traffic ahead of background work.
+
+Each request runs in one lane:
+
+- ``interactive`` (the default) is for people waiting on an answer, e.g.
+  Slack requests;
+- ``background`` is for automated traffic such as backfills, cron jobs and
+  bulk jobs.
+
+The lane comes from the ``X-Priority`` header, then ``metadata.priority``.
+Bulk jobs default to ``background``. It is kept in a context variable, so
+every bulkhead the request passes through can see it: the agent's handler
+bulkhead and the provider bulkhead in front of LLM calls.
+"""
+
+from __future__ import annotations
+
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Mapping, Optional
+
+from app.config import settings
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+PRIORITY_HEADER = "x-priority"
+PRIORITY_METADATA_KEY = "priority"
+
+_ALIASES = {
+    INTERACTIVE: INTERACTIVE,
+    "high": INTERACTIVE,
+    "user": INTERACTIVE,
+    BACKGROUND: BACKGROUND,
+    "low": BACKGROUND,
+    "batch": BACKGROUND,
+    "bulk": BACKGROUND,
+    "backfill": BACKGROUND,
+    "cron": BACKGROUND,
+}
+
+_current: contextvars.ContextVar[str] = contextvars.ContextVar("priority_lane", default=INTERACTIVE)
+
+
+def resolve_lane(
+    header_value: Optional[str],
+    metadata: Optional[Mapping[str, Any]],
+    *,
+    default: str = INTERACTIVE,
+) -> str:
+    """Pick the lane from the header, then metadata; unknown values are ignored."""
+    for candidate in (header_value, (metadata or {}).get(PRIORITY_METADATA_KEY)):
+        if isinstance(candidate, str):
+            lane = _ALIASES.get(candidate.strip().lower())
+            if lane is not None:
+                return lane
+    return default
+
+
+def current_lane() -> str:
+    return _current.get()
+
+
+@contextmanager
+def lane_scope(lane: str) -> Iterator[str]:
+    """Run everything awaited within the block in ``lane``."""
+    token = _current.set(lane)
+    try:
+        yield lane
+    finally:
+        _current.reset(token)
+
+
+@dataclass(frozen=True)
+class LanePolicy:
+    """How a bulkhead shares its slots between lanes.
+
+    ``weights`` set each lane's share of freed slots while several lanes
+    wait. Background work may hold at most ``background_share`` of the slots.
+    It gets no freed slot at all while ``defer_depth`` or more interactive
+    requests are queued; 0 turns deferral off.
+    """
+
+    weights: Mapping[str, int]
+    background_share: float = 1.0
+    defer_depth: int = 0
+
+    def background_limit(self, capacity: int) -> int:
+        return max(1, int(capacity * self.background_share))
+
+
+lane_policy = LanePolicy(
+    weights={
+        INTERACTIVE: max(1, settings.priority_interactive_weight),
+        BACKGROUND: max(1, settings.priority_background_weight),
+    },
+    background_share=settings.priority_background_share,
+    defer_depth=settings.priority_defer_depth,
+)
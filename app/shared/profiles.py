@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import csv
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Dict, Optional
 
+from app.shared.store import SharedStore
+
+PROFILE_NAMESPACE = "profiles"
+
 
 @dataclass(frozen=True)
 class UserProfile:
@@ -14,14 +18,25 @@ class UserProfile:
 
 
 class ProfileDirectory:
-    """Simple in-memory user profile store keyed by handle."""
+    """User profile store keyed by handle.
+
+    Profiles live in memory by default. When a ``SharedStore`` is supplied they
+    are written there instead, so every worker process reads one copy.
+    """
 
-    def __init__(self, csv_path: Optional[Path] = None):
+    def __init__(
+        self,
+        csv_path: Optional[Path] = None,
+        *,
+        store: Optional[SharedStore] = None,
+    ):
         self._profiles: Dict[str, UserProfile] = {}
+        self._store = store
         if csv_path and csv_path.exists():
             self.load_csv(csv_path)
 
     def load_csv(self, csv_path: Path) -> None:
+        profiles: Dict[str, UserProfile] = {}
         with csv_path.open("r", encoding="utf-8") as fh:
             reader = csv.DictReader(fh)
             for row in reader:
@@ -34,7 +49,17 @@ class ProfileDirectory:
                     timezone=timezone,
                     full_name=row.get("full_name"),
                 )
-                self._profiles[handle.lower()] = profile
+                profiles[handle.lower()] = profile
+        if self._store is not None:
+            self._store.set_many(
+                PROFILE_NAMESPACE,
+                ((handle, asdict(profile)) for handle, profile in profiles.items()),
+            )
+        else:
+            self._profiles.update(profiles)
 
     def get(self, user: str) -> Optional[UserProfile]:
-        return self._profiles.get(user.lower())
+        if self._store is None:
+            return self._profiles.get(user.lower())
+        payload = self._store.get(PROFILE_NAMESPACE, user.lower())
+        return UserProfile(**payload) if payload else None
@@ -0,0 +1,300 @@
+"""Event-loop lag monitoring and opt-in profiling.
+
+``LoopLagMonitor`` runs a heartbeat coroutine on the loop and a watchdog
+thread beside it. When the heartbeat is late by more than the threshold,
+the watchdog captures the loop thread's stack while it is still blocked,
+which names the offending call directly.
+
+``ProfileSession`` combines ``cProfile`` (written as ``.prof``, readable by
+``pstats``, snakeviz or flameprof) with a stack sampler on the loop thread
+(written as ``.folded`` collapsed stacks for ``flamegraph.pl`` or
+speedscope). Sessions cover either one request (header or sampling) or an
+admin-controlled time window. The ``X-Profile`` header is only honoured
+together with a valid ``X-Admin-Token``, and only the newest
+``max_files`` profiles are kept. ``cProfile`` sees everything the loop thread
+runs, so a per-request profile also includes whatever other requests were
+interleaved with it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import hmac
+import random
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.shared.metrics import metrics
+
+PROFILE_HEADER = "x-profile"
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    """Whether ``token`` matches ``ADMIN_TOKEN``; always false when none is configured."""
+    expected = settings.admin_token
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token.encode(), expected.encode())
+
+
+class LoopLagMonitor:
+    """Detect event-loop stalls and record the stack that caused them."""
+
+    def __init__(self, *, threshold: float = 0.1, interval: float = 0.05, history: int = 20) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            metrics.observe("event_loop_lag_seconds", max(0.0, now - expected))
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            beat = self._heartbeat
+            lag = time.monotonic() - beat
+            if lag < self.threshold + self.interval or beat == reported_beat:
+                continue
+            # Report each stall once, with the stack as it is right now.
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            self.stalls.append({"at": time.time(), "lag": round(lag, 3), "stack": stack})
+            metrics.inc("event_loop_stalls_total")
+            logger.warning("Event loop blocked for {:.3f}s at:\n{}", lag, stack)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "threshold": self.threshold,
+            "stalls": list(self.stalls),
+        }
+
+
+class _StackSampler(threading.Thread):
+    """Sample one thread's stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.samples[";".join(reversed(names))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class ProfileSession:
+    """One cProfile run plus stack sampling of the current thread."""
+
+    def __init__(self, label: str, output_dir: Path, *, sampler_interval: float = 0.005) -> None:
+        self.label = label
+        self.output_dir = output_dir
+        self.started_at = time.time()
+        self._profile = cProfile.Profile()
+        self._sampler = _StackSampler(threading.get_ident(), sampler_interval)
+
+    def start(self) -> None:
+        self._profile.enable()
+        self._sampler.start()
+
+    def stop(self) -> List[str]:
+        """Stop profiling and write ``<label>.prof`` and ``<label>.folded``."""
+        self._profile.disable()
+        self._sampler.stop()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = self.output_dir / f"{time.strftime('%Y%m%dT%H%M%S')}-{self.label}"
+        prof_path = stem.with_suffix(".prof")
+        folded_path = stem.with_suffix(".folded")
+        self._profile.dump_stats(prof_path)
+        folded_path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self._sampler.samples.items())
+        )
+        return [str(prof_path), str(folded_path)]
+
+
+class Profiler:
+    """Decides which requests to profile and owns the admin profiling window.
+
+    Only one session runs at a time, since ``cProfile`` cannot nest; requests
+    that would be profiled while another session is active are skipped.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        *,
+        sample_rate: float = 0.0,
+        header_enabled: bool = False,
+        max_files: int = 20,
+        sampler_interval: float = 0.005,
+    ) -> None:
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.header_enabled = header_enabled
+        self.max_files = max_files
+        self.sampler_interval = sampler_interval
+        self._active: Optional[ProfileSession] = None
+        self._window_timer: Optional[asyncio.TimerHandle] = None
+        self.last_outputs: List[str] = []
+
+    @property
+    def window_active(self) -> bool:
+        return self._active is not None and self._active.label.startswith("window")
+
+    def wants_profile(self, headers: Headers) -> bool:
+        if self._active is not None:
+            return False
+        if (
+            self.header_enabled
+            and headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes")
+            and admin_token_valid(headers.get(ADMIN_TOKEN_HEADER))
+        ):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def begin(self, label: str) -> Optional[ProfileSession]:
+        if self._active is not None:
+            return None
+        session = ProfileSession(label, self.output_dir, sampler_interval=self.sampler_interval)
+        try:
+            session.start()
+        except ValueError:
+            # Another profiler (e.g. a debugger) already owns the hook.
+            return None
+        self._active = session
+        return session
+
+    def end(self, session: ProfileSession) -> List[str]:
+        if self._active is not session:
+            return []
+        self._active = None
+        outputs = session.stop()
+        self._prune()
+        self.last_outputs = outputs
+        metrics.inc("profiles_written_total", kind=session.label.split("-", 1)[0])
+        logger.info("Profile written", files=outputs)
+        return outputs
+
+    def _prune(self) -> None:
+        """Delete the oldest profiles beyond ``max_files`` (a ``.prof``/``.folded`` pair each)."""
+        if self.max_files <= 0:
+            return
+        stems = sorted({path.with_suffix("") for path in self.output_dir.glob("*.prof")})
+        for stem in stems[: -self.max_files]:
+            for suffix in (".prof", ".folded"):
+                stem.with_suffix(suffix).unlink(missing_ok=True)
+
+    def start_window(self, duration: Optional[float] = None) -> bool:
+        """Profile everything on the loop until ``stop_window`` or ``duration`` elapses."""
+        session = self.begin(f"window-{uuid.uuid4().hex[:8]}")
+        if session is None:
+            return False
+        if duration:
+            self._window_timer = asyncio.get_running_loop().call_later(
+                duration, self.stop_window
+            )
+        return True
+
+    def stop_window(self) -> List[str]:
+        if self._window_timer is not None:
+            self._window_timer.cancel()
+            self._window_timer = None
+        if not self.window_active:
+            return []
+        return self.end(self._active)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active": self._active.label if self._active else None,
+            "sample_rate": self.sample_rate,
+            "output_dir": str(self.output_dir),
+            "last_outputs": self.last_outputs,
+        }
+
+
+class ProfilingMiddleware:
+    """Profile HTTP requests selected by ``Profiler.wants_profile``."""
+
+    def __init__(self, app: ASGIApp, *, profiler: Profiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.wants_profile(Headers(scope=scope)):
+            await self.app(scope, receive, send)
+            return
+        label = "request-" + scope["path"].strip("/").replace("/", "_")[:40]
+        session = self.profiler.begin(label)
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end(session)
+
+
+loop_monitor = LoopLagMonitor(
+    threshold=settings.loop_lag_threshold,
+    interval=settings.loop_lag_interval,
+)
+profiler = Profiler(
+    Path(settings.profile_dir),
+    sample_rate=settings.profile_sample_rate,
+    header_enabled=settings.profile_header_enabled,
+    max_files=settings.profile_max_files,
+)
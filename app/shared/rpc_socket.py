@@ -0,0 +1,147 @@
+"""JSON-RPC over a WebSocket: many concurrent calls on one connection.
+
+Each text frame is one JSON-RPC request. Requests are dispatched as they
+arrive and answered as they finish, so responses come back out of order
+and are matched by ``id``. Flow control is per connection:
+
+- at most ``max_inflight`` calls run at once; beyond that the session stops
+  reading frames, so TCP backpressure reaches the client instead of work
+  piling up in memory;
+- responses go through a bounded outbox drained by one writer; a client
+  that stops reading fills it, which in turn holds the in-flight slots.
+
+``message/stream`` calls share the socket: they receive ``status-update``
+results (``final: false``) as the agent's pipeline stages complete, then the
+final ``TaskResult`` under the same ``id``. Progress updates are dropped
+rather than queued when the outbox is full.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from loguru import logger
+from starlette.websockets import WebSocket
+
+from app.shared.metrics import metrics
+from app.shared.pipeline import StageListener
+
+STREAM_METHOD = "message/stream"
+
+Dispatch = Callable[[Dict[str, Any], Optional[StageListener]], Awaitable[Optional[str]]]
+
+
+def rpc_error(rpc_id: Any, code: int, message: str, data: Optional[Dict[str, Any]] = None) -> str:
+    error: Dict[str, Any] = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return json.dumps({"jsonrpc": "2.0", "id": rpc_id, "error": error}, separators=(",", ":"))
+
+
+def _status_update(rpc_id: Any, stage: Optional[str] = None) -> str:
+    result: Dict[str, Any] = {
+        "kind": "status-update",
+        "status": {"state": "working", "timestamp": datetime.utcnow().isoformat()},
+        "final": False,
+    }
+    if stage is not None:
+        result["metadata"] = {"stage": stage}
+    return json.dumps({"jsonrpc": "2.0", "id": rpc_id, "result": result}, separators=(",", ":"))
+
+
+class RpcSocketSession:
+    """Serve JSON-RPC calls from one WebSocket until it closes."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        dispatch: Dispatch,
+        *,
+        agent: str,
+        max_inflight: int = 32,
+        outbox_size: int = 64,
+        max_message_bytes: int = 1_048_576,
+    ) -> None:
+        self.websocket = websocket
+        self.dispatch = dispatch
+        self.agent = agent
+        self.max_message_bytes = max_message_bytes
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._outbox: asyncio.Queue[str] = asyncio.Queue(maxsize=outbox_size)
+        self._calls: Set[asyncio.Task] = set()
+
+    async def serve(self) -> None:
+        await self.websocket.accept()
+        metrics.inc("ws_connections_total", agent=self.agent)
+        writer = asyncio.ensure_future(self._write())
+        try:
+            while True:
+                # Backpressure: no new frame is read until a call slot frees up.
+                await self._slots.acquire()
+                frame = await self.websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    self._slots.release()
+                    break
+                text = frame.get("text")
+                if text is None:
+                    text = (frame.get("bytes") or b"").decode("utf-8", "replace")
+                call = asyncio.ensure_future(self._call(text))
+                self._calls.add(call)
+                call.add_done_callback(self._calls.discard)
+        finally:
+            # The peer is gone: nobody can receive the answers, so stop the work.
+            for call in list(self._calls):
+                call.cancel()
+            writer.cancel()
+            await asyncio.gather(*self._calls, writer, return_exceptions=True)
+
+    async def _call(self, text: str) -> None:
+        metrics.inc("ws_calls_total", agent=self.agent)
+        try:
+            if len(text.encode("utf-8")) > self.max_message_bytes:
+                reply: Optional[str] = rpc_error(
+                    None,
+                    -32600,
+                    "Invalid Request: message too large",
+                    {"max_bytes": self.max_message_bytes},
+                )
+            else:
+                reply = await self._dispatch_text(text)
+            if reply is not None:
+                await self._outbox.put(reply)
+        finally:
+            self._slots.release()
+
+    async def _dispatch_text(self, text: str) -> Optional[str]:
+        try:
+            body = json.loads(text)
+        except ValueError:
+            return rpc_error(None, -32700, "Parse error")
+        if not isinstance(body, dict):
+            return rpc_error(None, -32600, "Invalid Request: expected an object")
+        listener: Optional[StageListener] = None
+        if body.get("method") == STREAM_METHOD:
+            rpc_id = body.get("id")
+            self._progress(rpc_id)
+            listener = lambda _pipeline, stage: self._progress(rpc_id, stage)  # noqa: E731
+        try:
+            return await self.dispatch(body, listener)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.exception("WebSocket call failed", agent=self.agent, error=str(exc))
+            return rpc_error(body.get("id"), -32603, "Internal error")
+
+    def _progress(self, rpc_id: Any, stage: Optional[str] = None) -> None:
+        try:
+            self._outbox.put_nowait(_status_update(rpc_id, stage))
+        except asyncio.QueueFull:
+            metrics.inc("ws_progress_dropped_total", agent=self.agent)
+
+    async def _write(self) -> None:
+        while True:
+            text = await self._outbox.get()
+            await self.websocket.send_text(text)
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Tuple, TypeVar
+
+from loguru import logger
+
+from app.config import settings
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_expiry ON entries (expires_at);
+"""
+
+
+class SharedStore:
+    """SQLite (WAL mode) key/value cache shared by every worker process.
+
+    Connections are opened lazily per thread and per process, so a store
+    created in a pre-fork parent is safe to use from its forked workers.
+    Storage errors are logged and treated as cache misses.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_entries: int = 100_000,
+        trim_interval: int = 500,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.trim_interval = trim_interval
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection; the next call opens a fresh one.
+
+        The pre-fork parent calls this before forking, so no worker inherits
+        an open SQLite handle (SQLite connections must not cross a fork).
+        """
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error as exc:
+                logger.warning("Closing shared store connection failed", error=str(exc))
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """Return the cached value or ``default`` when missing or expired."""
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Shared store read failed", namespace=namespace, error=str(exc))
+            return default
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return default
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any, *, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, optionally expiring after ``ttl`` seconds."""
+        self.set_many(namespace, [(key, value)], ttl=ttl)
+
+    def set_many(
+        self,
+        namespace: str,
+        items: Iterable[Tuple[str, Any]],
+        *,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Store several values for a namespace in a single transaction."""
+        expires_at = time.time() + ttl if ttl else None
+        rows = [
+            (namespace, key, json.dumps(value, separators=(",", ":")), expires_at)
+            for key, value in items
+        ]
+        if not rows:
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Shared store write failed", namespace=namespace, error=str(exc))
+            return
+        self._maybe_trim(len(rows))
+
+    def add(self, namespace: str, key: str, value: Any, *, ttl: Optional[float] = None) -> bool:
+        """Store ``value`` unless a live entry exists; ``False`` only when one does.
+
+        The check and the write happen in one transaction, so exactly one
+        worker wins when several race for the same key. A storage error
+        counts as a miss, like in ``get``, and returns ``True``.
+        """
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ? "
+                    "AND expires_at IS NOT NULL AND expires_at <= ?",
+                    (namespace, key, now),
+                )
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO entries (namespace, key, value, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        namespace,
+                        key,
+                        json.dumps(value, separators=(",", ":")),
+                        now + ttl if ttl else None,
+                    ),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Shared store write failed", namespace=namespace, error=str(exc))
+            return True
+        added = cursor.rowcount == 1
+        if added:
+            self._maybe_trim(1)
+        return added
+
+    def delete(self, namespace: str, key: str) -> None:
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Shared store delete failed", namespace=namespace, error=str(exc))
+
+    # Async callers use these so SQLite I/O (and its busy wait) stays off
+    # the event loop.
+
+    async def aget(self, namespace: str, key: str, default: Any = None) -> Any:
+        return await asyncio.to_thread(self.get, namespace, key, default)
+
+    async def aset(
+        self, namespace: str, key: str, value: Any, *, ttl: Optional[float] = None
+    ) -> None:
+        await asyncio.to_thread(self.set, namespace, key, value, ttl=ttl)
+
+    async def aadd(
+        self, namespace: str, key: str, value: Any, *, ttl: Optional[float] = None
+    ) -> bool:
+        return await asyncio.to_thread(self.add, namespace, key, value, ttl=ttl)
+
+    async def adelete(self, namespace: str, key: str) -> None:
+        await asyncio.to_thread(self.delete, namespace, key)
+
+    def trim(self) -> None:
+        """Drop expired entries and the oldest rows beyond ``max_entries``."""
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                    (time.time(),),
+                )
+                conn.execute(
+                    "DELETE FROM entries WHERE rowid IN ("
+                    "SELECT rowid FROM entries ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Shared store trim failed", error=str(exc))
+
+    def _maybe_trim(self, written: int) -> None:
+        with self._writes_lock:
+            self._writes += written
+            due = self._writes >= self.trim_interval
+            if due:
+                self._writes = 0
+        if due:
+            self.trim()
+
+
+shared_store = SharedStore(
+    Path(settings.shared_store_path),
+    max_entries=settings.shared_store_max_entries,
+)
+
+
+def shared_cache(namespace: str, *, ttl: Optional[float]) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Memoize a synchronous function's JSON-serializable results in ``shared_store``."""
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not ttl:
+                return fn(*args, **kwargs)
+            key = json.dumps([args, kwargs], sort_keys=True, default=str)
+            cached = shared_store.get(namespace, key, _MISSING)
+            if cached is not _MISSING:
+                return cached
+            result = fn(*args, **kwargs)
+            shared_store.set(namespace, key, result, ttl=ttl)
+            return result
+
+        return wrapper
+
+    return decorator
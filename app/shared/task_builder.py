@@ -74,3 +74,45 @@ def build_error_result(
         text_parts=[error_message],
         data_parts=[error_payload],
     )
+
+
+def compact_task_result(result: TaskResult) -> Dict[str, Any]:
+    """Serialize ``result`` for the ``compact`` response profile.
+
+    Drops the echoed ``history``, fields left at their defaults and raw
+    model payloads in error data, and removes repeated text and data parts;
+    all data entries of an artifact are merged into a single data part. The
+    ``kind`` discriminators are kept so clients can still tell objects apart.
+    """
+    payload = result.model_dump(exclude_defaults=True, exclude={"history"})
+    payload["kind"] = result.kind
+    if result.status.message is not None:
+        payload["status"]["message"]["kind"] = result.status.message.kind
+    for artifact in payload.get("artifacts", []):
+        parts: List[Dict[str, Any]] = []
+        seen_text = set()
+        data_entries: List[Dict[str, Any]] = []
+        for part in artifact["parts"]:
+            if part["kind"] == "text":
+                if part.get("text") in seen_text:
+                    continue
+                seen_text.add(part.get("text"))
+                parts.append(part)
+            elif part["kind"] == "data":
+                for entry in part.get("data") or []:
+                    entry = _strip_raw(entry)
+                    if entry not in data_entries:
+                        data_entries.append(entry)
+            else:
+                parts.append(part)
+        if data_entries:
+            parts.append({"kind": "data", "data": data_entries})
+        artifact["parts"] = parts
+    return payload
+
+
+def _strip_raw(entry: Dict[str, Any]) -> Dict[str, Any]:
+    data = entry.get("data")
+    if "error" in entry and isinstance(data, dict) and "raw" in data:
+        entry = {**entry, "data": {key: value for key, value in data.items() if key != "raw"}}
+    return entry
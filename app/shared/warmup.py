@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+Step = Callable[[], Awaitable[Any]]
+
+
+class Warmup:
+    """Ordered start-up steps that must finish before a worker reports ready.
+
+    Steps run in the background so liveness (``/health``) answers at once;
+    readiness (``/ready``) flips only when every step has finished. A failing
+    or timed-out step is recorded but does not keep the worker out of
+    rotation forever.
+    """
+
+    def __init__(self, *, step_timeout: float = 30.0) -> None:
+        self.step_timeout = step_timeout
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self._steps: List[Tuple[str, Step]] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add_step(self, name: str, step: Step) -> None:
+        self._steps.append((name, step))
+
+    def start(self) -> None:
+        self._tasks.append(asyncio.get_running_loop().create_task(self.run()))
+
+    async def run(self) -> None:
+        self.started_at = time.time()
+        for name, step in self._steps:
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(step(), self.step_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.errors[name] = f"{type(exc).__name__}: {exc}"
+                logger.warning("Warm-up step failed", step=name, error=str(exc))
+                continue
+            self.results[name] = {
+                "ms": round((time.perf_counter() - started) * 1000, 1),
+                "detail": result,
+            }
+        self.finished_at = time.time()
+        self.ready = True
+        logger.info(
+            "Warm-up complete",
+            seconds=round(self.finished_at - self.started_at, 2),
+            failed=list(self.errors),
+        )
+
+    def keep_warm(self, name: str, step: Step, *, interval: float) -> None:
+        """Re-run ``step`` every ``interval`` seconds (e.g. to keep connections pooled)."""
+
+        async def loop() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await asyncio.wait_for(step(), self.step_timeout)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    logger.debug("Keep-warm step failed", step=name, error=str(exc))
+
+        self._tasks.append(asyncio.get_running_loop().create_task(loop()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": self.results,
+            "errors": self.errors,
+        }
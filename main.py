@@ -1,52 +1,327 @@
 from __future__ import annotations
 
-import os
-from typing import Optional
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Awaitable, Callable, Mapping, Optional
 
-from dotenv import load_dotenv
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Header, HTTPException, Request, WebSocket
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from loguru import logger
+from pydantic import ValidationError
 
-from app.agents import (
-    ScheduleTimeAgent,
-)
+from app.agents import agent_registry
 from app.config import settings
+from app.shared.admission import admission_controller
+from app.shared.bulkhead import BulkheadFull
+from app.shared.capture import traffic_recorder
+from app.shared.circuit import circuit_breakers
+from app.shared.conversion import conversion_engine
+from app.shared.credentials import credential_pool
+from app.shared.idempotency import (
+    IDEMPOTENCY_HEADER,
+    REPLAY_HEADER,
+    IdempotencyConflict,
+    caller_scope,
+    idempotency_cache,
+    request_fingerprint,
+)
+from app.shared.compression import CompressionMiddleware
+from app.shared.deadline import (
+    DEADLINE_HEADER,
+    Deadline,
+    DeadlineExceeded,
+    deadline_scope,
+    resolve_budget,
+)
+from app.shared.priority import PRIORITY_HEADER, lane_scope, resolve_lane
+from app.shared.task_builder import build_error_result, compact_task_result
+from app.shared.warmup import Warmup
+from app.shared.jobs import job_manager
+from app.shared.llm import llm_client
+from app.shared.metrics import metrics
+from app.shared.pipeline import stage_listener
+from app.shared.profiling import ProfilingMiddleware, admin_token_valid, loop_monitor, profiler
+from app.shared.rpc_socket import RpcSocketSession
 from models.a2a import A2AMessage, JSONRPCRequest, JSONRPCResponse, TaskResult
 
-load_dotenv()
+
+# Log records are written by a background thread so a slow sink never
+# blocks the event loop.
+logger.remove()
+logger.add(sys.stderr, level=settings.log_level, enqueue=settings.log_enqueue)
+
+
+warmup = Warmup(step_timeout=settings.warmup_step_timeout)
+
+
+async def _warm_provider() -> str:
+    return await asyncio.to_thread(
+        llm_client.warm_up, timeout=settings.provider_warmup_timeout
+    )
+
+
+async def _warm_timezones() -> int:
+    await asyncio.to_thread(conversion_engine.preload, settings.warmup_timezones)
+    return len(settings.warmup_timezones)
+
+
+warmup.add_step("provider", _warm_provider)
+warmup.add_step("timezones", _warm_timezones)
+for _name in agent_registry.names():
+    warmup.add_step(
+        f"agent:{_name}",
+        partial(
+            agent_registry.warm_up,
+            _name,
+            synthetic_requests=settings.warmup_synthetic_requests,
+        ),
+    )
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if settings.loop_lag_monitor_enabled:
+        loop_monitor.start()
+    if settings.warmup_enabled:
+        warmup.start()
+        if settings.provider_keepalive_interval > 0:
+            warmup.keep_warm(
+                "provider", _warm_provider, interval=settings.provider_keepalive_interval
+            )
+    else:
+        warmup.ready = True
+    resumed = job_manager.resume_pending()
+    if resumed:
+        logger.info("Resuming bulk jobs", jobs=resumed)
+    yield
+    await warmup.stop()
+    await job_manager.shutdown()
+    profiler.stop_window()
+    await loop_monitor.stop()
+    traffic_recorder.flush()
+    llm_client.close()
+
 
 app = FastAPI(
     title=settings.app_name,
     description=settings.app_description,
     version="2.0.0",
+    lifespan=lifespan,
 )
-
-schedule_agent = ScheduleTimeAgent(default_timezone=settings.default_timezone)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
 
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint listing available agents."""
+    """Health check endpoint listing registered agents and their load state."""
     return {
-        "status": "healthy",
-        "agents": [
-            "comms-starter",
-            "review-polish",
-            "summaries-insights",
-            "quick-answer",
-            "channel-historian",
-            "schedule-time",
-        ],
+        "status": (
+            "degraded"
+            if circuit_breakers.open_circuits() or credential_pool.exhausted()
+            else "healthy"
+        ),
+        "agents": agent_registry.names(),
+        "loaded": agent_registry.loaded_names(),
+        "details": agent_registry.status(),
+        "admission": admission_controller.snapshot(),
+        "circuits": circuit_breakers.snapshot(),
+        "credentials": credential_pool.snapshot(),
+        "llm": llm_client.bulkhead.snapshot(),
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness for load balancers: 503 until this worker has finished warming up."""
+    return JSONResponse(
+        status_code=200 if warmup.ready else 503,
+        content=warmup.snapshot(),
+    )
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text exposition of this worker's counters and summaries."""
+    return PlainTextResponse(metrics.render_prometheus())
+
+
+def _require_admin(token: Optional[str]) -> None:
+    if not settings.admin_token:
+        # Without a configured token the admin endpoints do not exist.
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not admin_token_valid(token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.get("/admin/profile")
+async def profile_status(x_admin_token: Optional[str] = Header(None)):
+    """Current profiling state and recent event-loop stalls for this worker."""
+    _require_admin(x_admin_token)
+    return {"profiler": profiler.snapshot(), "event_loop": loop_monitor.snapshot()}
+
+
+@app.post("/admin/profile/start")
+async def profile_start(
+    duration: Optional[float] = None, x_admin_token: Optional[str] = Header(None)
+):
+    """Profile everything this worker runs until stopped or ``duration`` seconds pass."""
+    _require_admin(x_admin_token)
+    if not profiler.start_window(duration):
+        return JSONResponse(status_code=409, content={"error": "A profile is already running"})
+    return profiler.snapshot()
+
+
+@app.post("/admin/profile/stop")
+async def profile_stop(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return {"files": profiler.stop_window()}
+
+
+def _agent_endpoint(name: str):
+    async def endpoint(request: Request):
+        return await _handle_agent_request(
+            request, partial(agent_registry.dispatch, name), agent=name
+        )
+
+    endpoint.__name__ = f"{name.replace('-', '_')}_endpoint"
+    return endpoint
+
+
+for _spec in agent_registry.specs:
+    app.add_api_route(
+        f"/a2a/{_spec.name}",
+        _agent_endpoint(_spec.name),
+        methods=["POST"],
+        summary=_spec.description or None,
+    )
+    job_manager.register(_spec.name, partial(agent_registry.dispatch, _spec.name))
+
+
+@app.websocket("/a2a/ws/{agent}")
+async def agent_socket(websocket: WebSocket, agent: str):
+    """JSON-RPC over one WebSocket: concurrent calls, answered out of order by ``id``."""
+    if agent not in agent_registry.names():
+        await websocket.close(code=1008, reason=f"Unknown agent '{agent}'")
+        return
+    handler = partial(agent_registry.dispatch, agent)
+    # Headers sent with the handshake set the default budget and priority for
+    # every call; an idempotency key would not make sense connection-wide, so only
+    # messageIds dedupe calls here.
+    headers = {
+        key: value
+        for key, value in websocket.headers.items()
+        if key in (DEADLINE_HEADER, PRIORITY_HEADER)
     }
+    caller = caller_scope(websocket.headers, websocket.client.host if websocket.client else None)
+
+    async def dispatch(body: dict, listener) -> Optional[str]:
+        # Recorded under the HTTP route, so replay_traffic.py can POST it back.
+        traffic_recorder.record_request(path=f"/a2a/{agent}", body=body)
+        with stage_listener(listener):
+            response = await _process_rpc(
+                body,
+                handler,
+                agent=agent,
+                headers=headers,
+                is_disconnected=_stays_connected,
+                caller=caller,
+            )
+        return bytes(response.body).decode("utf-8")
+
+    await RpcSocketSession(
+        websocket,
+        dispatch,
+        agent=agent,
+        max_inflight=settings.ws_max_inflight,
+        outbox_size=settings.ws_outbox_size,
+        max_message_bytes=settings.ws_max_message_bytes,
+    ).serve()
+
+
+async def _stays_connected() -> bool:
+    # Socket calls are cancelled by their session when the connection drops.
+    return False
 
 
-@app.post("/a2a/schedule-time")
-async def schedule_time_endpoint(request: Request):
-    return await _handle_agent_request(request, schedule_agent.handle)
+@app.post("/jobs/{agent}", status_code=202)
+async def submit_job(agent: str, request: Request):
+    """Submit an NDJSON body of A2A messages (one per line) as a bulk job."""
+    try:
+        job = await job_manager.submit(agent, request.stream())
+    except KeyError:
+        return JSONResponse(status_code=404, content={"error": f"Unknown agent '{agent}'"})
+    return job.progress()
 
 
-async def _handle_agent_request(request: Request, handler):
+@app.get("/jobs")
+async def list_jobs():
+    return {"jobs": [job.progress() for job in job_manager.list()]}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_manager.status(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown job '{job_id}'"})
+    return job.progress()
+
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str, follow: bool = False):
+    """Stream results as NDJSON; ``follow=true`` keeps the stream open until the job ends."""
+    if job_manager.status(job_id) is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown job '{job_id}'"})
+    return StreamingResponse(
+        job_manager.stream_results(job_id, follow=follow),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"error": f"Unknown job '{job_id}'"})
+    return job.progress()
+
+
+async def _handle_agent_request(request: Request, handler, *, agent: str):
     body = await request.json()
+    traffic_recorder.record_request(path=request.url.path, body=body)
+    try:
+        return await _process_rpc(
+            body,
+            handler,
+            agent=agent,
+            headers=request.headers,
+            is_disconnected=request.is_disconnected,
+            caller=caller_scope(request.headers, request.client.host if request.client else None),
+        )
+    except ClientDisconnected:
+        logger.info("Client disconnected; cancelled agent work", request_id=body.get("id"))
+        return Response(status_code=499)
+
+
+async def _process_rpc(
+    body: dict,
+    handler,
+    *,
+    agent: str,
+    headers: Mapping[str, str],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    caller: str = "",
+) -> Response:
+    """Run one JSON-RPC call against ``handler``; shared by the HTTP and WebSocket routes."""
     if body.get("jsonrpc") != "2.0" or "id" not in body:
         return JSONResponse(
             status_code=400,
@@ -60,7 +335,21 @@ async def _handle_agent_request(request: Request, handler):
             },
         )
 
-    rpc_request = JSONRPCRequest(**body)
+    try:
+        rpc_request = JSONRPCRequest(**body)
+    except ValidationError as exc:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "jsonrpc": "2.0",
+                "id": body.get("id"),
+                "error": {
+                    "code": -32600,
+                    "message": "Invalid Request",
+                    "data": {"errors": exc.errors(include_url=False, include_context=False)},
+                },
+            },
+        )
     message = _extract_message(rpc_request)
     if message is None:
         return JSONResponse(
@@ -75,12 +364,72 @@ async def _handle_agent_request(request: Request, handler):
             },
         )
 
-    # try:
-    result: TaskResult = await handler(
-        message,
-        context_id=getattr(rpc_request.params, "contextId", None),
-        task_id=getattr(rpc_request.params, "taskId", None),
+    idempotency_key = idempotency_cache.key_for(
+        agent, message, headers.get(IDEMPOTENCY_HEADER), caller=caller
     )
+    fingerprint = request_fingerprint(body.get("params"))
+    if idempotency_key is not None:
+        # Completed retries are answered before admission: they cost nothing.
+        try:
+            replayed = await idempotency_cache.replay(idempotency_key, fingerprint)
+        except IdempotencyConflict as exc:
+            return _conflict_response(rpc_request.id, exc)
+        if replayed is not None:
+            return _rpc_result_response(rpc_request, replayed, replay=True)
+
+    lane = resolve_lane(headers.get(PRIORITY_HEADER), message.metadata)
+    if not admission_controller.try_acquire(lane):
+        return _busy_response(
+            rpc_request.id,
+            "Server busy: admission limit reached, retry later.",
+            {"limit": admission_controller.limit, "lane": lane},
+        )
+    context_id = getattr(rpc_request.params, "contextId", None)
+    task_id = getattr(rpc_request.params, "taskId", None)
+    deadline = Deadline.after(
+        resolve_budget(headers.get(DEADLINE_HEADER), message.metadata)
+    )
+    work = partial(handler, message, context_id=context_id, task_id=task_id)
+    reused = False
+    started = time.perf_counter()
+    try:
+        with deadline_scope(deadline), lane_scope(lane):
+            if idempotency_key is None:
+                result: TaskResult = await _run_until_disconnected(
+                    is_disconnected, work(), deadline=deadline
+                )
+            else:
+                result, reused = await _run_until_disconnected(
+                    is_disconnected,
+                    idempotency_cache.run(
+                        idempotency_key,
+                        work,
+                        lease=deadline.budget + settings.deadline_grace,
+                        fingerprint=fingerprint,
+                    ),
+                    deadline=deadline,
+                )
+    except DeadlineExceeded as exc:
+        result = build_error_result(
+            message=message,
+            error_message="Time budget exhausted before the agent completed.",
+            context_id=context_id,
+            task_id=task_id,
+            data={"stage": exc.stage, "partial": exc.partial},
+        )
+    except IdempotencyConflict as exc:
+        return _conflict_response(rpc_request.id, exc)
+    except BulkheadFull as exc:
+        return _busy_response(
+            rpc_request.id,
+            "Server busy: agent queue is full, retry later.",
+            {"agent": exc.name},
+        )
+    finally:
+        admission_controller.release()
+        metrics.observe(
+            "agent_request_seconds", time.perf_counter() - started, agent=agent, lane=lane
+        )
     # except Exception as exc:  # pragma: no cover - defensive
     #     return JSONResponse(
     #         status_code=500,
@@ -95,8 +444,84 @@ async def _handle_agent_request(request: Request, handler):
     #         },
     #     )
 
+    return _rpc_result_response(rpc_request, result, replay=reused)
+
+
+def _rpc_result_response(
+    rpc_request: JSONRPCRequest, result: TaskResult, *, replay: bool = False
+) -> Response:
+    """Serialize ``result`` using the response profile the caller asked for."""
+    headers = {REPLAY_HEADER: "true"} if replay else None
+    if rpc_request.params.configuration.responseProfile == "compact":
+        return JSONResponse(
+            {"jsonrpc": "2.0", "id": rpc_request.id, "result": compact_task_result(result)},
+            headers=headers,
+        )
     response = JSONRPCResponse(id=rpc_request.id, result=result)
-    return response.model_dump()
+    return Response(response.model_dump_json(), media_type="application/json", headers=headers)
+
+
+class ClientDisconnected(Exception):
+    """The caller went away before the agent finished."""
+
+
+async def _run_until_disconnected(
+    is_disconnected: Callable[[], Awaitable[bool]], work, *, deadline: Deadline
+):
+    """Await ``work``, cancelling it when the client disconnects or the deadline passes.
+
+    Agents get a short grace period past the deadline to return their own
+    failed result with partial data before being cancelled here.
+    """
+    task = asyncio.ensure_future(work)
+    hard_stop = deadline.expires_at + settings.deadline_grace
+    try:
+        while True:
+            left = max(0.0, hard_stop - time.monotonic())
+            done, _ = await asyncio.wait(
+                {task}, timeout=min(settings.disconnect_poll_interval, left)
+            )
+            if done:
+                return task.result()
+            if time.monotonic() >= hard_stop:
+                task.cancel()
+                raise DeadlineExceeded("handler")
+            if await is_disconnected():
+                task.cancel()
+                raise ClientDisconnected()
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+
+def _busy_response(rpc_id: str, message: str, data: dict) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(settings.admission_retry_after)},
+        content={
+            "jsonrpc": "2.0",
+            "id": rpc_id,
+            "error": {
+                "code": -32000,
+                "message": message,
+                "data": data,
+            },
+        },
+    )
+
+
+def _conflict_response(rpc_id: str, exc: IdempotencyConflict) -> JSONResponse:
+    return JSONResponse(
+        status_code=422,
+        content={
+            "jsonrpc": "2.0",
+            "id": rpc_id,
+            "error": {
+                "code": -32600,
+                "message": f"Invalid Request: {exc}",
+            },
+        },
+    )
 
 
 def _extract_message(request_obj: JSONRPCRequest) -> Optional[A2AMessage]:
@@ -113,5 +538,4 @@ def _extract_message(request_obj: JSONRPCRequest) -> Optional[A2AMessage]:
 if __name__ == "__main__":
     import uvicorn
 
-    port = int(os.getenv("PORT", 5001))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(app, host="0.0.0.0", port=settings.port)
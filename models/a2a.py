@@ -27,6 +27,7 @@ class MessageConfiguration(BaseModel):
     blocking: bool = True
     acceptedOutputModes: List[str] = ["text/plain", "image/png", "image/svg+xml"]
     pushNotificationConfig: Optional[PushNotificationConfig] = None
+    responseProfile: Literal["full", "compact"] = "full"
 
 class MessageParams(BaseModel):
     message: A2AMessage
@@ -36,11 +37,12 @@ class ExecuteParams(BaseModel):
     contextId: Optional[str] = None
     taskId: Optional[str] = None
     messages: List[A2AMessage]
+    configuration: MessageConfiguration = Field(default_factory=MessageConfiguration)
 
 class JSONRPCRequest(BaseModel):
     jsonrpc: Literal["2.0"]
     id: str
-    method: Literal["message/send", "execute"]
+    method: Literal["message/send", "message/stream", "execute"]
     params: MessageParams | ExecuteParams
 
 class TaskStatus(BaseModel):
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, conint
+from typing import List, Literal, Optional
 
 class TimeTarget(BaseModel):
     timezone: str = Field(..., description="IANA timezone, e.g. 'America/New_York'")
@@ -18,4 +18,26 @@ class TimeNLConvertResponse(BaseModel):
     targets: List[TimeTarget]
 
 class IntentResponse(BaseModel):
-    intent: str = Field(..., description="Identified intent from the input text")
\ No newline at end of file
+    intent: str = Field(..., description="Identified intent from the input text")
+class RecurrenceRule(BaseModel):
+    frequency: Literal["daily", "weekly", "monthly"] = Field(..., description="Repeat unit")
+    interval: int = Field(1, ge=1, description="Repeat every N units; 2 for 'every other'")
+    weekdays: List[conint(ge=0, le=6)] = Field(
+        default_factory=list,
+        description="Weekly rules only: days of the week, 0 = Monday ... 6 = Sunday",
+    )
+    month_day: Optional[int] = Field(
+        None, ge=1, le=31, description="Monthly rules only: day of the month"
+    )
+    time: str = Field(..., description="Wall-clock time in h:mm AM/PM format")
+    timezone: str = Field(..., description="IANA timezone the wall-clock time is in")
+    start_date: str = Field(..., description="First date the series may occur, YYYY-MM-DD")
+    until: Optional[str] = Field(None, description="Last date the series may occur, YYYY-MM-DD")
+    count: Optional[int] = Field(None, ge=1, description="Number of occurrences")
+
+
+class RecurrenceInterpretation(BaseModel):
+    rule: RecurrenceRule
+    target_timezones: List[str] = Field(
+        default_factory=list, description="IANA timezones to convert each occurrence into"
+    )
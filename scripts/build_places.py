@@ -0,0 +1,103 @@
+"""Regenerate the country section of the bundled place-name dataset.
+
+Examples::
+
+    # Refresh app/shared/data/places.json from the system tz database
+    python scripts/build_places.py
+
+    # Use another tzdata checkout
+    python scripts/build_places.py --zoneinfo /path/to/tzdata
+
+Countries come from tzdata's ``iso3166.tab`` and ``zone.tab``; each maps to
+its zones in ``zone.tab`` order, with ``PRIMARY_ZONES`` choosing the zone a
+bare country name resolves to when it spans several. The hand-maintained
+sections (``abbreviations``, ``ambiguous``, ``aliases``) are kept as-is.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+DATASET = ROOT / "app" / "shared" / "data" / "places.json"
+
+# The zone most people mean by the country name (usually the capital's).
+PRIMARY_ZONES = {
+    "AR": "America/Argentina/Buenos_Aires",
+    "AU": "Australia/Sydney",
+    "BR": "America/Sao_Paulo",
+    "CA": "America/Toronto",
+    "CD": "Africa/Kinshasa",
+    "CL": "America/Santiago",
+    "CN": "Asia/Shanghai",
+    "EC": "America/Guayaquil",
+    "ES": "Europe/Madrid",
+    "FM": "Pacific/Pohnpei",
+    "ID": "Asia/Jakarta",
+    "KZ": "Asia/Almaty",
+    "MN": "Asia/Ulaanbaatar",
+    "MX": "America/Mexico_City",
+    "NZ": "Pacific/Auckland",
+    "PT": "Europe/Lisbon",
+    "RU": "Europe/Moscow",
+    "UA": "Europe/Kyiv",
+    "US": "America/New_York",
+    "UZ": "Asia/Tashkent",
+}
+SKIPPED = {"AQ"}
+
+
+def _rows(path: Path) -> List[List[str]]:
+    return [
+        line.rstrip("\n").split("\t")
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if line and not line.startswith("#")
+    ]
+
+
+def build_countries(zoneinfo: Path) -> Dict[str, List[str]]:
+    names = {code: name for code, name in _rows(zoneinfo / "iso3166.tab")}
+    zones: Dict[str, List[str]] = defaultdict(list)
+    for row in _rows(zoneinfo / "zone.tab"):
+        zones[row[0]].append(row[2])
+
+    def short(name: str) -> str:
+        # "Britain (UK)" -> "Britain"; "Bosnia & Herzegovina" -> "Bosnia and Herzegovina".
+        return re.sub(r"\s*\(.*\)", "", name).replace("&", "and").strip()
+
+    shortened = Counter(short(name) for name in names.values())
+    countries: Dict[str, List[str]] = {}
+    for code, name in sorted(names.items(), key=lambda item: item[1]):
+        if code in SKIPPED or not zones.get(code):
+            continue
+        ordered = list(zones[code])
+        primary = PRIMARY_ZONES.get(code)
+        if primary in ordered:
+            ordered.remove(primary)
+            ordered.insert(0, primary)
+        # Names that collide once shortened (the two Congos) keep their qualifier.
+        display = short(name) if shortened[short(name)] == 1 else name
+        countries[display] = ordered
+    return countries
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zoneinfo", type=Path, default=Path("/usr/share/zoneinfo"))
+    parser.add_argument("--output", type=Path, default=DATASET)
+    args = parser.parse_args()
+
+    dataset = json.loads(args.output.read_text(encoding="utf-8")) if args.output.exists() else {}
+    dataset["countries"] = build_countries(args.zoneinfo)
+    args.output.write_text(json.dumps(dataset, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"Wrote {len(dataset['countries'])} countries to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
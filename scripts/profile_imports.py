@@ -0,0 +1,87 @@
+"""Measure how long importing the service takes and where the time goes.
+
+Examples::
+
+    # Show the 25 slowest modules pulled in by ``import main``
+    python scripts/profile_imports.py
+
+    # Fail (exit code 1) when a cold import exceeds the startup budget
+    python scripts/profile_imports.py --budget-ms 1500
+
+Each run imports the target in a fresh interpreter with ``-X importtime`` so
+results reflect a real cold start. Heavy provider SDKs (``groq``,
+``instructor``) must not appear in the output; they are loaded on first use.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFERRED_MODULES = ("groq", "instructor")
+
+
+def run_import(module: str) -> Tuple[float, List[Tuple[int, int, str]]]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    env.pop("GROQ_API_KEY", None)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"Importing {module!r} failed")
+
+    rows: List[Tuple[int, int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return elapsed_ms, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--top", type=int, default=25, help="Number of modules to list")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Exit non-zero when the cold import takes longer than this",
+    )
+    args = parser.parse_args()
+
+    elapsed_ms, rows = run_import(args.module)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda row: row[1], reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    total_ms = sum(self_us for self_us, _, _ in rows) / 1000
+    print(f"\nimport {args.module}: {total_ms:.1f}ms in imports, {elapsed_ms:.1f}ms wall (incl. interpreter start)")
+
+    loaded = {name for _, _, name in rows}
+    eager = [module for module in DEFERRED_MODULES if module in loaded]
+    if eager:
+        print(f"FAIL: deferred dependencies imported eagerly: {', '.join(eager)}")
+        raise SystemExit(1)
+    if args.budget_ms is not None and elapsed_ms > args.budget_ms:
+        print(f"FAIL: startup budget of {args.budget_ms:.0f}ms exceeded")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Re-issue captured A2A traffic against a running service.
+
+Examples::
+
+    # Real-time replay (1x) against a local instance
+    python scripts/replay_traffic.py data/capture/traffic.jsonl
+
+    # Ten times faster than production
+    python scripts/replay_traffic.py data/capture/traffic.jsonl --speed 10
+
+    # As fast as possible with at most 32 requests in flight
+    python scripts/replay_traffic.py data/capture/traffic.jsonl --speed 0 --concurrency 32
+
+Pair with ``LLM_CASSETTE_PATH=data/capture/traffic.jsonl`` on the server to
+answer LLM calls from the recording instead of the provider.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.shared.capture import iter_capture  # noqa: E402
+
+
+def load_requests(paths: List[Path], limit: int | None) -> List[Dict[str, Any]]:
+    records = [
+        record
+        for path in paths
+        for record in iter_capture(path)
+        if record.get("type") == "request"
+    ]
+    records.sort(key=lambda record: record.get("ts", 0.0))
+    return records[:limit] if limit else records
+
+
+def http_path(path: str) -> str:
+    """The HTTP route for a recorded path; older captures hold WebSocket paths."""
+    if path.startswith("/a2a/ws/"):
+        return "/a2a/" + path[len("/a2a/ws/"):]
+    return path
+
+
+async def replay(
+    records: List[Dict[str, Any]],
+    *,
+    base_url: str,
+    speed: float,
+    concurrency: int,
+    timeout: float,
+) -> None:
+    if not records:
+        print("No captured requests found.")
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    outcomes: Counter[str] = Counter()
+    first_ts = records[0].get("ts", 0.0)
+    started = time.monotonic()
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+
+        async def send(record: Dict[str, Any]) -> None:
+            if speed > 0:
+                due = (record.get("ts", first_ts) - first_ts) / speed
+                delay = due - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            async with semaphore:
+                sent = time.perf_counter()
+                try:
+                    response = await client.post(http_path(record["path"]), json=record["body"])
+                except httpx.HTTPError as exc:
+                    outcomes[type(exc).__name__] += 1
+                    return
+                latencies.append(time.perf_counter() - sent)
+                outcomes[str(response.status_code)] += 1
+
+        await asyncio.gather(*(send(record) for record in records))
+
+    elapsed = time.monotonic() - started
+    print(f"Replayed {len(records)} requests in {elapsed:.2f}s "
+          f"({len(records) / elapsed:.1f} req/s)")
+    print("Outcomes:", json.dumps(dict(outcomes), sort_keys=True))
+    if latencies:
+        ordered = sorted(latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(
+            f"Latency: mean={statistics.mean(ordered) * 1000:.1f}ms "
+            f"p50={statistics.median(ordered) * 1000:.1f}ms "
+            f"p95={p95 * 1000:.1f}ms max={ordered[-1] * 1000:.1f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("captures", nargs="+", type=Path, help="Capture JSONL file(s)")
+    parser.add_argument("--url", default="http://localhost:5001", help="Service base URL")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed multiplier; 0 sends as fast as possible",
+    )
+    parser.add_argument("--concurrency", type=int, default=64, help="Max requests in flight")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+
+    records = load_requests(args.captures, args.limit)
+    asyncio.run(
+        replay(
+            records,
+            base_url=args.url,
+            speed=args.speed,
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""Point every on-disk store at a scratch directory before the app is imported."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+_SCRATCH = Path(tempfile.mkdtemp(prefix="a2a-tests-"))
+
+os.environ.setdefault("SHARED_STORE_PATH", str(_SCRATCH / "shared.sqlite3"))
+os.environ.setdefault("JOBS_PATH", str(_SCRATCH / "jobs"))
+os.environ.setdefault("CAPTURE_PATH", str(_SCRATCH / "capture" / "traffic.jsonl"))
+os.environ.setdefault("PROFILE_DIR", str(_SCRATCH / "profiles"))
+os.environ.setdefault("WARMUP_ENABLED", "false")
@@ -0,0 +1,78 @@
+"""Adaptive admission: AIMD limit, shedding and the background share."""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+import main
+from app.shared.admission import AdaptiveLimiter
+from app.shared.priority import BACKGROUND, INTERACTIVE
+
+
+def test_requests_beyond_the_limit_are_shed():
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=1)
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+    assert limiter.snapshot()["rejected"] == 1
+
+
+def test_fast_calls_grow_the_limit_additively():
+    limiter = AdaptiveLimiter(initial_limit=10, latency_target=1.0)
+    for _ in range(10):
+        limiter.observe(0.2)
+    assert limiter.limit == 10
+    assert 10.9 < limiter._limit < 11.0
+    for _ in range(12):
+        limiter.observe(0.2)
+    assert limiter.limit == 12
+
+
+def test_slow_or_failed_calls_back_off_once_per_cooldown():
+    limiter = AdaptiveLimiter(initial_limit=100, latency_target=1.0, backoff=0.5, cooldown=60)
+    limiter.observe(5.0)
+    assert limiter.limit == 50
+    limiter.observe(None, failed=True)
+    assert limiter.limit == 50
+    limiter._last_decrease -= 60
+    limiter.observe(0.1, failed=True)
+    assert limiter.limit == 25
+
+
+def test_limit_stays_within_bounds():
+    limiter = AdaptiveLimiter(
+        initial_limit=5, min_limit=4, max_limit=6, latency_target=1.0, backoff=0.1, cooldown=0
+    )
+    limiter.observe(9.0)
+    assert limiter.limit == 4
+    for _ in range(100):
+        limiter.observe(0.1)
+    assert limiter.limit == 6
+
+
+def test_background_only_uses_its_share():
+    limiter = AdaptiveLimiter(initial_limit=10, background_share=0.3)
+    assert all(limiter.try_acquire(BACKGROUND) for _ in range(3))
+    assert not limiter.try_acquire(BACKGROUND)
+    assert all(limiter.try_acquire(INTERACTIVE) for _ in range(7))
+    assert not limiter.try_acquire(INTERACTIVE)
+
+
+def test_disabled_limiter_admits_everything():
+    limiter = AdaptiveLimiter(initial_limit=1, enabled=False)
+    assert all(limiter.try_acquire() for _ in range(50))
+
+
+def test_service_sheds_with_503_and_retry_after(monkeypatch):
+    monkeypatch.setattr(main.admission_controller, "_limit", 0.0)
+    body = {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "method": "message/send",
+        "params": {"message": {"role": "user", "parts": [{"kind": "text", "text": "3pm Lagos"}]}},
+    }
+    response = TestClient(main.app).post("/a2a/schedule-time", json=body)
+    assert response.status_code == 503
+    assert response.headers["retry-after"]
+    assert response.json()["error"]["code"] == -32000
@@ -0,0 +1,76 @@
+"""Bulkheads: bounded concurrency, bounded queues and abandoned waits."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.shared.bulkhead import Bulkhead, BulkheadFull
+from app.shared.priority import INTERACTIVE, LanePolicy
+
+POLICY = LanePolicy(weights={INTERACTIVE: 1, "background": 1})
+
+
+def test_concurrency_is_capped_and_the_queue_drains():
+    bulkhead = Bulkhead("test", max_concurrency=2, max_queue=10, policy=POLICY)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with bulkhead.slot(INTERACTIVE):
+            peak = max(peak, bulkhead.snapshot()["active"])
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        await asyncio.gather(*(work() for _ in range(8)))
+
+    asyncio.run(scenario())
+    assert peak == 2
+    assert bulkhead.snapshot()["active"] == 0
+
+
+def test_full_queue_rejects_immediately():
+    bulkhead = Bulkhead("test", max_concurrency=1, max_queue=1, policy=POLICY)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with bulkhead.slot(INTERACTIVE):
+                await release.wait()
+
+        holder, waiter = asyncio.create_task(hold()), asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(BulkheadFull):
+            async with bulkhead.slot(INTERACTIVE):
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+
+    asyncio.run(scenario())
+    assert bulkhead.snapshot()["rejected"] == 1
+
+
+def test_timed_out_waiter_leaves_the_queue():
+    bulkhead = Bulkhead("test", max_concurrency=1, max_queue=5, policy=POLICY)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with bulkhead.slot(INTERACTIVE):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            async with bulkhead.slot(INTERACTIVE, timeout=0.01):
+                pass
+        assert bulkhead.snapshot()["waiting"] == 0
+        release.set()
+        await holder
+        async with bulkhead.slot(INTERACTIVE):
+            return bulkhead.snapshot()["active"]
+
+    assert asyncio.run(scenario()) == 1
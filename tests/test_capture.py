@@ -0,0 +1,106 @@
+"""Traffic capture: redaction, cassette keys and the background writer."""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from app.shared.capture import (
+    REDACTED,
+    CassetteMiss,
+    LLMCassette,
+    TrafficRecorder,
+    is_sensitive_key,
+    iter_capture,
+    request_key,
+    sanitize,
+)
+
+
+def _request(when: str, call_id: str = "call_1") -> dict:
+    return {
+        "model": "m",
+        "messages": [
+            {"role": "system", "content": f"Reference time: {when}"},
+            {"role": "tool", "tool_call_id": call_id, "content": "{}"},
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "key, sensitive",
+    [
+        ("Authorization", True),
+        ("X-Api-Key", True),
+        ("groq_api_key", True),
+        ("access_token", True),
+        ("Cookie", True),
+        ("tokens", False),
+        ("total_tokens", False),
+        ("timezone", False),
+    ],
+)
+def test_is_sensitive_key(key, sensitive):
+    assert is_sensitive_key(key) is sensitive
+
+
+def test_sanitize_redacts_nested_credentials():
+    cleaned = sanitize({"headers": {"authorization": "Bearer x"}, "items": [{"password": "p"}]})
+    assert cleaned == {"headers": {"authorization": REDACTED}, "items": [{"password": REDACTED}]}
+
+
+def test_request_key_ignores_call_ids_and_optionally_times():
+    morning = _request("2026-10-19T09:00:00+01:00")
+    evening = _request("2026-10-19T21:30:00+01:00", call_id="call_2")
+    assert request_key("chat", morning) != request_key("chat", evening)
+    assert request_key("chat", morning, ignore_times=True) == request_key(
+        "chat", evening, ignore_times=True
+    )
+    assert request_key("chat", morning) == request_key(
+        "chat", _request("2026-10-19T09:00:00+01:00", call_id="call_9")
+    )
+
+
+def test_cassette_rekeys_recorded_requests_and_cycles_repeats(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    records = [
+        {"type": "llm", "kind": "chat", "key": "old", "request": _request(when), "response": reply}
+        for when, reply in [("2026-01-01T08:00Z", {"n": 1}), ("2026-01-02T08:00Z", {"n": 2})]
+    ]
+    path.write_text("".join(json.dumps(record) + "\n" for record in records) + "torn{\n")
+    cassette = LLMCassette([path])
+    replayed = _request("2026-10-19T12:00:00+01:00")
+    assert [cassette.lookup("chat", replayed)["n"] for _ in range(3)] == [1, 2, 1]
+    with pytest.raises(CassetteMiss):
+        cassette.lookup("json", replayed)
+
+
+def test_records_are_written_by_the_writer_thread(tmp_path, monkeypatch):
+    recorder = TrafficRecorder(tmp_path / "traffic.jsonl", enabled=True)
+    writers = []
+    original = recorder._append
+
+    def tracking(text):
+        writers.append(threading.current_thread())
+        original(text)
+
+    monkeypatch.setattr(recorder, "_append", tracking)
+    for index in range(50):
+        recorder.record_request(path="/a2a/schedule-time", body={"id": index})
+    recorder.flush()
+    records = list(iter_capture(recorder.path))
+    assert [record["body"]["id"] for record in records] == list(range(50))
+    assert writers and threading.current_thread() not in writers
+
+
+def test_capture_rotates_at_max_bytes(tmp_path):
+    recorder = TrafficRecorder(
+        tmp_path / "traffic.jsonl", enabled=True, max_bytes=2_000, backup_count=2
+    )
+    for index in range(40):
+        recorder.record_request(path="/a2a/schedule-time", body={"id": index, "pad": "x" * 100})
+        recorder.flush()
+    assert recorder.path.with_name("traffic.jsonl.1").exists()
+    assert recorder.path.stat().st_size <= 2_000
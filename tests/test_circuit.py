@@ -0,0 +1,115 @@
+"""Circuit breaker: opening on bad calls, half-open probes and degraded answers."""
+
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.shared.circuit import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpen,
+    circuit_breakers,
+)
+from app.shared.llm import PROVIDER
+
+MODEL = "openai/gpt-oss-20b"
+
+
+def _breaker(**options) -> CircuitBreaker:
+    defaults = {"window": 10, "min_calls": 4, "failure_ratio": 0.5, "slow_call_seconds": 1.0}
+    return CircuitBreaker("test", **{**defaults, **options})
+
+
+def test_opens_once_enough_calls_fail_or_are_slow():
+    breaker = _breaker()
+    breaker.record(0.1)
+    breaker.record(0.1, failed=True)
+    breaker.record(0.1)
+    assert breaker.state == CLOSED
+    breaker.record(5.0)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen) as info:
+        breaker.before_call()
+    assert info.value.retry_after > 0
+
+
+def test_too_few_calls_never_open():
+    breaker = _breaker(min_calls=4)
+    for _ in range(3):
+        breaker.record(0.1, failed=True)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = _breaker(open_seconds=0.0)
+    for _ in range(4):
+        breaker.record(0.1, failed=True)
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    breaker.record(0.1, failed=True)
+    assert breaker._state == OPEN
+
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    breaker.record(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_released_probe_frees_its_slot():
+    breaker = _breaker(open_seconds=0.0)
+    for _ in range(4):
+        breaker.record(0.1, failed=True)
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+
+
+def test_disabled_breaker_never_rejects():
+    breaker = _breaker(enabled=False)
+    for _ in range(10):
+        breaker.record(0.1, failed=True)
+        breaker.before_call()
+
+
+def _ask(text: str) -> dict:
+    body = {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "parts": [{"kind": "text", "text": text}],
+                "metadata": {"target_timezones": ["Asia/Tokyo"]},
+            }
+        },
+    }
+    return TestClient(main.app).post("/a2a/schedule-time", json=body).json()["result"]
+
+
+@pytest.fixture
+def open_circuit():
+    breaker = circuit_breakers.get(PROVIDER, MODEL)
+    breaker._transition(OPEN)
+    yield breaker
+    breaker._transition(CLOSED)
+
+
+def test_open_circuit_answers_simple_requests_locally(open_circuit):
+    result = _ask("tomorrow 3pm Lagos")
+    assert result["status"]["state"] == "completed"
+    data = result["artifacts"][0]["parts"][1]["data"][0]
+    assert data["degraded"] is True
+    assert data["time_conversion"]["targets"][0]["timezone"] == "Asia/Tokyo"
+
+
+def test_open_circuit_fails_fast_on_requests_it_cannot_read(open_circuit):
+    result = _ask("Friday 3pm Lagos")
+    assert result["status"]["state"] == "failed"
+    assert "temporarily unavailable" in result["artifacts"][0]["parts"][0]["text"]
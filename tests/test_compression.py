@@ -0,0 +1,77 @@
+"""Response compression: Accept-Encoding negotiation, one-shot and streamed bodies."""
+
+from __future__ import annotations
+
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.shared.compression import CompressionMiddleware, choose_encoding
+
+BODY = "tick " * 1000
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("*", "br"),
+        ("identity", None),
+        ("gzip;q=0", None),
+        (None, None),
+    ],
+)
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_brotli_can_be_switched_off():
+    assert choose_encoding("br, gzip", brotli_enabled=False) == "gzip"
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(5):
+                yield BODY
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=512)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress", [("gzip", gzip.decompress), ("br", brotli.decompress)]
+)
+def test_one_shot_and_streamed_bodies_round_trip(client, encoding, decompress):
+    for path, expected in (("/big", BODY), ("/stream", BODY * 5)):
+        with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+            assert response.headers["content-encoding"] == encoding
+            assert "accept-encoding" in response.headers["vary"].lower()
+            payload = b"".join(response.iter_raw())
+        assert decompress(payload).decode() == expected
+
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
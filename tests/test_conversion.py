@@ -0,0 +1,80 @@
+"""Conversion engine: transition tables agree with ``zoneinfo`` across DST changes."""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.shared.conversion import (
+    ConversionEngine,
+    TransitionTable,
+    UnknownTimezone,
+    convert_time,
+    get_zone,
+    parse_clock,
+)
+
+ZONES = [
+    "America/New_York",
+    "Europe/London",
+    "Australia/Lord_Howe",
+    "Asia/Kathmandu",
+    "America/Sao_Paulo",
+    "Pacific/Chatham",
+    "Africa/Casablanca",
+]
+
+
+def test_table_records_each_dst_change_to_the_second():
+    start = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())
+    end = int(datetime(2027, 1, 1, tzinfo=timezone.utc).timestamp())
+    table = TransitionTable.build("America/New_York", start, end)
+    changes = [
+        datetime.fromtimestamp(instant, timezone.utc).isoformat() for instant in table.instants[1:]
+    ]
+    assert changes == ["2026-03-08T07:00:00+00:00", "2026-11-01T06:00:00+00:00"]
+    assert table.offsets == [-5 * 3600, -4 * 3600, -5 * 3600]
+
+
+@pytest.mark.parametrize("zone_name", ZONES)
+def test_engine_matches_zoneinfo(zone_name):
+    engine = ConversionEngine()
+    rng = random.Random(zone_name)
+    now = datetime.now(timezone.utc)
+    for _ in range(300):
+        instant = now + timedelta(seconds=rng.randint(-300, 700) * 86400 + rng.randint(0, 86399))
+        expected = instant.astimezone(get_zone(zone_name)).replace(tzinfo=None)
+        assert engine.localize(instant, zone_name) == expected
+
+
+def test_instants_outside_the_horizon_fall_back_to_zoneinfo():
+    engine = ConversionEngine(back_days=1, ahead_days=2)
+    instant = datetime(2040, 7, 1, 12, tzinfo=timezone.utc)
+    assert engine.utc_offset("Europe/London", instant) == timedelta(hours=1)
+
+
+def test_convert_rejects_unknown_zones_and_naive_instants():
+    engine = ConversionEngine()
+    with pytest.raises(UnknownTimezone):
+        engine.convert(datetime.now(timezone.utc), ["Mars/Olympus"])
+    with pytest.raises(ValueError):
+        engine.convert(datetime(2026, 1, 1), ["UTC"])
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("3pm", (15, 0)), ("3:05 PM", (15, 5)), ("12 a.m.", (0, 0)), ("15:05", (15, 5))],
+)
+def test_parse_clock(text, expected):
+    assert (parse_clock(text).hour, parse_clock(text).minute) == expected
+
+
+def test_convert_time_tool_accepts_place_names():
+    targets = convert_time("Lagos", "2026-10-19", "3:00 PM", ["Tokyo", "America/New_York"])
+    assert targets == [
+        {"timezone": "Asia/Tokyo", "date": "2026-10-19", "time": "11:00 PM"},
+        {"timezone": "America/New_York", "date": "2026-10-19", "time": "10:00 AM"},
+    ]
+    assert convert_time("UTC", "2026-10-19", "25:00", ["UTC"]).startswith("Conversion failed")
@@ -0,0 +1,99 @@
+"""Credential pool: key choice by quota, eviction on errors, exhaustion."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.shared.credentials import CredentialPool, CredentialsExhausted, _parse_duration
+
+
+class _ProviderError(Exception):
+    def __init__(self, status_code: int, headers=None) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def _pool(**options) -> CredentialPool:
+    return CredentialPool(["a", "b", "a", None], **options)
+
+
+def test_duplicate_and_empty_keys_are_dropped():
+    pool = _pool()
+    assert [c.name for c in pool] == ["key0", "key1"]
+    assert pool.configured
+    assert not CredentialPool([None, ""]).configured
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("7", 7.0), ("2m59.5s", 179.5), ("250ms", 0.25), ("1h", 3600.0), ("soon", None), (None, None)],
+)
+def test_parse_duration(value, seconds):
+    assert _parse_duration(value) == seconds
+
+
+def test_key_with_most_quota_left_wins():
+    pool = _pool()
+    first = pool.acquire()
+    pool.succeeded(
+        first,
+        {"x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "10"},
+    )
+    assert pool.acquire().name != first.name
+
+
+def test_ties_go_to_the_key_with_fewer_calls_in_flight():
+    pool = _pool()
+    busy = pool.acquire()
+    assert pool.acquire().name != busy.name
+
+
+def test_throttled_key_is_evicted_for_its_retry_after():
+    pool = _pool()
+    key = pool.acquire()
+    assert pool.failed(key, _ProviderError(429, {"retry-after": "30"}))
+    assert 29 < pool.snapshot()[key.name]["retry_after"] <= 30
+    assert pool.acquire().name != key.name
+
+
+def test_server_errors_evict_only_after_the_threshold():
+    pool = _pool(failure_threshold=2)
+    key = pool.acquire()
+    assert pool.failed(key, _ProviderError(503))
+    assert pool.snapshot()[key.name]["available"]
+    pool.acquire(exclude={"key1"})
+    pool.failed(key, _ProviderError(500))
+    assert not pool.snapshot()[key.name]["available"]
+
+
+def test_client_errors_are_not_retried_on_another_key():
+    pool = _pool()
+    key = pool.acquire()
+    assert not pool.failed(key, _ProviderError(400))
+    assert pool.snapshot()[key.name]["available"]
+
+
+def test_every_key_cooling_down_raises_exhausted():
+    pool = _pool(auth_cooldown=60.0)
+    assert pool.exhausted() is None
+    for key in (pool.acquire(), pool.acquire()):
+        pool.failed(key, _ProviderError(401))
+    with pytest.raises(CredentialsExhausted) as info:
+        pool.acquire()
+    assert 0 < info.value.retry_after <= 60
+    assert isinstance(pool.exhausted(), CredentialsExhausted)
+
+
+def test_acquire_returns_none_once_every_key_was_tried():
+    pool = _pool()
+    assert pool.acquire(exclude={"key0", "key1"}) is None
+
+
+def test_cooled_down_key_returns_to_rotation():
+    pool = _pool(throttle_cooldown=0.0)
+    key = pool.acquire(exclude={"key1"})
+    pool.failed(key, _ProviderError(429))
+    assert pool.acquire(exclude={"key1"}).name == key.name
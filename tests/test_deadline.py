@@ -0,0 +1,93 @@
+"""Request deadlines: budget resolution, stage checks and the failed result."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from groq import APIConnectionError
+
+import main
+from app.config import settings
+from app.shared.credentials import is_provider_failure
+from app.shared.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    current_deadline,
+    deadline_scope,
+    resolve_budget,
+)
+
+
+@pytest.mark.parametrize(
+    "header, metadata, budget",
+    [
+        ("5", None, 5.0),
+        (None, {"timeout_seconds": 2.5}, 2.5),
+        ("abc", {"timeout_seconds": "3"}, 3.0),
+        ("-1", None, settings.request_timeout),
+        ("100000", None, settings.request_timeout_max),
+        (None, None, settings.request_timeout),
+    ],
+)
+def test_resolve_budget(header, metadata, budget):
+    assert resolve_budget(header, metadata) == budget
+
+
+def test_check_raises_once_the_budget_is_spent():
+    assert Deadline.after(10).check("llm") > 9
+    with pytest.raises(DeadlineExceeded) as info:
+        Deadline.after(0).check("intent")
+    assert info.value.stage == "intent"
+
+
+def test_deadline_scope_is_restored():
+    deadline = Deadline.after(5)
+    with deadline_scope(deadline):
+        assert current_deadline() is deadline
+    assert current_deadline() is None
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(status_code)
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize("status, provider", [(429, True), (503, True), (400, False), (404, False)])
+def test_only_provider_side_errors_count_as_provider_failures(status, provider):
+    assert is_provider_failure(_StatusError(status)) is provider
+    try:
+        try:
+            raise _StatusError(status)
+        except _StatusError as exc:
+            raise RuntimeError("wrapped") from exc
+    except RuntimeError as wrapped:
+        assert is_provider_failure(wrapped) is provider
+
+
+def test_unreachable_provider_is_a_provider_failure():
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    assert is_provider_failure(APIConnectionError(request=request))
+    assert not is_provider_failure(ValueError("bad model output"))
+
+
+def test_exhausted_budget_fails_the_task_without_an_error_status():
+    body = {
+        "jsonrpc": "2.0",
+        "id": "1",
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "parts": [{"kind": "text", "text": "3pm Lagos in Tokyo next Friday"}],
+            }
+        },
+    }
+    response = TestClient(main.app).post(
+        "/a2a/schedule-time", json=body, headers={"x-request-timeout": "0.01"}
+    )
+    assert response.status_code == 200
+    result = response.json()["result"]
+    assert result["status"]["state"] == "failed"
+    assert "Time budget exhausted" in result["artifacts"][0]["parts"][0]["text"]
@@ -0,0 +1,52 @@
+"""Degraded-mode interpretation: simple expressions only, ``None`` for the rest."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from app.agents.schedule_time.fallback import interpret_locally
+from app.shared.conversion import get_zone
+
+REFERENCE = datetime(2026, 10, 19, 9, 0, tzinfo=get_zone("Africa/Lagos"))
+
+
+def _interpret(expression: str):
+    return interpret_locally(
+        expression,
+        default_timezone="Africa/Lagos",
+        target_timezones=["Asia/Tokyo"],
+        reference=REFERENCE,
+    )
+
+
+@pytest.mark.parametrize(
+    "expression, day, clock",
+    [
+        ("3pm Lagos", "2026-10-19", "3:00 PM"),
+        ("tomorrow 3pm Lagos", "2026-10-20", "3:00 PM"),
+        ("15:30 Lagos on 2026-11-02", "2026-11-02", "3:30 PM"),
+    ],
+)
+def test_reads_simple_expressions(expression, day, clock):
+    response = _interpret(expression)
+    assert (response.source.date, response.source.time) == (day, clock)
+    assert response.targets[0].timezone == "Asia/Tokyo"
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "March 5 at 3pm Lagos",
+        "Friday 3pm Lagos",
+        "3pm Lagos in 3 days",
+        "3pm Lagos on 25/12/2026",
+        "3pm Lagos on 25.12.2026",
+        "Christmas at 3pm Lagos",
+        "3pm Lagos on 2026-13-45",
+        "Lagos in the afternoon",
+    ],
+)
+def test_refuses_dates_it_cannot_read(expression):
+    assert _interpret(expression) is None
@@ -0,0 +1,103 @@
+"""Idempotent replay: one execution per key, caller scoping and conflicts."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.shared.idempotency import (
+    IdempotencyCache,
+    IdempotencyConflict,
+    caller_scope,
+    request_fingerprint,
+)
+from app.shared.store import SharedStore
+from app.shared.task_builder import build_error_result, build_task_result
+from models.a2a import A2AMessage
+
+MESSAGE = A2AMessage(role="user", parts=[{"kind": "text", "text": "3pm Lagos"}], messageId="m-1")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return IdempotencyCache(SharedStore(tmp_path / "store.sqlite3"), poll_interval=0.01)
+
+
+def _counting(results):
+    calls = []
+
+    async def work():
+        calls.append(len(calls))
+        await asyncio.sleep(0.05)
+        return results[min(len(calls), len(results)) - 1]
+
+    return work, calls
+
+
+def test_keys_are_scoped_to_the_caller(cache):
+    alice = caller_scope({"authorization": "Bearer a"}, "10.0.0.1")
+    bob = caller_scope({}, "10.0.0.2")
+    assert cache.key_for("agent", MESSAGE, caller=alice) != cache.key_for(
+        "agent", MESSAGE, caller=bob
+    )
+    assert cache.key_for("agent", A2AMessage(role="user", parts=[])) is None
+
+
+def test_retry_is_replayed_without_running_again(cache):
+    done = build_task_result(message=MESSAGE, text_parts=["ok"])
+    work, calls = _counting([done])
+
+    async def scenario():
+        first = await cache.run("k", work, lease=5)
+        second = await cache.run("k", work, lease=5)
+        return first, second
+
+    (first, reused_first), (second, reused_second) = asyncio.run(scenario())
+    assert (reused_first, reused_second) == (False, True)
+    assert second.model_dump() == first.model_dump()
+    assert len(calls) == 1
+
+
+async def _run_while_running(cache, work):
+    """Start one call, then a retry once the first is running in this worker."""
+    first = asyncio.create_task(cache.run("k", work, lease=5))
+    while "k" not in cache._running:
+        await asyncio.sleep(0.001)
+    second = await cache.run("k", work, lease=5)
+    return await first, second
+
+
+def test_concurrent_waiter_attaches_to_the_running_call(cache):
+    done = build_task_result(message=MESSAGE, text_parts=["ok"])
+    work, calls = _counting([done])
+
+    (_, reused_first), (_, reused_second) = asyncio.run(_run_while_running(cache, work))
+    assert (reused_first, reused_second) == (False, True)
+    assert len(calls) == 1
+
+
+def test_waiter_reruns_after_a_failed_call(cache):
+    failed = build_error_result(message=MESSAGE, error_message="deadline exceeded")
+    done = build_task_result(message=MESSAGE, text_parts=["ok"])
+    work, calls = _counting([failed, done])
+
+    (first, _), (second, reused) = asyncio.run(_run_while_running(cache, work))
+    assert first.status.state == "failed"
+    assert second.status.state == "completed"
+    assert reused is False
+    assert len(calls) == 2
+
+
+def test_reusing_a_key_for_other_params_is_a_conflict(cache):
+    done = build_task_result(message=MESSAGE, text_parts=["ok"])
+    work, _ = _counting([done])
+    original = request_fingerprint({"message": {"text": "3pm Lagos"}})
+    other = request_fingerprint({"message": {"text": "4pm Lagos"}})
+
+    async def scenario():
+        await cache.run("k", work, lease=5, fingerprint=original)
+        await cache.run("k", work, lease=5, fingerprint=other)
+
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(scenario())
@@ -0,0 +1,111 @@
+"""Bulk jobs: submission, results, deferral under load and resume after a crash."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from app.config import settings
+from app.shared.bulkhead import BulkheadFull
+from app.shared.jobs import JobManager, JobState
+from app.shared.task_builder import build_task_result
+
+
+def _line(index: int) -> bytes:
+    message = {"role": "user", "parts": [{"kind": "text", "text": f"item {index}"}]}
+    return json.dumps({"message": {**message, "messageId": f"m-{index}"}}).encode() + b"\n"
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def _manager(tmp_path, seen, **options) -> JobManager:
+    async def dispatch(message, *, context_id=None, task_id=None):
+        seen.append(message.messageId)
+        return build_task_result(message=message, text_parts=["ok"])
+
+    manager = JobManager(tmp_path / "jobs", concurrency=2, **options)
+    manager.register("echo", dispatch)
+    return manager
+
+
+def _records(manager: JobManager, job_id: str):
+    async def collect():
+        return b"".join([chunk async for chunk in manager.stream_results(job_id)])
+
+    return [json.loads(line) for line in asyncio.run(collect()).splitlines()]
+
+
+def test_job_runs_every_line_and_records_bad_ones(tmp_path):
+    seen = []
+    manager = _manager(tmp_path, seen)
+    upload = _line(0) + _line(1)[:20], _line(1)[20:] + b"not json\n\n" + _line(3).rstrip()
+
+    async def scenario():
+        job = await manager.submit("echo", _chunks(*upload))
+        await manager._tasks[job.id]
+        return job.id
+
+    job_id = asyncio.run(scenario())
+    job = manager.status(job_id)
+    assert (job.state, job.total, job.completed, job.failed) == ("completed", 4, 3, 1)
+    assert sorted(seen) == ["m-0", "m-1", "m-3"]
+    records = {record["index"]: record for record in _records(manager, job_id)}
+    assert records[2]["error"].startswith("Invalid message")
+    assert records[3]["result"]["status"]["state"] == "completed"
+
+
+def test_unknown_agent_and_job_ids_are_rejected(tmp_path):
+    manager = _manager(tmp_path, [])
+    with pytest.raises(KeyError):
+        asyncio.run(manager.submit("missing", _chunks(_line(0))))
+    assert manager.status("../etc") is None
+    assert manager.cancel("nope") is None
+
+
+def test_resume_skips_finished_items_and_drops_a_torn_line(tmp_path):
+    seen = []
+    manager = _manager(tmp_path, seen)
+    job = JobState(id="resumed", agent="echo", state="running", total=3)
+    job_dir = tmp_path / "jobs" / job.id
+    job_dir.mkdir(parents=True)
+    (job_dir / "input.ndjson").write_bytes(_line(0) + _line(1) + _line(2))
+    done = {"index": 0, "result": {"status": {"state": "completed"}}}
+    (job_dir / "results.ndjson").write_bytes(json.dumps(done).encode() + b'\n{"index": 1, "res')
+    manager._save(job)
+
+    async def scenario():
+        assert manager.resume_pending() == ["resumed"]
+        await manager._tasks["resumed"]
+
+    asyncio.run(scenario())
+    assert sorted(seen) == ["m-1", "m-2"]
+    assert sorted(record["index"] for record in _records(manager, "resumed")) == [0, 1, 2]
+    assert manager.status("resumed").completed == 3
+
+
+def test_item_refused_on_every_attempt_stays_pending(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "admission_retry_after", 0)
+    manager = JobManager(tmp_path / "jobs", max_attempts=2)
+    attempts = []
+
+    async def busy(message, *, context_id=None, task_id=None):
+        attempts.append(message.messageId)
+        raise BulkheadFull("echo")
+
+    assert asyncio.run(manager._process(busy, 0, _line(0))) is None
+    assert attempts == ["m-0", "m-0"]
+
+
+def test_cancelling_an_idle_job_marks_it_cancelled(tmp_path):
+    manager = _manager(tmp_path, [])
+    job = JobState(id="idle", agent="echo", total=1)
+    (tmp_path / "jobs" / job.id).mkdir(parents=True)
+    manager._save(job)
+    assert manager.cancel("idle").state == "cancelled"
+    assert manager.status("idle").state == "cancelled"
+    assert manager.resume_pending() == []
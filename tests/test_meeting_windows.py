@@ -0,0 +1,69 @@
+"""Meeting-window sweep: overlaps across zones, DST edges and shared zones."""
+
+from __future__ import annotations
+
+from datetime import date, time
+
+from app.agents.schedule_time.meeting_windows import Participant, find_meeting_windows
+
+
+def test_overlap_between_london_and_new_york():
+    windows = find_meeting_windows(
+        [Participant("ana", "Europe/London"), Participant("bo", "America/New_York")],
+        start_date=date(2026, 10, 20),
+        end_date=date(2026, 10, 20),
+        range_timezone="UTC",
+    )
+    assert len(windows) == 1
+    # 09:00-17:00 BST and 09:00-17:00 EDT overlap 13:00-16:00 UTC.
+    assert (windows[0].start.hour, windows[0].end.hour) == (13, 16)
+    assert windows[0].attendees == ["ana", "bo"]
+
+
+def test_dst_gap_week_widens_the_overlap():
+    # Between the US (Mar 8) and EU (Mar 29) changes the offset is 4 hours.
+    windows = find_meeting_windows(
+        [Participant("ana", "Europe/London"), Participant("bo", "America/New_York")],
+        start_date=date(2026, 3, 10),
+        end_date=date(2026, 3, 10),
+    )
+    assert (windows[0].start.hour, windows[0].end.hour) == (13, 17)
+
+
+def test_participants_sharing_a_zone_count_separately():
+    participants = [
+        Participant("Europe/London", "Europe/London"),
+        Participant("Europe/London", "Europe/London"),
+        Participant("America/New_York", "America/New_York"),
+    ]
+    windows = find_meeting_windows(
+        participants, start_date=date(2026, 10, 20), end_date=date(2026, 10, 20)
+    )
+    assert len(windows) == 1
+    assert len(windows[0].attendees) == 3
+    assert windows[0].missing == []
+
+
+def test_min_attendees_allows_partial_windows():
+    participants = [
+        Participant("ana", "Europe/London"),
+        Participant("kai", "Asia/Tokyo", work_start=time(9), work_end=time(17)),
+    ]
+    windows = find_meeting_windows(
+        participants,
+        start_date=date(2026, 10, 20),
+        end_date=date(2026, 10, 20),
+        min_attendees=1,
+    )
+    assert windows
+    assert all(len(window.attendees) == 1 for window in windows)
+    assert {tuple(window.missing) for window in windows} == {("ana",), ("kai",)}
+
+
+def test_weekend_is_skipped_unless_asked():
+    participants = [Participant("ana", "Europe/London")]
+    saturday = date(2026, 10, 24)
+    assert find_meeting_windows(participants, start_date=saturday, end_date=saturday) == []
+    assert find_meeting_windows(
+        participants, start_date=saturday, end_date=saturday, weekdays_only=False
+    )
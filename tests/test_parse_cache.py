@@ -0,0 +1,110 @@
+"""Parse cache: expression classification and re-anchoring of cached readings."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.agents.schedule_time.parse_cache import (
+    ParseCache,
+    build_cached_response,
+    classify_expression,
+)
+from app.shared.conversion import get_zone
+from app.shared.store import SharedStore
+from models.time_conversion import TimeNLConvertResponse, TimeSource, TimeTarget
+
+LAGOS = "Africa/Lagos"
+TOKYO = "Asia/Tokyo"
+
+
+@pytest.mark.parametrize(
+    "expression, kind",
+    [
+        ("3pm Lagos", "day"),
+        ("tomorrow at 9am New York", "day"),
+        ("3pm in 2 days", "day"),
+        ("in 2 hours", "offset"),
+        ("March 5 at 3pm", "absolute"),
+        ("3pm Lagos on 25/12/2026", "absolute"),
+        ("next Monday 10am", "week"),
+        ("Christmas at 3pm", "uncacheable"),
+        ("Thanksgiving", "uncacheable"),
+        ("end of the month", "uncacheable"),
+        ("25.12.2026 3pm", "uncacheable"),
+    ],
+)
+def test_classify_expression(expression, kind):
+    assert classify_expression(expression) == kind
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(SharedStore(tmp_path / "store.sqlite3"))
+
+
+def _response(expression: str, day: str, clock: str, targets=(TOKYO,)) -> TimeNLConvertResponse:
+    return TimeNLConvertResponse(
+        input_text=expression,
+        output_text="",
+        source=TimeSource(timezone=LAGOS, date=day, time=clock),
+        targets=[TimeTarget(timezone=zone, date=day, time=clock) for zone in targets],
+    )
+
+
+def test_day_reading_is_reanchored_to_the_next_day(cache):
+    reference = datetime(2026, 10, 19, 9, 0, tzinfo=get_zone(LAGOS))
+    cache.remember(
+        "3pm tomorrow",
+        _response("3pm tomorrow", "2026-10-20", "3:00 PM"),
+        default_timezone=LAGOS,
+        reference=reference,
+        requested_targets=[TOKYO],
+    )
+    later = reference + timedelta(days=1)
+    interpretation = cache.lookup("3pm tomorrow", default_timezone=LAGOS, reference=later)
+    response = build_cached_response(
+        "3pm tomorrow", interpretation, reference=later, target_timezones=[TOKYO]
+    )
+    assert (response.source.date, response.source.time) == ("2026-10-21", "3:00 PM")
+    assert (response.targets[0].date, response.targets[0].time) == ("2026-10-21", "11:00 PM")
+
+
+def test_clock_time_survives_a_day_offset(cache):
+    reference = datetime(2026, 10, 19, 9, 17, tzinfo=get_zone(LAGOS))
+    cache.remember(
+        "3pm in 2 days",
+        _response("3pm in 2 days", "2026-10-21", "3:00 PM"),
+        default_timezone=LAGOS,
+        reference=reference,
+        requested_targets=[TOKYO],
+    )
+    later = reference + timedelta(hours=5, minutes=3)
+    interpretation = cache.lookup("3pm in 2 days", default_timezone=LAGOS, reference=later)
+    assert interpretation.resolve(later).strftime("%Y-%m-%d %H:%M") == "2026-10-21 15:00"
+
+
+def test_unknown_forms_are_not_stored(cache):
+    reference = datetime(2026, 10, 19, 9, 0, tzinfo=get_zone(LAGOS))
+    stored = cache.remember(
+        "Christmas at 3pm",
+        _response("Christmas at 3pm", "2026-12-25", "3:00 PM"),
+        default_timezone=LAGOS,
+        reference=reference,
+        requested_targets=[TOKYO],
+    )
+    assert stored is None
+    assert cache.lookup("Christmas at 3pm", default_timezone=LAGOS, reference=reference) is None
+
+
+def test_response_missing_a_requested_target_is_not_stored(cache):
+    reference = datetime(2026, 10, 19, 9, 0, tzinfo=get_zone(LAGOS))
+    stored = cache.remember(
+        "3pm",
+        _response("3pm", "2026-10-19", "3:00 PM"),
+        default_timezone=LAGOS,
+        reference=reference,
+        requested_targets=[TOKYO, "Europe/Paris"],
+    )
+    assert stored is None
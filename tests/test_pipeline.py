@@ -0,0 +1,83 @@
+"""Agent pipelines: dependency waves, caching, short-circuits and error mapping."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from app.shared.pipeline import (
+    Pipeline,
+    ShortCircuit,
+    Stage,
+    StageCache,
+    stage_listener,
+)
+from app.shared.store import SharedStore
+
+
+def test_stages_run_in_dependency_waves():
+    pipeline = Pipeline(
+        "test",
+        [
+            Stage("a", lambda ctx: 1),
+            Stage("b", lambda ctx: 2),
+            Stage("sum", lambda ctx: ctx["a"] + ctx["b"], after=("a", "b")),
+        ],
+    )
+    assert [[stage.name for stage in wave] for wave in pipeline.waves] == [["a", "b"], ["sum"]]
+    assert asyncio.run(pipeline.run(None)) == 3
+
+
+def test_stages_must_be_declared_after_their_dependencies():
+    with pytest.raises(ValueError):
+        Pipeline("test", [Stage("b", lambda ctx: 1, after=("a",)), Stage("a", lambda ctx: 1)])
+    with pytest.raises(ValueError):
+        Pipeline("test", [Stage("a", lambda ctx: 1), Stage("a", lambda ctx: 2)])
+
+
+def test_blocking_stages_run_off_the_event_loop():
+    loop_thread = threading.current_thread()
+    pipeline = Pipeline(
+        "test", [Stage("where", lambda ctx: threading.current_thread(), blocking=True)]
+    )
+    assert asyncio.run(pipeline.run(None)) is not loop_thread
+
+
+def test_cached_stage_is_skipped_on_a_hit(tmp_path):
+    calls = []
+
+    def compute(ctx):
+        calls.append(ctx.message)
+        return ctx.message * 2
+
+    store = SharedStore(tmp_path / "store.sqlite3")
+    cache = StageCache("double", key=lambda ctx: str(ctx.message), store=store)
+    pipeline = Pipeline("test", [Stage("double", compute, cache=cache)])
+    seen = []
+    with stage_listener(lambda name, stage: seen.append(stage)):
+        results = [asyncio.run(pipeline.run(4)) for _ in range(2)]
+    assert results == [8, 8]
+    assert calls == [4]
+    assert seen == ["double", "double"]
+
+
+def test_short_circuit_and_error_handlers_end_the_run_early():
+    def stop(ctx):
+        raise ShortCircuit("early")
+
+    async def mapped(ctx, exc):
+        return f"mapped {exc}"
+
+    def fail(ctx):
+        raise KeyError("x")
+
+    later = Stage("later", lambda ctx: "unreachable", after=("first",))
+    assert asyncio.run(Pipeline("test", [Stage("first", stop), later]).run(None)) == "early"
+    stage = Stage("first", fail, errors={KeyError: mapped})
+    assert asyncio.run(Pipeline("test", [stage, later]).run(None)) == "mapped 'x'"
+    pipeline = Pipeline("test", [Stage("first", fail), later], errors={LookupError: mapped})
+    assert asyncio.run(pipeline.run(None)) == "mapped 'x'"
+    with pytest.raises(KeyError):
+        asyncio.run(Pipeline("test", [Stage("first", fail)]).run(None))
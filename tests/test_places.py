@@ -0,0 +1,52 @@
+"""Place resolver: exact, fuzzy and free-text lookups against the local index."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.shared.places import place_resolver
+
+
+@pytest.mark.parametrize(
+    "name, zone, kind",
+    [
+        ("Lagos", "Africa/Lagos", "city"),
+        ("Dubai time", "Asia/Dubai", "city"),
+        ("São Paulo", "America/Sao_Paulo", "city"),
+        ("sao paulo", "America/Sao_Paulo", "city"),
+        ("PST", "America/Los_Angeles", "abbreviation"),
+        ("Germany", "Europe/Berlin", "country"),
+        ("Europe/Paris", "Europe/Paris", "zone"),
+    ],
+)
+def test_exact_lookups(name, zone, kind):
+    match = place_resolver.resolve(name)
+    assert (match.zone, match.kind, match.fuzzy) == (zone, kind, False)
+
+
+def test_misspellings_fall_back_to_a_fuzzy_match():
+    match = place_resolver.resolve("Londn")
+    assert match.zone == "Europe/London"
+    assert match.fuzzy
+    assert place_resolver.resolve("zzzz") is None
+
+
+def test_canonicalize_keeps_unknown_names():
+    assert place_resolver.canonicalize(["Tokyo", "Nowhere"]) == ["Asia/Tokyo", "Nowhere"]
+
+
+@pytest.mark.parametrize(
+    "text, zones",
+    [
+        ("3pm Lagos to Tokyo", ["Africa/Lagos", "Asia/Tokyo"]),
+        ("3pm in New York and São Paulo", ["America/New_York", "America/Sao_Paulo"]),
+        ("3pm PST and CET", ["America/Los_Angeles", "Europe/Berlin"]),
+        ("3pm in LA", ["America/Los_Angeles"]),
+        ("3pm in la", []),
+        ("let us meet at the center", []),
+        ("the north office, west wing", []),
+        ("meet in North", []),
+    ],
+)
+def test_find_zones_in_free_text(text, zones):
+    assert place_resolver.find_zones(text) == zones
@@ -0,0 +1,103 @@
+"""Priority lanes: lane resolution and weighted sharing of bulkhead slots."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import pytest
+
+from app.shared.bulkhead import Bulkhead
+from app.shared.priority import (
+    BACKGROUND,
+    INTERACTIVE,
+    LanePolicy,
+    current_lane,
+    lane_scope,
+    resolve_lane,
+)
+
+
+@pytest.mark.parametrize(
+    "header, metadata, lane",
+    [
+        (None, None, INTERACTIVE),
+        ("background", None, BACKGROUND),
+        (" Cron ", None, BACKGROUND),
+        (None, {"priority": "bulk"}, BACKGROUND),
+        ("high", {"priority": "low"}, INTERACTIVE),
+        ("urgent!!", {"priority": 7}, INTERACTIVE),
+    ],
+)
+def test_resolve_lane(header, metadata, lane):
+    assert resolve_lane(header, metadata) == lane
+
+
+def test_lane_scope_is_restored():
+    with lane_scope(BACKGROUND):
+        assert current_lane() == BACKGROUND
+    assert current_lane() == INTERACTIVE
+
+
+def _grant_order(bulkhead: Bulkhead, waiting: List[str]) -> List[str]:
+    """Queue ``waiting`` lanes behind one held slot and return the order they are served."""
+    order: List[str] = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def hold():
+            async with bulkhead.slot(INTERACTIVE):
+                await gate.wait()
+
+        async def request(lane: str):
+            async with bulkhead.slot(lane):
+                order.append(lane)
+                await asyncio.sleep(0)
+
+        holders = [asyncio.create_task(hold()) for _ in range(bulkhead.max_concurrency)]
+        await asyncio.sleep(0)
+        requests = [asyncio.create_task(request(lane)) for lane in waiting]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(*holders, *requests)
+
+    asyncio.run(scenario())
+    return order
+
+
+def test_freed_slots_follow_lane_weights():
+    policy = LanePolicy(weights={INTERACTIVE: 8, BACKGROUND: 1})
+    bulkhead = Bulkhead("test", max_concurrency=1, max_queue=100, policy=policy)
+    order = _grant_order(bulkhead, [BACKGROUND] * 4 + [INTERACTIVE] * 16)
+    assert order[:9].count(BACKGROUND) == 1
+    assert order[:18].count(BACKGROUND) == 2
+    assert sorted(order) == sorted([BACKGROUND] * 4 + [INTERACTIVE] * 16)
+
+
+def test_background_is_deferred_behind_a_deep_interactive_queue():
+    policy = LanePolicy(weights={INTERACTIVE: 1, BACKGROUND: 1}, defer_depth=3)
+    bulkhead = Bulkhead("test", max_concurrency=1, max_queue=100, policy=policy)
+    order = _grant_order(bulkhead, [BACKGROUND] * 2 + [INTERACTIVE] * 6)
+    # Background waits until fewer than three interactive requests are queued.
+    assert order.index(BACKGROUND) >= 4
+
+
+def test_background_share_caps_concurrent_background_work():
+    policy = LanePolicy(weights={INTERACTIVE: 1, BACKGROUND: 1}, background_share=0.5)
+    bulkhead = Bulkhead("test", max_concurrency=4, max_queue=100, policy=policy)
+    peak = 0
+
+    async def scenario():
+        nonlocal peak
+
+        async def request():
+            nonlocal peak
+            async with bulkhead.slot(BACKGROUND):
+                peak = max(peak, bulkhead.snapshot()["lanes"][BACKGROUND]["active"])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request() for _ in range(8)))
+
+    asyncio.run(scenario())
+    assert peak == 2
@@ -0,0 +1,98 @@
+"""Recurrence rules: constant-time n-th dates, cursors and DST flags."""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from app.agents.schedule_time.recurrence import (
+    decode_cursor,
+    encode_cursor,
+    expand_page,
+    nth_date,
+    occurrence_dates,
+)
+from models.time_conversion import RecurrenceRule
+
+
+def _rule(**fields) -> RecurrenceRule:
+    values = {
+        "frequency": "weekly",
+        "time": "3:00 PM",
+        "timezone": "Africa/Lagos",
+        "start_date": "2026-10-19",
+    }
+    values.update(fields)
+    return RecurrenceRule(**values)
+
+
+def test_nth_date_matches_a_day_by_day_walk():
+    rule = _rule(interval=2, weekdays=[1, 3], start_date="2026-10-22")
+    week_zero = date(2026, 10, 19)
+    walked = [
+        day
+        for day in (date(2026, 10, 22) + timedelta(days=offset) for offset in range(300))
+        if day.weekday() in (1, 3) and (day - week_zero).days // 7 % 2 == 0
+    ][:40]
+    assert [nth_date(rule, index) for index in range(40)] == walked
+    assert walked[:3] == [date(2026, 10, 22), date(2026, 11, 3), date(2026, 11, 5)]
+
+
+def test_monthly_rule_clamps_to_short_months():
+    rule = _rule(frequency="monthly", month_day=31, start_date="2026-01-31")
+    assert [nth_date(rule, index) for index in range(3)] == [
+        date(2026, 1, 31),
+        date(2026, 2, 28),
+        date(2026, 3, 31),
+    ]
+
+
+def test_cursor_round_trip_resumes_the_series():
+    rule = _rule(weekdays=[0, 2, 4], count=7)
+    first, cursor = expand_page(rule, ["Asia/Tokyo"], page_size=5)
+    rest, end = expand_page(*decode_cursor(cursor)[:2], start_index=decode_cursor(cursor)[2])
+    assert [item["index"] for item in first + rest] == list(range(7))
+    assert end is None
+
+
+def _forge(payload: dict) -> str:
+    raw = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"r": {"weekdays": [9, -3]}},
+        {"r": {"timezone": "Mars/Olympus"}},
+        {"t": ["Nowhere/City"]},
+        {"i": -1},
+    ],
+)
+def test_tampered_cursors_are_rejected(change):
+    payload = json.loads(
+        base64.urlsafe_b64decode(encode_cursor(_rule(), ["Asia/Tokyo"], 3) + "==")
+    )
+    for key, value in change.items():
+        payload[key] = {**payload[key], **value} if isinstance(value, dict) else value
+    with pytest.raises(ValueError, match="Invalid recurrence cursor"):
+        decode_cursor(_forge(payload))
+
+
+def test_dst_gap_and_overlap_are_flagged():
+    rule = _rule(
+        frequency="daily", time="2:30 AM", timezone="America/New_York", start_date="2026-03-07"
+    )
+    page, _ = expand_page(rule, ["UTC"], page_size=3)
+    assert [item.get("dst") for item in page] == [None, "nonexistent", None]
+    assert page[1]["source"]["time"] == "3:30 AM"
+
+    rule = _rule(
+        frequency="daily", time="1:30 AM", timezone="America/New_York", start_date="2026-10-31"
+    )
+    page, _ = expand_page(rule, ["UTC"], page_size=2)
+    assert [item.get("dst") for item in page] == [None, "ambiguous"]
+    assert page[1]["targets"][0]["time"] == "5:30 AM"
@@ -0,0 +1,89 @@
+"""Structured-output repair: tolerant JSON parsing, normalization and recomputed targets."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.agents.schedule_time.repair import normalize_date, normalize_time, repair_time_response
+from app.shared.json_repair import parse_json_tolerant
+
+
+@pytest.mark.parametrize(
+    "text, expected, repaired",
+    [
+        ('{"a": 1}', {"a": 1}, False),
+        ('```json\n{"a": 1}\n```', {"a": 1}, True),
+        ('Here you go: {"a": [1, 2,],} thanks', {"a": [1, 2]}, True),
+        ('{"a": "trunc', {"a": "trunc"}, True),
+        ('{"a": 1, "b":', {"a": 1, "b": None}, True),
+        ('{"a": {"b": [1, 2', {"a": {"b": [1, 2]}}, True),
+        ('{"a": 1, "b', {"a": 1, "b": None}, True),
+    ],
+)
+def test_parse_json_tolerant(text, expected, repaired):
+    assert parse_json_tolerant(text) == (expected, repaired)
+
+
+def test_parse_json_tolerant_gives_up_without_json():
+    with pytest.raises(ValueError):
+        parse_json_tolerant("no json here")
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2026-10-19", "2026-10-19"),
+        ("2026-10-19T15:00:00Z", "2026-10-19"),
+        ("October 19, 2026", "2026-10-19"),
+        ("19/10/2026", "2026-10-19"),
+        ("10/19/2026", "2026-10-19"),
+        ("05/05/2026", "2026-05-05"),
+    ],
+)
+def test_normalize_date(value, expected):
+    assert normalize_date(value) == expected
+
+
+def test_ambiguous_slash_dates_are_refused():
+    with pytest.raises(ValueError, match="Ambiguous"):
+        normalize_date("03/04/2026")
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("15:00", "3:00 PM"), ("3pm", "3:00 PM"), ("2026-10-19T09:05:00", "9:05 AM")],
+)
+def test_normalize_time(value, expected):
+    assert normalize_time(value) == expected
+
+
+def test_wrong_targets_are_recomputed_locally():
+    payload = {
+        "input_text": "3pm Lagos in Tokyo",
+        "output_text": "wrong",
+        "source": {"timezone": "Africa/Lagos", "date": "October 19, 2026", "time": "15:00"},
+        "targets": [{"timezone": "Asia/Tokyo", "date": "2026-10-19", "time": "10:00 PM"}],
+    }
+    response, report = repair_time_response(payload, expression="3pm Lagos in Tokyo")
+    assert (response.source.date, response.source.time) == ("2026-10-19", "3:00 PM")
+    assert response.targets[0].time == "11:00 PM"
+    assert report.recomputed_targets == ["Asia/Tokyo"]
+    assert {"source.date", "source.time", "output_text"} <= set(report.normalized_fields)
+    assert response.output_text.endswith("11:00 PM on 2026-10-19 in Asia/Tokyo.")
+
+
+def test_unknown_target_zones_are_left_alone():
+    payload = {
+        "input_text": "x",
+        "output_text": "y",
+        "source": {"timezone": "Africa/Lagos", "date": "2026-10-19", "time": "3:00 PM"},
+        "targets": [{"timezone": "Slack ID not found", "date": "2026-10-19", "time": "3:00 PM"}],
+    }
+    response, report = repair_time_response(payload, expression="x")
+    assert response.targets[0].timezone == "Slack ID not found"
+    assert not report.changed
+
+
+def test_non_object_payload_is_rejected():
+    with pytest.raises(ValueError):
+        repair_time_response(["not", "an", "object"], expression="x")
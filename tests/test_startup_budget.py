@@ -0,0 +1,30 @@
+"""Cold-start budget: ``import main`` must stay fast and must not load provider SDKs."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# Generous enough for shared CI runners; override with STARTUP_BUDGET_MS.
+BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "1500"))
+
+
+def test_import_main_within_budget():
+    proc = subprocess.run(
+        [
+            sys.executable,
+            str(ROOT / "scripts" / "profile_imports.py"),
+            "--top",
+            "10",
+            "--budget-ms",
+            str(BUDGET_MS),
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
@@ -0,0 +1,60 @@
+"""Shared store: expiry, first-writer-wins ``add`` and the async wrappers."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.shared.store import SharedStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStore(tmp_path / "store.sqlite3")
+
+
+def test_values_expire_after_their_ttl(store):
+    store.set("ns", "k", {"a": 1}, ttl=0.05)
+    assert store.get("ns", "k") == {"a": 1}
+    time.sleep(0.1)
+    assert store.get("ns", "k", "gone") == "gone"
+
+
+def test_add_keeps_the_first_live_value(store):
+    assert store.add("ns", "k", 1, ttl=0.05)
+    assert not store.add("ns", "k", 2)
+    time.sleep(0.1)
+    assert store.add("ns", "k", 3)
+    assert store.get("ns", "k") == 3
+
+
+def test_trim_keeps_the_newest_entries(tmp_path):
+    store = SharedStore(tmp_path / "store.sqlite3", max_entries=3, trim_interval=1)
+    for index in range(6):
+        store.set("ns", str(index), index)
+    assert [store.get("ns", str(index)) for index in range(6)] == [None, None, None, 3, 4, 5]
+
+
+def test_async_wrappers_run_off_the_event_loop(store, monkeypatch):
+    threads = []
+    original = store._connection
+
+    def tracking():
+        threads.append(threading.current_thread())
+        return original()
+
+    monkeypatch.setattr(store, "_connection", tracking)
+
+    async def scenario():
+        await store.aset("ns", "k", "v")
+        assert await store.aadd("ns", "other", 1)
+        assert not await store.aadd("ns", "other", 2)
+        value = await store.aget("ns", "k")
+        await store.adelete("ns", "k")
+        return value, await store.aget("ns", "k")
+
+    assert asyncio.run(scenario()) == ("v", None)
+    assert threads and threading.main_thread() not in threads
@@ -0,0 +1,37 @@
+"""JSON-RPC over WebSocket: calls answered by id and captured under the HTTP route."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.shared.capture import iter_capture, traffic_recorder
+from scripts.replay_traffic import http_path
+
+
+@pytest.fixture
+def capture(tmp_path, monkeypatch):
+    path = tmp_path / "traffic.jsonl"
+    monkeypatch.setattr(traffic_recorder, "path", path)
+    monkeypatch.setattr(traffic_recorder, "enabled", True)
+    return path
+
+
+def test_socket_calls_are_captured_with_the_http_path(capture):
+    call = {"jsonrpc": "2.0", "id": "7", "method": "no/such-method", "params": {}}
+    with TestClient(main.app).websocket_connect("/a2a/ws/schedule-time") as socket:
+        socket.send_text(json.dumps(call))
+        reply = json.loads(socket.receive_text())
+    assert reply["id"] == "7"
+    assert "error" in reply
+    traffic_recorder.flush()
+    requests = [record for record in iter_capture(capture) if record["type"] == "request"]
+    assert [record["path"] for record in requests] == ["/a2a/schedule-time"]
+
+
+def test_replay_maps_older_socket_paths():
+    assert http_path("/a2a/ws/schedule-time") == "/a2a/schedule-time"
+    assert http_path("/a2a/schedule-time") == "/a2a/schedule-time"